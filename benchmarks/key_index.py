@@ -0,0 +1,53 @@
+"""Compare uniqueness checks through ``is_unique`` against the precomputed ``KeyIndex``.
+
+The synthetic table is wide and carries hundreds of constraints, and every column is checked as many times as it would
+be if it was the target of that many foreign keys.
+"""
+
+import argparse
+import timeit
+
+from sqlalchemy import Column, Integer, MetaData, Table, UniqueConstraint
+
+from paracelsus.transformers.utils import KeyIndex, is_unique
+
+
+def wide_table(columns: int, constraints: int) -> Table:
+    metadata = MetaData()
+    table_columns = [Column(f"col_{i}", Integer) for i in range(columns)]
+    table_constraints = [
+        UniqueConstraint(f"col_{i % columns}", f"col_{(i + 1) % columns}", name=f"uq_{i}") for i in range(constraints)
+    ]
+    return Table("wide", metadata, Column("id", Integer, primary_key=True), *table_columns, *table_constraints)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--columns", type=int, default=500)
+    parser.add_argument("--constraints", type=int, default=500)
+    parser.add_argument("--lookups", type=int, default=20, help="Uniqueness checks per column.")
+    args = parser.parse_args()
+
+    table = wide_table(args.columns, args.constraints)
+    columns = list(table.columns)
+
+    def scan() -> None:
+        for _ in range(args.lookups):
+            for column in columns:
+                is_unique(column)
+
+    def indexed() -> None:
+        index = KeyIndex()
+        for _ in range(args.lookups):
+            for column in columns:
+                index.is_unique(column)
+
+    scan_time = min(timeit.repeat(scan, number=1, repeat=3))
+    index_time = min(timeit.repeat(indexed, number=1, repeat=3))
+    print(f"{len(columns)} columns, {len(table.constraints)} constraints, {args.lookups} lookups per column")
+    print(f"is_unique scans: {scan_time * 1000:10.2f} ms")
+    print(f"KeyIndex:        {index_time * 1000:10.2f} ms ({scan_time / index_time:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Time the stages of rendering a diagram on synthetic schemas, from a hundred to fifty thousand tables.
+
+Each stage is timed on its own: resolving the tables to include, filtering the metadata, the Mermaid and Dot
+transformers (including the extraction of the schema), and ``get_graph_string`` from importing the models to the
+final string. The best of ``--repeat`` runs is kept.
+
+Timings can be stored as a baseline and later runs compared against it:
+
+    python -m benchmarks.suite --save-baseline
+    python -m benchmarks.suite --compare
+
+The comparison exits with a non-zero status when a stage got slower than the baseline by more than ``--threshold``.
+Baselines depend on the machine they were recorded on, so only compare runs made on the same one.
+"""
+
+import argparse
+import json
+import logging
+import platform
+import sys
+import tempfile
+import timeit
+from dataclasses import asdict, fields, replace
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from benchmarks.synthetic import SchemaShape, cached_metadata, shape_arguments
+from paracelsus.graph import filter_metadata, get_graph_string, resolve_included_tables
+from paracelsus.transformers.dot import Dot
+from paracelsus.transformers.mermaid import Mermaid
+
+DEFAULT_SIZES = "100,1000,10000,50000"
+DEFAULT_BASELINE = Path(__file__).parent / "baselines.json"
+
+MODELS_MODULE = "paracelsus_benchmark_models"
+
+# The models module imported by get_graph_string, which reuses the metadata generated for the other stages so the
+# end to end timing doesn't include building the synthetic tables.
+MODELS_SOURCE = """\
+from benchmarks.synthetic import SchemaShape, cached_metadata
+
+
+class Base:
+    metadata = cached_metadata(SchemaShape(**{shape}))
+"""
+
+Results = Dict[str, Dict[str, float]]
+
+
+def exclude_patterns(tables: int) -> set:
+    """About one exclusion per hundred tables, mixing exact names and regular expressions."""
+    patterns = set()
+    for i in range(max(tables // 100, 1)):
+        if i % 2:
+            patterns.add(f"table_{i * 97 % tables}")
+        else:
+            patterns.add(f"table_{i + 1}0\\d$")
+    return patterns
+
+
+def stages(shape: SchemaShape, models_dir: Path) -> Dict[str, Callable[[], object]]:
+    metadata = cached_metadata(shape)
+    all_tables = set(metadata.tables.keys())
+    excluded = exclude_patterns(shape.tables)
+    included = resolve_included_tables(set(), excluded, all_tables)
+    (models_dir / f"{MODELS_MODULE}.py").write_text(MODELS_SOURCE.format(shape=asdict(shape)))
+
+    def end_to_end() -> str:
+        # Import the models again on every run, like a new invocation of the command would.
+        sys.modules.pop(MODELS_MODULE, None)
+        return get_graph_string(
+            base_class_path=f"{MODELS_MODULE}:Base",
+            import_module=[],
+            include_tables=set(),
+            exclude_tables=excluded,
+            python_dir=[models_dir],
+            format="mermaid",
+            column_sort="key-based",
+        )
+
+    return {
+        "resolve_included_tables": lambda: resolve_included_tables(set(), excluded, all_tables),
+        "filter_metadata": lambda: filter_metadata(metadata, included),
+        "mermaid": lambda: str(Mermaid(metadata, "key-based")),
+        "dot": lambda: str(Dot(metadata, "key-based")),
+        "get_graph_string": end_to_end,
+    }
+
+
+def measure(function: Callable[[], object], repeat: int) -> float:
+    """The best time of a call. Calls shorter than a fifth of a second are looped, since a single one is too noisy."""
+    timer = timeit.Timer(function)
+    number = 1 if timer.timeit(number=1) >= 0.2 else timer.autorange()[0]
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def run(shape: SchemaShape, sizes: List[int], repeat: int) -> Results:
+    results: Results = {}
+    with tempfile.TemporaryDirectory() as models_dir:
+        for size in sizes:
+            for stage, function in stages(replace(shape, tables=size), Path(models_dir)).items():
+                best = measure(function, repeat)
+                results.setdefault(stage, {})[str(size)] = best
+                print(f"{stage:<25} {size:>7} tables {best * 1000:12.2f} ms", flush=True)
+    return results
+
+
+def compare(results: Results, baseline: Results, threshold: float) -> bool:
+    """Print every timing next to its baseline. Returns False if any of them regressed beyond the threshold."""
+    passed = True
+    print()
+    print(f"{'stage':<25} {'tables':>7} {'baseline ms':>12} {'current ms':>12} {'ratio':>7}")
+    for stage, timings in results.items():
+        for size, current in timings.items():
+            previous = baseline.get(stage, {}).get(size)
+            if previous is None:
+                print(f"{stage:<25} {size:>7} {'-':>12} {current * 1000:12.2f} {'-':>7}")
+                continue
+            ratio = current / previous
+            regressed = ratio > 1 + threshold
+            passed = passed and not regressed
+            flag = "  slower" if regressed else ("  faster" if ratio < 1 - threshold else "")
+            print(f"{stage:<25} {size:>7} {previous * 1000:12.2f} {current * 1000:12.2f} {ratio:6.2f}x{flag}")
+    return passed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    shape_arguments(parser)
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma separated table counts, replacing --tables.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Store the timings as the new baseline.")
+    parser.add_argument("--compare", action="store_true", help="Compare the timings against the baseline.")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown before failing a comparison.")
+    args = parser.parse_args()
+
+    # Excluded tables make the extraction warn about every foreign key pointing at them.
+    logging.getLogger("paracelsus").setLevel(logging.ERROR)
+    shape = SchemaShape(**{field.name: getattr(args, field.name) for field in fields(SchemaShape)})
+    sizes = [int(size) for size in args.sizes.split(",")]
+    results = run(shape, sizes, args.repeat)
+
+    if args.compare:
+        stored = json.loads(args.baseline.read_text())
+        if stored["shape"] != asdict(replace(shape, tables=0)):
+            print(f"Warning: the baseline was recorded with a different shape: {stored['shape']}")
+        if not compare(results, stored["results"], args.threshold):
+            sys.exit(1)
+
+    if args.save_baseline:
+        stored = {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "shape": asdict(replace(shape, tables=0)),
+            "results": results,
+        }
+        args.baseline.write_text(json.dumps(stored, indent=2) + "\n")
+        print(f"Baseline saved to {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
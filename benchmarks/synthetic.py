@@ -0,0 +1,116 @@
+"""Generate synthetic ``MetaData`` of any size, for benchmarks which need more than the three tables of the tests.
+
+The shape of the schema is tuned with ``SchemaShape``. Generation is seeded, so the same shape always builds the same
+tables. Run as a script to print a summary of a generated schema:
+
+    python -m benchmarks.synthetic --tables 1000
+"""
+
+import argparse
+import random
+from dataclasses import asdict, dataclass, fields
+from functools import lru_cache
+
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Integer,
+    MetaData,
+    Numeric,
+    String,
+    Table,
+    Text,
+    UniqueConstraint,
+)
+
+COLUMN_TYPES = (
+    lambda: Integer(),
+    lambda: String(100),
+    lambda: Text(),
+    lambda: Boolean(),
+    lambda: DateTime(),
+    lambda: Numeric(10, 2),
+)
+
+
+@dataclass(frozen=True)
+class SchemaShape:
+    tables: int = 1000
+    # Columns besides the primary key and the foreign keys.
+    columns: int = 8
+    # The average number of foreign keys per table. They always point at tables declared earlier.
+    fk_density: float = 1.5
+    # Unique constraints per table, over pairs of columns.
+    constraints: int = 1
+    # Every table gets an enum column with this many members, 0 for none.
+    enum_size: int = 5
+    # Length of the comment of every column, 0 for none.
+    comment_length: int = 30
+    # Tables are spread over this many schemas (1 for tables without schema).
+    schemas: int = 1
+    seed: int = 0
+
+
+def generate_metadata(shape: SchemaShape) -> MetaData:
+    metadata = MetaData()
+    generator = random.Random(shape.seed)
+    comment = ("lorem ipsum dolor sit amet " * (shape.comment_length // 27 + 1))[: shape.comment_length] or None
+    enum_members = [f"member_{index}" for index in range(shape.enum_size)]
+
+    keys = []
+    for index in range(shape.tables):
+        schema = f"schema_{index % shape.schemas}" if shape.schemas > 1 else None
+        columns = [Column("id", Integer, primary_key=True)]
+        for column in range(shape.columns):
+            column_type = COLUMN_TYPES[generator.randrange(len(COLUMN_TYPES))]()
+            columns.append(Column(f"column_{column}", column_type, comment=comment, nullable=generator.random() < 0.5))
+        if enum_members:
+            columns.append(Column("state", Enum(*enum_members, name=f"state_{index}")))
+
+        # Draw the number of foreign keys around the density, pointing at random earlier tables.
+        foreign_keys = int(shape.fk_density) + (generator.random() < shape.fk_density % 1)
+        for foreign_key in range(min(foreign_keys, len(keys))):
+            target = keys[generator.randrange(len(keys))]
+            columns.append(Column(f"fk_{foreign_key}", ForeignKey(f"{target}.id"), index=generator.random() < 0.5))
+
+        constraints = [
+            UniqueConstraint(
+                f"column_{(2 * constraint) % shape.columns}", f"column_{(2 * constraint + 1) % shape.columns}"
+            )
+            for constraint in range(shape.constraints if shape.columns > 1 else 0)
+        ]
+        table = Table(f"table_{index}", metadata, *columns, *constraints, schema=schema)
+        keys.append(table.key)
+    return metadata
+
+
+@lru_cache(maxsize=1)
+def cached_metadata(shape: SchemaShape) -> MetaData:
+    """The metadata of the last shape generated, so several stages of a benchmark can share it."""
+    return generate_metadata(shape)
+
+
+def shape_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add an option for every field of ``SchemaShape`` to a parser."""
+    for field in fields(SchemaShape):
+        parser.add_argument(f"--{field.name.replace('_', '-')}", type=type(field.default), default=field.default)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    shape_arguments(parser)
+    args = parser.parse_args()
+
+    shape = SchemaShape(**{field.name: getattr(args, field.name) for field in fields(SchemaShape)})
+    metadata = generate_metadata(shape)
+    columns = sum(len(table.columns) for table in metadata.tables.values())
+    foreign_keys = sum(len(table.foreign_keys) for table in metadata.tables.values())
+    print(asdict(shape))
+    print(f"{len(metadata.tables)} tables, {columns} columns, {foreign_keys} foreign keys")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Compare table filtering with one ``re.match`` per pattern and table against the compiled ``TableMatcher``.
+
+The synthetic patterns mix exact table names, prefixes and regular expressions, similar to a large
+``exclude_tables`` list in ``[tool.paracelsus]``.
+"""
+
+import argparse
+import re
+import timeit
+
+from paracelsus.matcher import TableMatcher
+
+
+def synthetic_tables(count: int) -> set:
+    return {f"schema_{i % 20}.table_{i}" for i in range(count)}
+
+
+def synthetic_patterns(count: int) -> set:
+    patterns = set()
+    for i in range(count):
+        match i % 3:
+            case 0:
+                patterns.add(f"schema_{i % 20}.table_{i * 7}")
+            case 1:
+                patterns.add(f"schema_{i % 20}\\.table_{i}_.*")
+            case _:
+                patterns.add(f"^archive_{i}.*$")
+    return patterns
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tables", type=int, default=10_000)
+    parser.add_argument("--patterns", type=int, default=500)
+    args = parser.parse_args()
+
+    tables = synthetic_tables(args.tables)
+    patterns = synthetic_patterns(args.patterns)
+
+    def naive() -> set:
+        return {table for table in tables if any(re.match(pattern, table) for pattern in patterns)}
+
+    def compiled() -> set:
+        return TableMatcher(patterns).select(tables)[0]
+
+    assert naive() == compiled()
+
+    naive_time = min(timeit.repeat(naive, number=1, repeat=3))
+    compiled_time = min(timeit.repeat(compiled, number=1, repeat=3))
+    print(f"{len(tables)} tables, {len(patterns)} patterns")
+    print(f"re.match per pattern: {naive_time * 1000:10.2f} ms")
+    print(f"TableMatcher:         {compiled_time * 1000:10.2f} ms ({naive_time / compiled_time:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
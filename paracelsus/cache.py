@@ -0,0 +1,146 @@
+"""On-disk cache of extracted schemas.
+
+Importing an application just to read its models is usually the slowest part of a run. The extracted ``Schema`` is
+stored under a fingerprint of the model source files (the imported modules and every project module they import,
+transitively) and of the settings used to extract it. A later run with the same fingerprint loads the snapshot and
+never imports the application.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import platform
+import tempfile
+from pathlib import Path
+from typing import Any, List, Mapping, Optional, Sequence
+
+import sqlalchemy
+
+from . import __version__
+from .schema import SNAPSHOT_VERSION, Schema, dump_schema, load_schema
+from .sources import find_module_file, module_name, project_module_files
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CACHE_SIZE = 64 * 1024 * 1024
+CACHE_DIR_ENVIRONMENT_VARIABLE = "PARACELSUS_CACHE_DIR"
+
+
+def default_cache_dir() -> Path:
+    """The user level cache directory, which can be overridden with ``PARACELSUS_CACHE_DIR``."""
+    if os.environ.get(CACHE_DIR_ENVIRONMENT_VARIABLE):
+        return Path(os.environ[CACHE_DIR_ENVIRONMENT_VARIABLE])
+    if os.environ.get("XDG_CACHE_HOME"):
+        return Path(os.environ["XDG_CACHE_HOME"]) / "paracelsus"
+    return Path.home() / ".cache" / "paracelsus"
+
+
+def schema_fingerprint(
+    *,
+    base_class_path: str,
+    import_module: List[str],
+    roots: Sequence[Path],
+    settings: Optional[Mapping[str, Any]] = None,
+) -> Optional[str]:
+    """Hash everything the extracted schema depends on.
+
+    Returns ``None`` when one of the requested modules can't be found under the roots, since changes to it couldn't be
+    detected and the schema shouldn't be cached.
+    """
+    requested = [module_name(base_class_path)] + [module_name(module) for module in import_module]
+    if any(find_module_file(module, roots) is None for module in requested):
+        return None
+
+    digest = hashlib.sha256()
+    context = {
+        "snapshot": SNAPSHOT_VERSION,
+        "paracelsus": __version__,
+        "sqlalchemy": sqlalchemy.__version__,
+        "python": platform.python_version(),
+        "base_class_path": base_class_path,
+        "import_module": import_module,
+        "roots": [str(root) for root in roots],
+        "settings": dict(settings or {}),
+    }
+    digest.update(json.dumps(context, sort_keys=True, default=str).encode())
+
+    for name, path in sorted(project_module_files(requested, roots).items()):
+        digest.update(f"\0{name}\0{path}\0".encode())
+        digest.update(hashlib.sha256(path.read_bytes()).digest())
+
+    return digest.hexdigest()
+
+
+class SchemaCache:
+    """A directory of schema snapshots named after their fingerprint.
+
+    Reading a snapshot refreshes its modification time. When the directory grows past ``max_size`` bytes the least
+    recently used snapshots are removed. Snapshots are written to a temporary file and renamed into place, so
+    concurrent runs never read a partial snapshot.
+    """
+
+    suffix = ".schema.json"
+
+    def __init__(self, directory: Path, max_size: int = DEFAULT_MAX_CACHE_SIZE) -> None:
+        self.directory = directory
+        self.max_size = max_size
+
+    def _path(self, fingerprint: str) -> Path:
+        return self.directory / f"{fingerprint}{self.suffix}"
+
+    def get(self, fingerprint: str) -> Optional[Schema]:
+        path = self._path(fingerprint)
+        try:
+            with path.open() as fp:
+                schema = load_schema(fp)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError) as error:
+            logger.warning(f"Ignoring unreadable schema cache entry {path}: {error}")
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return schema
+
+    def put(self, fingerprint: str, schema: Schema) -> None:
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            descriptor, temporary_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-", suffix=self.suffix)
+            try:
+                with os.fdopen(descriptor, "w") as fp:
+                    dump_schema(schema, fp)
+                os.replace(temporary_path, self._path(fingerprint))
+            except BaseException:
+                os.unlink(temporary_path)
+                raise
+        except OSError as error:
+            logger.warning(f"Unable to write to the schema cache in {self.directory}: {error}")
+            return
+
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove the least recently used snapshots until the cache fits in ``max_size``."""
+        entries = []
+        for path in self.directory.glob(f"*{self.suffix}"):
+            if path.name.startswith(".tmp-"):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
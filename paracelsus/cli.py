@@ -1,34 +1,49 @@
-import re
+import os
 import sys
+from contextlib import contextmanager
 from dataclasses import asdict
 from difflib import unified_diff
 from pathlib import Path
 from textwrap import dedent
-from typing import List, Optional
+from typing import TYPE_CHECKING, Iterator, List, Optional, Tuple
 
 import typer
 from typing_extensions import Annotated
 
 from paracelsus.config import (
+    EXTRACT_DEFAULT,
+    FOCUS_DEPTH_DEFAULT,
+    FOCUS_DIRECTION_DEFAULT,
     MAX_ENUM_MEMBERS_DEFAULT,
     SORT_DEFAULT,
     ColumnSorts,
+    ExtractModes,
+    FocusDirections,
     Formats,
     Layouts,
     ParacelsusSettingsForGraph,
     ParacelsusSettingsForInject,
+    parse_attach,
+    parse_format_output,
 )
 
-from .graph import get_graph_string, transformers
+from .daemon import DaemonServer, default_socket_path
+from .files import write_if_changed
+from .profiling import Profiler, count_schema, phase
 from .pyproject import get_pyproject_settings
 
+# SQLAlchemy, the models and the transformers are only imported by the commands which need them, so that `--help` and
+# `version` start quickly.
+if TYPE_CHECKING:
+    from .graph import Transformer
+
 app = typer.Typer()
 
 
-def get_base_class(base_class_path: str | None, base_from_config: str) -> str:
+def get_base_class(base_class_path: str | None, base_from_config: str, required: bool = True) -> str:
     if base_class_path:
         return base_class_path
-    if base_from_config:
+    if base_from_config or not required:
         return base_from_config
 
     raise ValueError(
@@ -42,97 +57,392 @@ def get_base_class(base_class_path: str | None, base_from_config: str) -> str:
     )
 
 
-@app.command(help="Create the graph structure and print it to stdout.")
+def check_format_outputs(values: List[str]) -> List[str]:
+    """Report malformed ``--format`` values as usage errors, before anything is imported."""
+    for value in values:
+        try:
+            parse_format_output(value)
+        except ValueError as error:
+            raise typer.BadParameter(str(error)) from None
+    return values
+
+
+def check_attach(values: List[str]) -> List[str]:
+    """Report malformed ``--attach`` values as usage errors."""
+    for value in values:
+        try:
+            parse_attach(value)
+        except ValueError as error:
+            raise typer.BadParameter(str(error)) from None
+    return values
+
+
+def check_inject_files(values: Optional[List[str]]) -> Optional[List[str]]:
+    """Report files and patterns to inject into which don't exist as usage errors."""
+    from .inject import expand_files, split_inject_arguments
+
+    try:
+        expand_files(split_inject_arguments(values or [])[0])
+    except ValueError as error:
+        raise typer.BadParameter(str(error)) from None
+    return values
+
+
+def get_format_outputs(formats: List[str], output: Path | None) -> List[Tuple[Formats, Path | None]]:
+    """Pair every requested format with the file it is written to, or None for stdout."""
+    outputs = [parse_format_output(value) for value in formats] or [(Formats.mermaid, None)]
+    outputs = [(output_format, path if path is not None else output) for output_format, path in outputs]
+
+    if sum(1 for _, path in outputs if path is None) > 1:
+        raise ValueError("Only one format can be printed to stdout, use FORMAT=PATH to write the others to files.")
+    paths = [path.resolve() for _, path in outputs if path is not None]
+    if len(paths) != len(set(paths)):
+        raise ValueError("Every format has to be written to a different file.")
+    return outputs
+
+
+def get_split_formats(
+    formats: List[str], output: Path | None, output_dir: Path | None
+) -> List[Tuple[Formats, Path | None]]:
+    """Check the formats of a split graph, which are all written to the output directory."""
+    if output_dir is None:
+        raise ValueError("--split-by writes several diagrams, use --output-dir to choose where.")
+    outputs = [parse_format_output(value) for value in formats] or [(Formats.mermaid, None)]
+    if output is not None or any(path is not None for _, path in outputs):
+        raise ValueError("--split-by writes every format to --output-dir, it can't be combined with output files.")
+    return outputs
+
+
+def get_cache_dir(cache_dir: Path | None, cache: bool | None, cache_from_config: bool) -> Path | None:
+    """The directory to cache extracted schemas in, or None when the cache isn't enabled.
+
+    The cache is opt-in, since its fingerprint misses models installed as packages or read from the environment.
+    """
+    from .cache import CACHE_DIR_ENVIRONMENT_VARIABLE, default_cache_dir
+
+    if cache is None:
+        cache = cache_from_config or cache_dir is not None or bool(os.environ.get(CACHE_DIR_ENVIRONMENT_VARIABLE))
+    if not cache:
+        return None
+    return cache_dir if cache_dir is not None else default_cache_dir()
+
+
+def graph_chunks(transformer: "Transformer") -> Iterator[str]:
+    """Stream a rendered graph, making sure it ends with a newline."""
+    last_chunk = ""
+    for chunk in transformer.iter_chunks():
+        if chunk:
+            yield chunk
+            last_chunk = chunk
+    if not last_chunk.endswith("\n"):
+        yield "\n"
+
+
+@contextmanager
+def profiled(command: str, destination: Path | None) -> Iterator[None]:
+    """Profile the phases of a command when a destination for the report is given."""
+    if destination is None:
+        yield
+        return
+    profiler = Profiler(command)
+    try:
+        with profiler.activate():
+            yield
+    finally:
+        profiler.write(destination)
+
+
+# Options shared by several commands.
+ConfigOption = Annotated[
+    Path,
+    typer.Option(
+        help="Path to a pyproject.toml file to load configuration from.",
+        file_okay=True,
+        dir_okay=False,
+        resolve_path=True,
+        exists=True,
+        default_factory=lambda: Path.cwd() / "pyproject.toml",
+        show_default=str(Path.cwd() / "pyproject.toml"),
+    ),
+]
+ImportModuleOption = Annotated[
+    List[str],
+    typer.Option(
+        help="Module, typically an SQL Model, to import. Modules that end in :* will act as `from module import *`"
+    ),
+]
+ExcludeTablesOption = Annotated[
+    List[str],
+    typer.Option(help="List of tables or regular expression patterns for tables that are excluded from the graph"),
+]
+IncludeTablesOption = Annotated[
+    List[str],
+    typer.Option(help="List of tables or regular expression patterns for tables that are included in the graph"),
+]
+FocusOption = Annotated[
+    List[str],
+    typer.Option(
+        "--focus",
+        help="Only graph this table and the tables within `--depth` foreign keys of it. Repeat it to focus on "
+        "several tables.",
+        metavar="TABLE",
+    ),
+]
+DepthOption = Annotated[
+    int,
+    typer.Option(
+        "--depth",
+        help="Number of foreign keys to follow from the `--focus` tables.",
+        min=0,
+    ),
+]
+DirectionOption = Annotated[
+    FocusDirections,
+    typer.Option(
+        "--direction",
+        help="Follow the foreign keys of the `--focus` tables to the tables they refer to (`out`), from the "
+        "tables referring to them (`in`), or `both`.",
+    ),
+]
+PythonDirOption = Annotated[
+    List[Path],
+    typer.Option(
+        help="Paths to add to the `PYTHON_PATH` for module lookup.",
+        file_okay=False,
+        dir_okay=True,
+        resolve_path=True,
+        exists=True,
+    ),
+]
+ColumnSortOption = Annotated[
+    Optional[ColumnSorts],
+    typer.Option(
+        help="Specifies the method of sorting columns in diagrams.",
+        show_default=str(SORT_DEFAULT.value),
+    ),
+]
+OmitCommentsOption = Annotated[
+    Optional[bool],
+    typer.Option(
+        "--omit-comments",
+        help="Omit SQLAlchemy column comments from the diagram.",
+    ),
+]
+MaxEnumMembersOption = Annotated[
+    Optional[int],
+    typer.Option(
+        "--max-enum-members",
+        help="Maximum number of enum members to display in diagrams. 0 means no enum values are shown, any "
+        "positive number limits the display.",
+        show_default=str(MAX_ENUM_MEMBERS_DEFAULT),
+    ),
+]
+LayoutOption = Annotated[
+    Optional[Layouts],
+    typer.Option(
+        help="Specifies the layout of the diagram. Only applicable for mermaid format, and only applied to mermaid "
+        "outputs.",
+    ),
+]
+TypeParameterDelimiterOption = Annotated[
+    Optional[str],
+    typer.Option(
+        "--type-parameter-delimiter",
+        help="Delimiter to use for type parameters in mermaid diagrams (e.g., NUMERIC(10-2)). Cannot contain commas "
+        "or spaces.",
+        show_default="-",
+    ),
+]
+ExtractOption = Annotated[
+    Optional[ExtractModes],
+    typer.Option(
+        help="How to read the models: `import` them, or parse their source files (`static`) without running any "
+        "project code.",
+        show_default=str(EXTRACT_DEFAULT.value),
+    ),
+]
+DialectOption = Annotated[
+    Optional[str],
+    typer.Option(
+        "--dialect",
+        help="SQL dialect to show the column types of, such as `postgresql`, `mysql` or `sqlite`. Defaults to "
+        "SQLAlchemy's generic types.",
+        show_default=False,
+    ),
+]
+FromUrlOption = Annotated[
+    Optional[str],
+    typer.Option(
+        "--from-url",
+        help="Reflect the tables of a live database through this SQLAlchemy URL instead of importing models.",
+        metavar="URL",
+    ),
+]
+ReflectSchemaOption = Annotated[
+    List[str],
+    typer.Option(
+        "--schema",
+        help="Database schema to reflect with `--from-url`, repeat it for several. Defaults to the default schema.",
+    ),
+]
+AttachOption = Annotated[
+    List[str],
+    typer.Option(
+        "--attach",
+        help="Attach a SQLite database file to the `--from-url` database as the schema NAME, and reflect it too.",
+        metavar="NAME=PATH",
+        callback=check_attach,
+    ),
+]
+SnapshotOption = Annotated[
+    Optional[Path],
+    typer.Option(
+        "--snapshot",
+        help="With `--from-url`, save the reflected schema to this file. Without it, read the schema from this "
+        "file instead of importing models.",
+        dir_okay=False,
+        resolve_path=True,
+    ),
+]
+JobsOption = Annotated[
+    int,
+    typer.Option(
+        "--jobs",
+        help="Number of processes to render the tables with, and of schemas to reflect at once with `--from-url`. "
+        "Only worth it for schemas with thousands of tables.",
+        min=1,
+    ),
+]
+CacheOption = Annotated[
+    Optional[bool],
+    typer.Option(
+        "--cache/--no-cache",
+        help="Reuse the schema cached by a previous run while the model files are unchanged, instead of importing "
+        "the models. Off unless enabled here, with `--cache-dir`, `$PARACELSUS_CACHE_DIR` or in pyproject.toml.",
+        show_default=False,
+    ),
+]
+CacheDirOption = Annotated[
+    Optional[Path],
+    typer.Option(
+        "--cache-dir",
+        help="Cache extracted schemas in this directory. Defaults to `$PARACELSUS_CACHE_DIR` or the user cache "
+        "directory.",
+        file_okay=False,
+        dir_okay=True,
+        resolve_path=True,
+    ),
+]
+ProfileOption = Annotated[
+    Optional[Path],
+    typer.Option(
+        "--profile",
+        help="Write a JSON report of the time and memory spent in each phase of the command to this file, or to "
+        "stderr with `-`.",
+        metavar="PATH|-",
+        dir_okay=False,
+    ),
+]
+BlockFormatOption = Annotated[Formats, typer.Option(help="The file format to output the generated graph to.")]
+BeginTagOption = Annotated[str, typer.Option(help="")]
+EndTagOption = Annotated[str, typer.Option(help="")]
+
+
+@app.command(help="Create the graph structure and print it to stdout or write it to a file.")
 def graph(
-    config: Annotated[
-        Path,
-        typer.Option(
-            help="Path to a pyproject.toml file to load configuration from.",
-            file_okay=True,
-            dir_okay=False,
-            resolve_path=True,
-            exists=True,
-            default_factory=lambda: Path.cwd() / "pyproject.toml",
-            show_default=str(Path.cwd() / "pyproject.toml"),
-        ),
-    ],
+    config: ConfigOption,
     base_class_path: Annotated[
         Optional[str],
         typer.Argument(help="The SQLAlchemy base class used by the database to graph."),
     ] = None,
-    import_module: Annotated[
+    import_module: ImportModuleOption = [],
+    exclude_tables: ExcludeTablesOption = [],
+    include_tables: IncludeTablesOption = [],
+    focus: FocusOption = [],
+    depth: DepthOption = FOCUS_DEPTH_DEFAULT,
+    direction: DirectionOption = FOCUS_DIRECTION_DEFAULT,
+    python_dir: PythonDirOption = [],
+    format: Annotated[
         List[str],
         typer.Option(
-            help="Module, typically an SQL Model, to import. Modules that end in :* will act as `from module import *`"
+            help=f"The file format to output the generated graph to ({', '.join(item.value for item in Formats)}). "
+            "Repeat it as FORMAT=PATH to write several formats from a single import.",
+            metavar="FORMAT[=PATH]",
+            show_default=Formats.mermaid.value,
+            callback=check_format_outputs,
         ),
     ] = [],
-    exclude_tables: Annotated[
-        List[str],
-        typer.Option(help="List of tables or regular expression patterns for tables that are excluded from the graph"),
-    ] = [],
-    include_tables: Annotated[
-        List[str],
-        typer.Option(help="List of tables or regular expression patterns for tables that are included in the graph"),
-    ] = [],
-    python_dir: Annotated[
-        List[Path],
+    column_sort: ColumnSortOption = None,
+    omit_comments: OmitCommentsOption = None,
+    max_enum_members: MaxEnumMembersOption = None,
+    layout: LayoutOption = None,
+    type_parameter_delimiter: TypeParameterDelimiterOption = None,
+    extract: ExtractOption = None,
+    dialect: DialectOption = None,
+    from_url: FromUrlOption = None,
+    reflect_schema: ReflectSchemaOption = [],
+    attach: AttachOption = [],
+    snapshot: SnapshotOption = None,
+    jobs: JobsOption = 1,
+    cache: CacheOption = None,
+    cache_dir: CacheDirOption = None,
+    output: Annotated[
+        Optional[Path],
         typer.Option(
-            help="Paths to add to the `PYTHON_PATH` for module lookup.",
-            file_okay=False,
-            dir_okay=True,
+            "--output",
+            help="Write the graph to this file instead of printing it to stdout. Applies to a format given without a "
+            "path.",
+            file_okay=True,
+            dir_okay=False,
             resolve_path=True,
-            exists=True,
-        ),
-    ] = [],
-    format: Annotated[
-        Formats, typer.Option(help="The file format to output the generated graph to.")
-    ] = Formats.mermaid.value,  # type: ignore # Typer will fail to render the help message, but this code works.
-    column_sort: Annotated[
-        Optional[ColumnSorts],
-        typer.Option(
-            help="Specifies the method of sorting columns in diagrams.",
-            show_default=str(SORT_DEFAULT.value),
-        ),
-    ] = None,
-    omit_comments: Annotated[
-        Optional[bool],
-        typer.Option(
-            "--omit-comments",
-            help="Omit SQLAlchemy column comments from the diagram.",
         ),
     ] = None,
-    max_enum_members: Annotated[
-        Optional[int],
-        typer.Option(
-            "--max-enum-members",
-            help="Maximum number of enum members to display in diagrams. 0 means no enum values are shown, any positive number limits the display.",
-            show_default=str(MAX_ENUM_MEMBERS_DEFAULT),
-        ),
-    ] = None,
-    layout: Annotated[
-        Optional[Layouts],
+    split_by: Annotated[
+        Optional[str],
         typer.Option(
-            help="Specifies the layout of the diagram. Only applicable for mermaid format.",
+            "--split-by",
+            help="Write one diagram per database schema (`schema`) or per group of tables (`pattern:<regex>`, grouped "
+            "by the first capture group) into `--output-dir`, along with an index of them.",
+            metavar="schema|pattern:REGEX",
         ),
     ] = None,
-    type_parameter_delimiter: Annotated[
-        Optional[str],
+    output_dir: Annotated[
+        Optional[Path],
         typer.Option(
-            "--type-parameter-delimiter",
-            help="Delimiter to use for type parameters in mermaid diagrams (e.g., NUMERIC(10-2)). Cannot contain commas or spaces.",
-            show_default="-",
+            "--output-dir",
+            help="Directory to write the diagrams of `--split-by` to.",
+            file_okay=False,
+            dir_okay=True,
+            resolve_path=True,
         ),
     ] = None,
+    profile: ProfileOption = None,
 ):
+    from .graph import get_graphs, get_schema
+    from .split import write_split_graphs
+
     settings = get_pyproject_settings(config_file=config)
+    if split_by is None:
+        if output_dir is not None:
+            raise ValueError("--output-dir is only used with --split-by.")
+        outputs = get_format_outputs(format, output)
+    else:
+        outputs = get_split_formats(format, output, output_dir)
 
     graph_settings = ParacelsusSettingsForGraph(
-        base_class_path=get_base_class(base_class_path, settings.base),
+        base_class_path=get_base_class(base_class_path, settings.base, required=from_url is None and snapshot is None),
         import_module=import_module + settings.imports,
         include_tables=set(include_tables + settings.include_tables),
         exclude_tables=set(exclude_tables + settings.exclude_tables),
+        focus=set(focus),
+        depth=depth,
+        direction=direction,
         python_dir=python_dir,
-        format=format,
+        # The layout only applies to the mermaid outputs, so it is validated against one of them when there is one.
+        format=next(
+            (output_format for output_format, _ in outputs if layout and output_format == Formats.mermaid),
+            outputs[0][0],
+        ),
         column_sort=column_sort if column_sort is not None else settings.column_sort,
         omit_comments=omit_comments if omit_comments is not None else settings.omit_comments,
         max_enum_members=max_enum_members if max_enum_members is not None else settings.max_enum_members,
@@ -140,77 +450,97 @@ def graph(
         type_parameter_delimiter=type_parameter_delimiter
         if type_parameter_delimiter is not None
         else settings.type_parameter_delimiter,
+        cache_dir=get_cache_dir(cache_dir, cache, settings.cache),
+        extract=extract if extract is not None else settings.extract,
+        dialect=dialect if dialect is not None else settings.dialect,
+        from_url=from_url,
+        reflect_schemas=reflect_schema,
+        attach=dict(parse_attach(value) for value in attach),
+        snapshot=snapshot,
+        jobs=jobs,
     )
 
-    graph_string = get_graph_string(
-        **asdict(graph_settings),
-    )
-    typer.echo(graph_string, nl=not graph_string.endswith("\n"))
+    with profiled("graph", profile):
+        if split_by is not None and output_dir is not None:
+            # Import the models once, then render every group from the same schema.
+            schema = get_schema(
+                base_class_path=graph_settings.base_class_path,
+                import_module=graph_settings.import_module,
+                include_tables=graph_settings.include_tables,
+                exclude_tables=graph_settings.exclude_tables,
+                focus=graph_settings.focus,
+                depth=graph_settings.depth,
+                direction=graph_settings.direction,
+                python_dir=graph_settings.python_dir,
+                cache_dir=graph_settings.cache_dir,
+                extract=graph_settings.extract,
+                dialect=graph_settings.dialect,
+                from_url=graph_settings.from_url,
+                reflect_schemas=graph_settings.reflect_schemas,
+                attach=graph_settings.attach,
+                snapshot=graph_settings.snapshot,
+                jobs=graph_settings.jobs,
+            )
+            write_split_graphs(
+                schema,
+                split_by=split_by,
+                directory=output_dir,
+                formats=[output_format for output_format, _ in outputs],
+                column_sort=graph_settings.column_sort,
+                omit_comments=graph_settings.omit_comments,
+                max_enum_members=graph_settings.max_enum_members,
+                layout=graph_settings.layout,
+                type_parameter_delimiter=graph_settings.type_parameter_delimiter,
+                jobs=graph_settings.jobs,
+            )
+            count_schema(schema)
+            return
+
+        graph_kwargs = asdict(graph_settings)
+        del graph_kwargs["format"]
+        graphs = get_graphs(
+            formats=[output_format.value for output_format, _ in outputs],
+            **graph_kwargs,
+        )
+        count_schema(next(iter(graphs.values())).schema)
+        for output_format, output_path in outputs:
+            chunks = graph_chunks(graphs[output_format.value])
+            if profile is not None:
+                # The graph is otherwise rendered while it is written, render it first to time both apart.
+                with phase("render"):
+                    chunks = iter(list(chunks))
+            with phase("write"):
+                if output_path:
+                    # Unchanged files are left alone, so their modification time doesn't trigger documentation rebuilds.
+                    write_if_changed(output_path, chunks)
+                else:
+                    sys.stdout.writelines(chunks)
 
 
 @app.command(help="Create a graph and inject it as a code field into a markdown file.")
 def inject(
-    config: Annotated[
-        Path,
-        typer.Option(
-            help="Path to a pyproject.toml file to load configuration from.",
-            file_okay=True,
-            dir_okay=False,
-            resolve_path=True,
-            exists=True,
-            default_factory=lambda: Path.cwd() / "pyproject.toml",
-            show_default=str(Path.cwd() / "pyproject.toml"),
-        ),
-    ],
-    file: Annotated[
-        Path,
+    config: ConfigOption,
+    files: Annotated[
+        List[str],
         typer.Argument(
-            help="The file to inject the generated graph into.",
-            file_okay=True,
-            dir_okay=False,
-            resolve_path=True,
-            exists=True,
+            help="The files to inject the generated graph into, or glob patterns such as `docs/**/*.md`. "
+            "They can be followed by the SQLAlchemy base class used by the database to graph.",
+            metavar="FILES... [BASE_CLASS_PATH]",
+            show_default=False,
+            callback=check_inject_files,
         ),
     ],
-    base_class_path: Annotated[
-        Optional[str],
-        typer.Argument(help="The SQLAlchemy base class used by the database to graph."),
-    ] = None,
-    replace_begin_tag: Annotated[
-        str,
-        typer.Option(help=""),
-    ] = "<!-- BEGIN_SQLALCHEMY_DOCS -->",
-    replace_end_tag: Annotated[
-        str,
-        typer.Option(help=""),
-    ] = "<!-- END_SQLALCHEMY_DOCS -->",
-    import_module: Annotated[
-        List[str],
-        typer.Option(
-            help="Module, typically an SQL Model, to import. Modules that end in :* will act as `from module import *`"
-        ),
-    ] = [],
-    exclude_tables: Annotated[
-        List[str],
-        typer.Option(help="List of tables that are excluded from the graph"),
-    ] = [],
-    include_tables: Annotated[
-        List[str],
-        typer.Option(help="List of tables that are included in the graph"),
-    ] = [],
-    python_dir: Annotated[
-        List[Path],
-        typer.Option(
-            help="Paths to add to the `PYTHON_PATH` for module lookup.",
-            file_okay=False,
-            dir_okay=True,
-            resolve_path=True,
-            exists=True,
-        ),
-    ] = [],
-    format: Annotated[
-        Formats, typer.Option(help="The file format to output the generated graph to.")
-    ] = Formats.mermaid.value,  # type: ignore # Typer will fail to render the help message, but this code works.
+    replace_begin_tag: BeginTagOption = "<!-- BEGIN_SQLALCHEMY_DOCS -->",
+    replace_end_tag: EndTagOption = "<!-- END_SQLALCHEMY_DOCS -->",
+    import_module: ImportModuleOption = [],
+    exclude_tables: ExcludeTablesOption = [],
+    include_tables: IncludeTablesOption = [],
+    focus: FocusOption = [],
+    depth: DepthOption = FOCUS_DEPTH_DEFAULT,
+    direction: DirectionOption = FOCUS_DIRECTION_DEFAULT,
+    python_dir: PythonDirOption = [],
+    # Typer will fail to render the help message with an enum default, but this code works.
+    format: BlockFormatOption = Formats.mermaid.value,  # type: ignore
     check: Annotated[
         bool,
         typer.Option(
@@ -218,51 +548,47 @@ def inject(
             help="Perform a dry run and return a success code of 0 if there are no changes or 1 otherwise.",
         ),
     ] = False,
-    column_sort: Annotated[
-        Optional[ColumnSorts],
-        typer.Option(
-            help="Specifies the method of sorting columns in diagrams.",
-            show_default=str(SORT_DEFAULT.value),
-        ),
-    ] = None,
-    omit_comments: Annotated[
-        Optional[bool],
-        typer.Option(
-            "--omit-comments",
-            help="Omit SQLAlchemy column comments from the diagram.",
-        ),
-    ] = None,
-    max_enum_members: Annotated[
-        Optional[int],
-        typer.Option(
-            "--max-enum-members",
-            help="Maximum number of enum members to display in diagrams. 0 means no enum values are shown, any positive number limits the display.",
-            show_default=str(MAX_ENUM_MEMBERS_DEFAULT),
-        ),
-    ] = None,
-    layout: Annotated[
-        Optional[Layouts],
-        typer.Option(
-            help="Specifies the layout of the diagram. Only applicable for mermaid format.",
-        ),
-    ] = None,
-    type_parameter_delimiter: Annotated[
-        Optional[str],
+    fingerprint: Annotated[
+        bool,
         typer.Option(
-            "--type-parameter-delimiter",
-            help="Delimiter to use for type parameters in mermaid diagrams (e.g., NUMERIC(10-2)). Cannot contain commas or spaces.",
-            show_default="-",
+            "--fingerprint",
+            help="Write a fingerprint of the schema and settings into each begin tag, so blocks which are already "
+            "current can be checked without rendering them.",
         ),
-    ] = None,
+    ] = False,
+    column_sort: ColumnSortOption = None,
+    omit_comments: OmitCommentsOption = None,
+    max_enum_members: MaxEnumMembersOption = None,
+    layout: LayoutOption = None,
+    type_parameter_delimiter: TypeParameterDelimiterOption = None,
+    extract: ExtractOption = None,
+    dialect: DialectOption = None,
+    from_url: FromUrlOption = None,
+    reflect_schema: ReflectSchemaOption = [],
+    attach: AttachOption = [],
+    snapshot: SnapshotOption = None,
+    jobs: JobsOption = 1,
+    cache: CacheOption = None,
+    cache_dir: CacheDirOption = None,
+    profile: ProfileOption = None,
 ):
+    from .graph import get_schema
+    from .inject import BlockRenderer, expand_files, inject_blocks, inject_file, split_inject_arguments
+
     settings = get_pyproject_settings(config_file=config)
+    file_patterns, base_class_path = split_inject_arguments(files)
 
     inject_settings = ParacelsusSettingsForInject(
         graph_settings=ParacelsusSettingsForGraph(
-            base_class_path=get_base_class(base_class_path, settings.base),
+            base_class_path=get_base_class(
+                base_class_path, settings.base, required=from_url is None and snapshot is None
+            ),
             import_module=import_module + settings.imports,
             include_tables=set(include_tables + settings.include_tables),
             exclude_tables=set(exclude_tables + settings.exclude_tables),
+            focus=set(focus),
+            depth=depth,
+            direction=direction,
             python_dir=python_dir,
             format=format,
             column_sort=column_sort if column_sort is not None else settings.column_sort,
@@ -272,60 +598,213 @@ def inject(
             type_parameter_delimiter=type_parameter_delimiter
             if type_parameter_delimiter is not None
             else settings.type_parameter_delimiter,
+            cache_dir=get_cache_dir(cache_dir, cache, settings.cache),
+            extract=extract if extract is not None else settings.extract,
+            dialect=dialect if dialect is not None else settings.dialect,
+            from_url=from_url,
+            reflect_schemas=reflect_schema,
+            attach=dict(parse_attach(value) for value in attach),
+            snapshot=snapshot,
+            jobs=jobs,
         ),
-        file=file,
+        files=expand_files(file_patterns),
         replace_begin_tag=replace_begin_tag,
         replace_end_tag=replace_end_tag,
         check=check,
+        fingerprint=fingerprint,
     )
 
-    # Generate Graph
-    graph = get_graph_string(
-        **asdict(inject_settings.graph_settings),
-    )
-
-    comment_format = transformers[inject_settings.graph_settings.format].comment_format  # type: ignore
-
-    # Convert Graph to Injection String
-    graph_piece = f"""{inject_settings.replace_begin_tag}
-```{comment_format}
-{graph}
-```
-{inject_settings.replace_end_tag}"""
+    with profiled("inject", profile):
+        # Import the models once, every block of every file is rendered from the same schema.
+        graph_settings = inject_settings.graph_settings
+        schema = get_schema(
+            base_class_path=graph_settings.base_class_path,
+            import_module=graph_settings.import_module,
+            include_tables=set(),
+            exclude_tables=set(),
+            python_dir=graph_settings.python_dir,
+            cache_dir=graph_settings.cache_dir,
+            extract=graph_settings.extract,
+            dialect=graph_settings.dialect,
+            from_url=graph_settings.from_url,
+            reflect_schemas=graph_settings.reflect_schemas,
+            attach=graph_settings.attach,
+            snapshot=graph_settings.snapshot,
+            jobs=graph_settings.jobs,
+        )
+        render = BlockRenderer(schema, graph_settings)
 
-    # Get content from current file.
-    old_content = inject_settings.file.read_text()
+        diff_lines: List[str] = []
+        for file in inject_settings.files:
+            if inject_settings.check:
+                old_lines = file.read_text().splitlines(keepends=True)
+                with phase("inject"):
+                    new_lines = list(
+                        inject_blocks(
+                            old_lines,
+                            render,
+                            inject_settings.replace_begin_tag,
+                            inject_settings.replace_end_tag,
+                            str(file),
+                            fingerprint=render.fingerprint,
+                            add_fingerprints=inject_settings.fingerprint,
+                        )
+                    )
+                if new_lines == old_lines:
+                    continue
 
-    # Replace old content with newly generated content.
-    pattern = re.escape(inject_settings.replace_begin_tag) + "(.*)" + re.escape(inject_settings.replace_end_tag)
-    new_content = re.sub(pattern, graph_piece, old_content, flags=re.MULTILINE | re.DOTALL)
+                # Every file gets its own section in the combined diff.
+                old_name, new_name = ("old", "new") if len(inject_settings.files) == 1 else (str(file), str(file))
+                diff_lines.extend(unified_diff(old_lines, new_lines, fromfile=old_name, tofile=new_name, lineterm=""))
+            else:
+                inject_file(
+                    file,
+                    render,
+                    inject_settings.replace_begin_tag,
+                    inject_settings.replace_end_tag,
+                    fingerprint=render.fingerprint,
+                    add_fingerprints=inject_settings.fingerprint,
+                )
 
     # Return result depends on whether we're in check mode.
     if inject_settings.check:
-        if new_content == old_content:
+        if not diff_lines:
             # If content is the same then we passed the test.
             typer.echo("No changes detected.")
             sys.exit(0)
         else:
             # If content is different then we failed the test.
-            # Generate unified diff
-            diff = unified_diff(
-                old_content.splitlines(keepends=True),
-                new_content.splitlines(keepends=True),
-                fromfile="old",
-                tofile="new",
-                lineterm="",
-            )
-
             typer.echo("Changes detected. Diff:")
             typer.echo("")
-            for line in diff:
+            for line in diff_lines:
                 typer.echo(line.rstrip())
 
             sys.exit(1)
-    else:
-        # Dump newly generated contents back to file.
-        inject_settings.file.write_text(new_content)
+
+
+@app.command(help="Keep injected graphs and graph files up to date while the models are being edited.")
+def watch(
+    config: ConfigOption,
+    files: Annotated[
+        Optional[List[str]],
+        typer.Argument(
+            help="The files to inject the generated graph into, or glob patterns such as `docs/**/*.md`. "
+            "They can be followed by the SQLAlchemy base class used by the database to graph.",
+            metavar="[FILES...] [BASE_CLASS_PATH]",
+            show_default=False,
+            callback=check_inject_files,
+        ),
+    ] = None,
+    replace_begin_tag: BeginTagOption = "<!-- BEGIN_SQLALCHEMY_DOCS -->",
+    replace_end_tag: EndTagOption = "<!-- END_SQLALCHEMY_DOCS -->",
+    import_module: ImportModuleOption = [],
+    exclude_tables: ExcludeTablesOption = [],
+    include_tables: IncludeTablesOption = [],
+    focus: FocusOption = [],
+    depth: DepthOption = FOCUS_DEPTH_DEFAULT,
+    direction: DirectionOption = FOCUS_DIRECTION_DEFAULT,
+    python_dir: PythonDirOption = [],
+    # Typer will fail to render the help message with an enum default, but this code works.
+    format: BlockFormatOption = Formats.mermaid.value,  # type: ignore
+    column_sort: ColumnSortOption = None,
+    omit_comments: OmitCommentsOption = None,
+    max_enum_members: MaxEnumMembersOption = None,
+    layout: LayoutOption = None,
+    type_parameter_delimiter: TypeParameterDelimiterOption = None,
+    extract: ExtractOption = None,
+    dialect: DialectOption = None,
+    output: Annotated[
+        Optional[Path],
+        typer.Option(
+            "--output",
+            help="Also keep the graph written to this file.",
+            file_okay=True,
+            dir_okay=False,
+            resolve_path=True,
+        ),
+    ] = None,
+    interval: Annotated[
+        float,
+        typer.Option(
+            "--interval",
+            help="Seconds between checks of the model files for changes.",
+            min=0.05,
+        ),
+    ] = 0.5,
+):
+    from .inject import expand_files, split_inject_arguments
+    from .watch import Watcher
+
+    settings = get_pyproject_settings(config_file=config)
+    file_patterns, base_class_path = split_inject_arguments(files or [])
+    if not file_patterns and output is None:
+        raise ValueError("Nothing to watch for, give files to inject into or an --output file.")
+
+    graph_settings = ParacelsusSettingsForGraph(
+        base_class_path=get_base_class(base_class_path, settings.base),
+        import_module=import_module + settings.imports,
+        include_tables=set(include_tables + settings.include_tables),
+        exclude_tables=set(exclude_tables + settings.exclude_tables),
+        focus=set(focus),
+        depth=depth,
+        direction=direction,
+        python_dir=python_dir,
+        format=format,
+        column_sort=column_sort if column_sort is not None else settings.column_sort,
+        omit_comments=omit_comments if omit_comments is not None else settings.omit_comments,
+        max_enum_members=max_enum_members if max_enum_members is not None else settings.max_enum_members,
+        layout=layout,
+        type_parameter_delimiter=type_parameter_delimiter
+        if type_parameter_delimiter is not None
+        else settings.type_parameter_delimiter,
+        # Every edit changes the fingerprint of the models, so caching their schemas would only fill the cache.
+        cache_dir=None,
+        extract=extract if extract is not None else settings.extract,
+        dialect=dialect if dialect is not None else settings.dialect,
+        from_url=None,
+        reflect_schemas=[],
+        attach={},
+        snapshot=None,
+        jobs=1,
+    )
+
+    watcher = Watcher(
+        graph_settings,
+        files=expand_files(file_patterns),
+        output=output,
+        begin_tag=replace_begin_tag,
+        end_tag=replace_end_tag,
+    )
+    written = watcher.update()
+    typer.echo(f"Updated {len(written)} file(s).")
+    try:
+        watcher.run(interval, echo=typer.echo)
+    except KeyboardInterrupt:
+        pass
+
+
+@app.command(help="Serve the graph and inject commands from a long running process, which keeps everything imported.")
+def serve(
+    socket: Annotated[
+        Optional[Path],
+        typer.Option(
+            "--socket",
+            help="Unix socket to listen on. Defaults to `$PARACELSUS_SOCKET` or a socket private to the current "
+            "directory.",
+            dir_okay=False,
+            resolve_path=True,
+        ),
+    ] = None,
+):
+    path = socket if socket is not None else default_socket_path()
+    server = DaemonServer(path, root=Path.cwd())
+    typer.echo(f"Listening on {path}.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
 
 
 @app.command(help="Display the current installed version of paracelsus.")
@@ -1,3 +1,4 @@
+import re
 from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
@@ -21,10 +22,24 @@ class Layouts(str, Enum):
     elk = "elk"
 
 
+class ExtractModes(str, Enum):
+    imports = "import"
+    static = "static"
+
+
+class FocusDirections(str, Enum):
+    incoming = "in"
+    outgoing = "out"
+    both = "both"
+
+
 SORT_DEFAULT: Final[ColumnSorts] = ColumnSorts.key_based
 OMIT_COMMENTS_DEFAULT: Final[bool] = False
 MAX_ENUM_MEMBERS_DEFAULT: Final[int] = 3
 TYPE_PARAMETER_DELIMITER_DEFAULT: Final[str] = "-"
+EXTRACT_DEFAULT: Final[ExtractModes] = ExtractModes.imports
+FOCUS_DEPTH_DEFAULT: Final[int] = 1
+FOCUS_DIRECTION_DEFAULT: Final[FocusDirections] = FocusDirections.both
 
 
 def validate_layout(*, format: Formats, layout: Layouts | None) -> None:
@@ -33,6 +48,34 @@ def validate_layout(*, format: Formats, layout: Layouts | None) -> None:
         raise ValueError("The `layout` parameter can only be used with the `mermaid` format.")
 
 
+def parse_format_output(value: str) -> tuple[Formats, Path | None]:
+    """Parse a ``FORMAT`` or ``FORMAT=PATH`` output specification."""
+    format, separator, path = value.partition("=")
+    try:
+        parsed_format = Formats(format)
+    except ValueError:
+        raise ValueError(
+            f"Unknown format '{format}', expected one of: {', '.join(item.value for item in Formats)}."
+        ) from None
+    if separator and not path:
+        raise ValueError(f"Missing output path for format '{format}'.")
+    return parsed_format, Path(path) if path else None
+
+
+# Attached SQLite databases are named in SQL, so their names are restricted to plain identifiers.
+ATTACH_NAME_PATTERN = re.compile(r"^\w+$")
+
+
+def parse_attach(value: str) -> tuple[str, Path]:
+    """Parse a ``NAME=PATH`` database to attach."""
+    name, separator, path = value.partition("=")
+    if not separator or not path:
+        raise ValueError(f"Expected NAME=PATH for the database to attach, got '{value}'.")
+    if not ATTACH_NAME_PATTERN.match(name):
+        raise ValueError(f"Invalid name '{name}' for an attached database, use letters, digits and underscores.")
+    return name, Path(path)
+
+
 @dataclass(frozen=True)
 class ParacelsusTomlConfig:
     """Structure containing configuration options loaded from ``pyproject.toml``.
@@ -48,6 +91,9 @@ class ParacelsusTomlConfig:
     omit_comments: bool = OMIT_COMMENTS_DEFAULT
     max_enum_members: int = MAX_ENUM_MEMBERS_DEFAULT
     type_parameter_delimiter: str = TYPE_PARAMETER_DELIMITER_DEFAULT
+    extract: ExtractModes = EXTRACT_DEFAULT
+    dialect: str | None = None
+    cache: bool = False
 
 
 @dataclass(frozen=True)
@@ -62,6 +108,9 @@ class ParacelsusSettingsForGraph:
     import_module: list[str]
     include_tables: set[str]
     exclude_tables: set[str]
+    focus: set[str]
+    depth: int
+    direction: FocusDirections
     python_dir: list[Path]
     format: Formats
     column_sort: ColumnSorts
@@ -69,6 +118,14 @@ class ParacelsusSettingsForGraph:
     max_enum_members: int
     layout: Layouts | None
     type_parameter_delimiter: str
+    cache_dir: Path | None
+    extract: ExtractModes
+    dialect: str | None
+    from_url: str | None
+    reflect_schemas: list[str]
+    attach: dict[str, Path]
+    snapshot: Path | None
+    jobs: int
 
     def __post_init__(self) -> None:
         validate_layout(format=self.format, layout=self.layout)
@@ -83,7 +140,8 @@ class ParacelsusSettingsForInject:
     """
 
     graph_settings: ParacelsusSettingsForGraph
-    file: Path
+    files: list[Path]
     replace_begin_tag: str
     replace_end_tag: str
     check: bool
+    fingerprint: bool
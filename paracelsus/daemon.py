@@ -0,0 +1,282 @@
+"""Serve ``graph`` and ``inject`` from a long running process.
+
+Starting the interpreter and importing Typer, SQLAlchemy and the models usually takes far longer than rendering the
+diagram. ``paracelsus serve`` keeps all of them imported and listens on a Unix socket private to the user and the
+project directory. When ``PARACELSUS_DAEMON`` is set, the ``paracelsus`` command forwards ``graph`` and ``inject`` to
+it if it is running, and runs them itself otherwise.
+
+Forwarded commands run with the environment of the client, and their output is streamed back to it as it is written.
+The socket and its directory are only used if they belong to the current user and nobody else can access them.
+
+This module is imported by every invocation of the command, so anything beyond the standard library is only imported
+by the server.
+"""
+
+import hashlib
+import io
+import json
+import os
+import site
+import socket
+import socketserver
+import stat
+import sys
+import tempfile
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, TextIO, Tuple
+
+SOCKET_ENVIRONMENT_VARIABLE = "PARACELSUS_SOCKET"
+DAEMON_ENVIRONMENT_VARIABLE = "PARACELSUS_DAEMON"
+
+FORWARDED_COMMANDS = ("graph", "inject")
+
+CONNECT_TIMEOUT = 1.0
+
+Response = Dict[str, Any]
+
+
+def default_socket_path(directory: Optional[Path] = None) -> Path:
+    """The socket of the daemon serving a project directory, which can be overridden with ``PARACELSUS_SOCKET``."""
+    if os.environ.get(SOCKET_ENVIRONMENT_VARIABLE):
+        return Path(os.environ[SOCKET_ENVIRONMENT_VARIABLE])
+
+    directory = (directory or Path.cwd()).resolve()
+    # Socket paths are limited to about a hundred characters, so the directory is only identified by a hash.
+    name = hashlib.sha256(str(directory).encode()).hexdigest()[:16]
+    if os.environ.get("XDG_RUNTIME_DIR"):
+        return Path(os.environ["XDG_RUNTIME_DIR"]) / "paracelsus" / f"{name}.sock"
+    return Path(tempfile.gettempdir()) / f"paracelsus-{os.getuid()}" / f"{name}.sock"
+
+
+def check_private(path: Path, file_type: Callable[[int], bool]) -> None:
+    """Refuse a path which isn't of the expected type, owned by the current user and inaccessible to anyone else.
+
+    Symbolic links are refused as well, so another user can't redirect the daemon or its clients elsewhere.
+    """
+    status = os.lstat(path)
+    if not file_type(status.st_mode) or status.st_uid != os.getuid() or status.st_mode & 0o077:
+        raise ValueError(f"Refusing to use {path}, it has to be owned by the current user and private to them.")
+
+
+def forward(
+    argv: List[str],
+    path: Optional[Path] = None,
+    stdout: Optional[TextIO] = None,
+    stderr: Optional[TextIO] = None,
+) -> Optional[Response]:
+    """Run a command on the daemon. Returns None when no daemon is listening.
+
+    The output of the command is written to ``stdout`` and ``stderr`` as it arrives, when they are given, and is
+    returned along with its exit code either way.
+    """
+    path = path or default_socket_path()
+    if not path.exists():
+        return None
+    check_private(path.parent, stat.S_ISDIR)
+    check_private(path, stat.S_ISSOCK)
+
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.settimeout(CONNECT_TIMEOUT)
+        try:
+            connection.connect(str(path))
+        except OSError:
+            # A socket left behind by a daemon which didn't shut down cleanly.
+            return None
+        connection.settimeout(None)
+        request = {"argv": argv, "cwd": os.getcwd(), "environ": dict(os.environ)}
+        connection.sendall(json.dumps(request).encode() + b"\n")
+        connection.shutdown(socket.SHUT_WR)
+
+        streams = {"stdout": stdout, "stderr": stderr}
+        output: Dict[str, List[str]] = {"stdout": [], "stderr": []}
+        with connection.makefile("r", encoding="utf-8") as messages:
+            for line in messages:
+                message = json.loads(line)
+                if "exit_code" in message:
+                    return {"exit_code": message["exit_code"], **{key: "".join(text) for key, text in output.items()}}
+                stream = streams[message["stream"]]
+                if stream is not None:
+                    stream.write(message["text"])
+                    stream.flush()
+                output[message["stream"]].append(message["text"])
+    finally:
+        connection.close()
+
+    # The daemon stopped before the command finished.
+    return None
+
+
+def main() -> None:
+    """The ``paracelsus`` command: forward to the daemon when it is enabled and running, otherwise run it here."""
+    argv = sys.argv[1:]
+    if argv and argv[0] in FORWARDED_COMMANDS and os.environ.get(DAEMON_ENVIRONMENT_VARIABLE):
+        try:
+            response = forward(argv, stdout=sys.stdout, stderr=sys.stderr)
+        except ValueError as error:
+            sys.stderr.write(f"{error} Running the command without the daemon.\n")
+            response = None
+        if response is not None:
+            sys.exit(response["exit_code"])
+
+    from .cli import app
+
+    app()
+
+
+def _exit_code(code: Any) -> int:
+    if code is None:
+        return 0
+    return code if isinstance(code, int) else 1
+
+
+class ProjectModules:
+    """Track the modules imported from a project directory, to import them again once one of their files changes.
+
+    Every project module is dropped when any of them changes: the models all register themselves with the metadata of
+    the base class, so importing only some of them again would leave the old tables behind.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = str(root.resolve())
+        excluded = {sys.prefix, sys.base_prefix, *site.getsitepackages(), site.getusersitepackages()}
+        self._excluded = tuple(os.path.join(os.path.realpath(path), "") for path in excluded)
+        self._states: Dict[str, Tuple[str, Optional[int]]] = {}
+
+    def _is_project_file(self, file: str) -> bool:
+        return file.startswith(os.path.join(self.root, "")) and not file.startswith(self._excluded)
+
+    def record(self) -> None:
+        """Remember the files of the project modules which are currently imported."""
+        for name, module in list(sys.modules.items()):
+            file = getattr(module, "__file__", None)
+            if name in self._states or not file or name.split(".")[0] == "paracelsus":
+                continue
+            file = os.path.realpath(file)
+            if self._is_project_file(file):
+                self._states[name] = (file, self._mtime(file))
+
+    def invalidate(self, force: bool = False) -> bool:
+        """Drop every project module if one of their files changed. Returns True if they were dropped."""
+        if not force and all(self._mtime(file) == mtime for file, mtime in self._states.values()):
+            return False
+        for name in self._states:
+            sys.modules.pop(name, None)
+        self._states = {}
+        return True
+
+    @staticmethod
+    def _mtime(file: str) -> Optional[int]:
+        try:
+            return os.stat(file).st_mtime_ns
+        except OSError:
+            return None
+
+
+class _OutputStream(io.TextIOBase):
+    """Send everything written to a stream of the command to the client right away."""
+
+    def __init__(self, name: str, send: Callable[[Dict[str, Any]], None]) -> None:
+        self.name = name
+        self._send = send
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        # Like any text stream, refuse bytes, which Click checks for to tell text and binary streams apart.
+        if not isinstance(text, str):
+            raise TypeError(f"write() argument must be str, not {type(text).__name__}")
+        if text:
+            self._send({"stream": self.name, "text": text})
+        return len(text)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    server: "DaemonServer"
+
+    def handle(self) -> None:
+        line = self.rfile.readline()
+        if not line:
+            # A client checking whether the daemon is running.
+            return
+        request = json.loads(line)
+        exit_code = self.server.run(request["argv"], Path(request["cwd"]), request["environ"], self._send)
+        self._send({"exit_code": exit_code})
+
+    def _send(self, message: Dict[str, Any]) -> None:
+        try:
+            self.wfile.write(json.dumps(message).encode() + b"\n")
+            self.wfile.flush()
+        except OSError:
+            # The client went away, the command still runs to completion.
+            pass
+
+
+class DaemonServer(socketserver.UnixStreamServer):
+    """Run forwarded commands one at a time, keeping everything they import for the next ones."""
+
+    def __init__(self, path: Path, root: Path) -> None:
+        from .cli import app
+
+        self.app = app
+        self.path = path
+        self.modules = ProjectModules(root)
+        self._environ: Optional[Dict[str, str]] = None
+
+        path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        # The directory may have been created by someone else, who could then replace the socket.
+        check_private(path.parent, stat.S_ISDIR)
+        if is_listening(path):
+            raise ValueError(f"A daemon is already listening on {path}.")
+        path.unlink(missing_ok=True)
+        super().__init__(str(path), _RequestHandler)
+        os.chmod(path, 0o600)
+
+    def run(self, argv: List[str], cwd: Path, environ: Dict[str, str], send: Callable[[Dict[str, Any]], None]) -> int:
+        """Run a command with the working directory and environment of the client, sending its output as it goes."""
+        stdout, stderr = _OutputStream("stdout", send), _OutputStream("stderr", send)
+        if not argv or argv[0] not in FORWARDED_COMMANDS:
+            stderr.write(f"The daemon only runs {', '.join(FORWARDED_COMMANDS)}.\n")
+            return 2
+
+        os.chdir(cwd)
+        # The models may read the environment when they are imported, so a different one imports them again.
+        self.modules.invalidate(force=self._environ is not None and environ != self._environ)
+        self._environ = environ
+        daemon_environ = dict(os.environ)
+        os.environ.clear()
+        os.environ.update(environ)
+        try:
+            with redirect_stdout(stdout), redirect_stderr(stderr):
+                try:
+                    self.app(args=argv, prog_name="paracelsus")
+                    exit_code = 0
+                except SystemExit as error:
+                    exit_code = _exit_code(error.code)
+                except Exception:
+                    traceback.print_exc()
+                    exit_code = 1
+        finally:
+            os.environ.clear()
+            os.environ.update(daemon_environ)
+        self.modules.record()
+        return exit_code
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.path.unlink(missing_ok=True)
+
+
+def is_listening(path: Path) -> bool:
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.settimeout(CONNECT_TIMEOUT)
+        connection.connect(str(path))
+        return True
+    except OSError:
+        return False
+    finally:
+        connection.close()
@@ -0,0 +1,35 @@
+import filecmp
+import os
+import stat
+from pathlib import Path
+from typing import Iterable
+from uuid import uuid4
+
+
+def write_if_changed(path: Path, chunks: Iterable[str]) -> bool:
+    """Write the chunks to a file, but only replace the file when its content actually changes.
+
+    The content is streamed into a temporary file next to the target, which is compared with the current file and
+    then either discarded or atomically renamed over it. Readers and concurrent writers never see a partial file,
+    and an unchanged file keeps its modification time. A symlink is followed and its target replaced, the link itself
+    is kept. Returns True if the file was written.
+    """
+    # Renaming over a symlink would replace the link with a regular file, so the temporary file goes next to the target.
+    path = Path(os.path.realpath(path))
+    # Opening a new file (rather than using mkstemp) lets the umask decide the permissions of new files.
+    temporary_path = path.with_name(f".{path.name}.{uuid4().hex}.tmp")
+    try:
+        with temporary_path.open("x") as fp:
+            fp.writelines(chunks)
+
+        if path.is_file() and filecmp.cmp(path, temporary_path, shallow=False):
+            temporary_path.unlink()
+            return False
+
+        if path.exists():
+            os.chmod(temporary_path, stat.S_IMODE(path.stat().st_mode))
+        os.replace(temporary_path, path)
+        return True
+    except BaseException:
+        temporary_path.unlink(missing_ok=True)
+        raise
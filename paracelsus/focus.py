@@ -0,0 +1,80 @@
+"""Select the neighborhood of some tables, for ``--focus``.
+
+The foreign keys between the tables are indexed once in both directions. The neighborhood is then collected with a
+breadth first search over that index, which only visits the tables (and foreign keys) within reach of the focused
+tables, however large the rest of the schema is.
+"""
+
+from collections import deque
+from typing import TYPE_CHECKING, Dict, Iterable, List, Set, Tuple
+
+from .config import FocusDirections
+
+if TYPE_CHECKING:
+    from sqlalchemy.sql.schema import Table
+
+    from .metadata import SchemaSource
+    from .schema import Schema
+
+
+class ForeignKeyIndex:
+    """The tables each table refers to (``outgoing``) and is referred to by (``incoming``) through foreign keys."""
+
+    def __init__(self, references: Iterable[Tuple[str, Iterable[str]]]) -> None:
+        self.outgoing: Dict[str, Tuple[str, ...]] = {}
+        incoming: Dict[str, List[str]] = {}
+        for table, referred_tables in references:
+            # A table referring to another one through several columns is only one hop away from it.
+            referred = tuple(dict.fromkeys(referred_tables))
+            self.outgoing[table] = referred
+            for referred_table in referred:
+                incoming.setdefault(referred_table, []).append(table)
+        self.incoming: Dict[str, Tuple[str, ...]] = {table: tuple(tables) for table, tables in incoming.items()}
+
+    @classmethod
+    def from_schema(cls, schema: "Schema") -> "ForeignKeyIndex":
+        # The edges of a schema only hold the foreign keys to tables which are part of it.
+        return cls((table, (edge.referred_table for edge in edges)) for table, edges in schema.edges.items())
+
+    @classmethod
+    def from_metadata(cls, source: "SchemaSource") -> "ForeignKeyIndex":
+        tables = source.tables
+        return cls(
+            (key, (referred for referred in _referred_tables(table) if referred in tables))
+            for key, table in tables.items()
+        )
+
+    def neighborhood(self, focus: Iterable[str], depth: int, direction: FocusDirections) -> Set[str]:
+        """Collect the focused tables and the tables at most ``depth`` foreign keys away from them.
+
+        The ``out`` direction follows foreign keys to the tables they refer to, ``in`` follows them back to the tables
+        holding them, and ``both`` follows either.
+        """
+        focus = list(dict.fromkeys(focus))
+        unknown = [table for table in focus if table not in self.outgoing]
+        if unknown:
+            raise ValueError(f"Tables to focus on don't exist: {', '.join(unknown)}.")
+
+        adjacency = []
+        if direction in (FocusDirections.outgoing, FocusDirections.both):
+            adjacency.append(self.outgoing)
+        if direction in (FocusDirections.incoming, FocusDirections.both):
+            adjacency.append(self.incoming)
+
+        selected = set(focus)
+        frontier = deque((table, 0) for table in focus)
+        while frontier:
+            table, distance = frontier.popleft()
+            if distance == depth:
+                continue
+            for neighbors in adjacency:
+                for neighbor in neighbors.get(table, ()):
+                    if neighbor not in selected:
+                        selected.add(neighbor)
+                        frontier.append((neighbor, distance + 1))
+        return selected
+
+
+def _referred_tables(table: "Table") -> Iterable[str]:
+    for foreign_key in table.foreign_keys:
+        yield foreign_key.target_fullname.rpartition(".")[0]
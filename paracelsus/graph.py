@@ -1,22 +1,62 @@
 import importlib
+import io
+import logging
 import os
-import re
 import sys
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Union
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Mapping, Optional, Set, Union
 
 from sqlalchemy.schema import MetaData
 
-from .config import Layouts
-from .transformers.dot import Dot
-from .transformers.mermaid import Mermaid
+from .cache import SchemaCache, schema_fingerprint
+from .config import FOCUS_DEPTH_DEFAULT, FOCUS_DIRECTION_DEFAULT, ExtractModes, FocusDirections, Layouts
+from .files import write_if_changed
+from .focus import ForeignKeyIndex
+from .matcher import get_table_matcher
+from .metadata import MetadataView, SchemaSource
+from .profiling import phase
+from .reflect import reflect_metadata
+from .schema import Schema, dump_schema, extract_schema, load_schema
+from .static import static_metadata
 
-transformers: Dict[str, type[Union[Mermaid, Dot]]] = {
-    "mmd": Mermaid,
-    "mermaid": Mermaid,
-    "dot": Dot,
-    "gv": Dot,
-}
+if TYPE_CHECKING:
+    from .transformers.dot import Dot
+    from .transformers.mermaid import Mermaid
+
+logger = logging.getLogger(__name__)
+
+# The transformer of any format.
+Transformer = Union["Mermaid", "Dot"]
+
+
+class TransformerRegistry(Mapping[str, Any]):
+    """The transformer class of every format, only imported once the format is used.
+
+    Rendering Mermaid never loads the Dot transformer (nor its optional pydot backend), and the other way around.
+    """
+
+    def __init__(self, classes: Dict[str, str]) -> None:
+        self._classes = classes
+
+    def __getitem__(self, format: str) -> Any:
+        module, _, name = self._classes[format].partition(":")
+        return getattr(importlib.import_module(module), name)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._classes)
+
+    def __len__(self) -> int:
+        return len(self._classes)
+
+
+transformers = TransformerRegistry(
+    {
+        "mmd": "paracelsus.transformers.mermaid:Mermaid",
+        "mermaid": "paracelsus.transformers.mermaid:Mermaid",
+        "dot": "paracelsus.transformers.dot:Dot",
+        "gv": "paracelsus.transformers.dot:Dot",
+    }
+)
 
 
 def get_graph_string(
@@ -32,11 +72,332 @@ def get_graph_string(
     max_enum_members: int = 0,
     layout: Optional[Layouts] = None,
     type_parameter_delimiter: str = "-",
+    cache_dir: Optional[Path] = None,
+    extract: ExtractModes = ExtractModes.imports,
+    dialect: Optional[str] = None,
+    from_url: Optional[str] = None,
+    reflect_schemas: Optional[List[str]] = None,
+    attach: Optional[Dict[str, Path]] = None,
+    snapshot: Optional[Path] = None,
+    jobs: int = 1,
+    focus: Optional[Set[str]] = None,
+    depth: int = FOCUS_DEPTH_DEFAULT,
+    direction: FocusDirections = FOCUS_DIRECTION_DEFAULT,
 ) -> str:
+    """Render the graph into a single string."""
+    return str(
+        get_graph(
+            base_class_path=base_class_path,
+            import_module=import_module,
+            include_tables=include_tables,
+            exclude_tables=exclude_tables,
+            python_dir=python_dir,
+            format=format,
+            column_sort=column_sort,
+            omit_comments=omit_comments,
+            max_enum_members=max_enum_members,
+            layout=layout,
+            type_parameter_delimiter=type_parameter_delimiter,
+            cache_dir=cache_dir,
+            extract=extract,
+            dialect=dialect,
+            from_url=from_url,
+            reflect_schemas=reflect_schemas,
+            attach=attach,
+            snapshot=snapshot,
+            jobs=jobs,
+            focus=focus,
+            depth=depth,
+            direction=direction,
+        )
+    )
+
+
+def get_graph(
+    *,
+    base_class_path: str,
+    import_module: List[str],
+    include_tables: Set[str],
+    exclude_tables: Set[str],
+    python_dir: List[Path],
+    format: str,
+    column_sort: str,
+    omit_comments: bool = False,
+    max_enum_members: int = 0,
+    layout: Optional[Layouts] = None,
+    type_parameter_delimiter: str = "-",
+    cache_dir: Optional[Path] = None,
+    extract: ExtractModes = ExtractModes.imports,
+    dialect: Optional[str] = None,
+    from_url: Optional[str] = None,
+    reflect_schemas: Optional[List[str]] = None,
+    attach: Optional[Dict[str, Path]] = None,
+    snapshot: Optional[Path] = None,
+    jobs: int = 1,
+    focus: Optional[Set[str]] = None,
+    depth: int = FOCUS_DEPTH_DEFAULT,
+    direction: FocusDirections = FOCUS_DIRECTION_DEFAULT,
+) -> Transformer:
+    return get_graphs(
+        base_class_path=base_class_path,
+        import_module=import_module,
+        include_tables=include_tables,
+        exclude_tables=exclude_tables,
+        python_dir=python_dir,
+        formats=[format],
+        column_sort=column_sort,
+        omit_comments=omit_comments,
+        max_enum_members=max_enum_members,
+        layout=layout,
+        type_parameter_delimiter=type_parameter_delimiter,
+        cache_dir=cache_dir,
+        extract=extract,
+        dialect=dialect,
+        from_url=from_url,
+        reflect_schemas=reflect_schemas,
+        attach=attach,
+        snapshot=snapshot,
+        jobs=jobs,
+        focus=focus,
+        depth=depth,
+        direction=direction,
+    )[format]
+
+
+def get_graphs(
+    *,
+    base_class_path: str,
+    import_module: List[str],
+    include_tables: Set[str],
+    exclude_tables: Set[str],
+    python_dir: List[Path],
+    formats: List[str],
+    column_sort: str,
+    omit_comments: bool = False,
+    max_enum_members: int = 0,
+    layout: Optional[Layouts] = None,
+    type_parameter_delimiter: str = "-",
+    cache_dir: Optional[Path] = None,
+    extract: ExtractModes = ExtractModes.imports,
+    dialect: Optional[str] = None,
+    from_url: Optional[str] = None,
+    reflect_schemas: Optional[List[str]] = None,
+    attach: Optional[Dict[str, Path]] = None,
+    snapshot: Optional[Path] = None,
+    jobs: int = 1,
+    focus: Optional[Set[str]] = None,
+    depth: int = FOCUS_DEPTH_DEFAULT,
+    direction: FocusDirections = FOCUS_DIRECTION_DEFAULT,
+) -> Dict[str, Transformer]:
+    """Build the transformers of several formats, importing and filtering the models only once.
+
+    The layout only applies to the Mermaid formats.
+    """
+    for format in formats:
+        if format not in transformers:
+            raise ValueError(f"Unknown Format: {format}")
+
+    schema = get_schema(
+        base_class_path=base_class_path,
+        import_module=import_module,
+        include_tables=include_tables,
+        exclude_tables=exclude_tables,
+        python_dir=python_dir,
+        cache_dir=cache_dir,
+        extract=extract,
+        dialect=dialect,
+        from_url=from_url,
+        reflect_schemas=reflect_schemas,
+        attach=attach,
+        snapshot=snapshot,
+        jobs=jobs,
+        focus=focus,
+        depth=depth,
+        direction=direction,
+    )
+    return {
+        format: get_transformer(
+            schema,
+            format=format,
+            column_sort=column_sort,
+            omit_comments=omit_comments,
+            max_enum_members=max_enum_members,
+            layout=layout,
+            type_parameter_delimiter=type_parameter_delimiter,
+            jobs=jobs,
+        )
+        for format in formats
+    }
+
+
+def get_schema(
+    *,
+    base_class_path: str,
+    import_module: List[str],
+    include_tables: Set[str],
+    exclude_tables: Set[str],
+    python_dir: List[Path],
+    cache_dir: Optional[Path] = None,
+    extract: ExtractModes = ExtractModes.imports,
+    dialect: Optional[str] = None,
+    from_url: Optional[str] = None,
+    reflect_schemas: Optional[List[str]] = None,
+    attach: Optional[Dict[str, Path]] = None,
+    snapshot: Optional[Path] = None,
+    jobs: int = 1,
+    focus: Optional[Set[str]] = None,
+    depth: int = FOCUS_DEPTH_DEFAULT,
+    direction: FocusDirections = FOCUS_DIRECTION_DEFAULT,
+) -> Schema:
+    """Import the models, select the tables to graph and extract them into a ``Schema``.
+
+    The result can be rendered by any number of transformers without touching SQLAlchemy again.
+
+    With the static ``extract`` mode the models are read from their source files instead of being imported.
+
+    Column types are compiled for the named SQL ``dialect``, such as ``postgresql``, or SQLAlchemy's default one.
+
+    When a ``cache_dir`` is given the extracted schema is cached there, keyed by a fingerprint of the model sources.
+    Runs with an unchanged fingerprint load the schema from the cache and don't import the models at all.
+
+    Given a database URL with ``from_url``, the tables are reflected from the database instead of the models (see
+    ``reflect_metadata``). The reflected schema is then saved to the ``snapshot`` file, if there is one. Without a URL
+    the schema is read back from the ``snapshot`` file instead.
+
+    Given tables to ``focus`` on, only the tables within ``depth`` foreign keys of them in the given ``direction`` are
+    graphed (see ``ForeignKeyIndex.neighborhood``). The include and exclude patterns then apply to those tables.
+    """
+    selection: Dict[str, Any] = dict(
+        include_tables=include_tables, exclude_tables=exclude_tables, focus=focus, depth=depth, direction=direction
+    )
+    if from_url is not None:
+        with phase("reflect"):
+            metadata = reflect_metadata(from_url, schemas=reflect_schemas, attach=attach, jobs=jobs)
+        if snapshot is None:
+            return _extract_tables(metadata, dialect=dialect, **selection)
+        # The snapshot holds every table so it can be reused with other include or exclude patterns.
+        with phase("extract"):
+            reflected = extract_schema(metadata, dialect=dialect)
+        with phase("snapshot_store"):
+            write_snapshot(snapshot, reflected)
+        with phase("resolve"):
+            return select_tables(reflected, **selection)
+
+    if snapshot is not None:
+        with phase("snapshot_load"):
+            snapshot_schema = read_snapshot(snapshot)
+        with phase("resolve"):
+            return select_tables(snapshot_schema, **selection)
+
+    cache = SchemaCache(cache_dir) if cache_dir is not None else None
+    fingerprint = None
+    schema: Optional[Schema] = None
+    if cache is not None:
+        with phase("cache_load"):
+            fingerprint = schema_fingerprint(
+                base_class_path=base_class_path,
+                import_module=import_module,
+                roots=[Path(os.getcwd()), *python_dir],
+                settings={"extract": ExtractModes(extract).value, "dialect": dialect},
+            )
+            schema = cache.get(fingerprint) if fingerprint is not None else None
+
+    if schema is None:
+        with phase("import"):
+            if extract == ExtractModes.static:
+                metadata = static_metadata(
+                    base_class_path=base_class_path,
+                    import_module=import_module,
+                    roots=[Path(os.getcwd()), *python_dir],
+                )
+            else:
+                metadata = import_metadata(
+                    base_class_path=base_class_path, import_module=import_module, python_dir=python_dir
+                )
+        if cache is None or fingerprint is None:
+            return _extract_tables(metadata, dialect=dialect, **selection)
+
+        # The cached schema holds every table so it can be reused with other include or exclude patterns.
+        with phase("extract"):
+            schema = extract_schema(metadata, dialect=dialect)
+        with phase("cache_store"):
+            cache.put(fingerprint, schema)
+
+    with phase("resolve"):
+        return select_tables(schema, **selection)
+
+
+def _extract_tables(
+    metadata: MetaData,
+    *,
+    include_tables: Set[str],
+    exclude_tables: Set[str],
+    focus: Optional[Set[str]],
+    depth: int,
+    direction: FocusDirections,
+    dialect: Optional[str],
+) -> Schema:
+    """Extract only the tables to graph."""
+    with phase("resolve"):
+        if focus:
+            all_tables = ForeignKeyIndex.from_metadata(metadata).neighborhood(focus, depth, direction)
+        else:
+            all_tables = set(metadata.tables.keys())
+        include_tables = resolve_included_tables(
+            include_tables=include_tables, exclude_tables=exclude_tables, all_tables=all_tables
+        )
+    with phase("filter"):
+        source = filter_metadata(metadata=metadata, include_tables=include_tables)
+    with phase("extract"):
+        return extract_schema(source, dialect=dialect)
+
+
+def read_snapshot(path: Path) -> Schema:
+    """Read a schema saved by ``write_snapshot``."""
+    try:
+        with path.open() as fp:
+            return load_schema(fp)
+    except FileNotFoundError:
+        raise ValueError(f"Schema snapshot {path} doesn't exist.") from None
+
+
+def write_snapshot(path: Path, schema: Schema) -> None:
+    """Save a schema to a file, which is only replaced if the schema changed."""
+    buffer = io.StringIO()
+    dump_schema(schema, buffer)
+    write_if_changed(path, [buffer.getvalue()])
+
+
+def select_tables(
+    schema: Schema,
+    *,
+    include_tables: Set[str],
+    exclude_tables: Set[str],
+    focus: Optional[Set[str]] = None,
+    depth: int = FOCUS_DEPTH_DEFAULT,
+    direction: FocusDirections = FOCUS_DIRECTION_DEFAULT,
+) -> Schema:
+    """Keep only the tables which were included / not-excluded, among the neighborhood of the focused tables if any."""
+    if focus:
+        # The index is kept on the schema, so every selection made from the same schema reuses it.
+        all_tables = schema.foreign_key_index.neighborhood(focus, depth, direction)
+    else:
+        all_tables = set(schema.tables.keys())
+    include_tables = resolve_included_tables(
+        include_tables=include_tables, exclude_tables=exclude_tables, all_tables=all_tables
+    )
+    if include_tables.issuperset(schema.tables.keys()):
+        return schema
+    return schema.subset(include_tables)
+
+
+def import_metadata(*, base_class_path: str, import_module: List[str], python_dir: List[Path]) -> MetaData:
+    """Import the base class and the model modules, and return the metadata holding all of their tables."""
     # Update the PYTHON_PATH to allow more module imports.
-    sys.path.append(str(os.getcwd()))
-    for dir in python_dir:
-        sys.path.append(str(dir))
+    for dir in [os.getcwd(), *python_dir]:
+        # Models can be imported several times in one process (by ``watch``), don't grow the path every time.
+        if str(dir) not in sys.path:
+            sys.path.append(str(dir))
 
     # Import the base class so the metadata class can be extracted from it.
     # The metadata class is passed to the transformer.
@@ -55,30 +416,41 @@ def get_graph_string(
         else:
             importlib.import_module(module)
 
-    # Grab a transformer.
+    return metadata
+
+
+def get_transformer(
+    schema: Schema,
+    *,
+    format: str,
+    column_sort: str,
+    omit_comments: bool = False,
+    max_enum_members: int = 0,
+    layout: Optional[Layouts] = None,
+    type_parameter_delimiter: str = "-",
+    jobs: int = 1,
+) -> Transformer:
+    """Build the transformer for a format, which can then be rendered to a string or streamed to a file.
+
+    With more than one of ``jobs`` the tables are rendered on a process pool of that size.
+    """
     if format not in transformers:
         raise ValueError(f"Unknown Format: {format}")
+    transformer = transformers[format]
 
-    # Keep only the tables which were included / not-excluded
-    include_tables = resolve_included_tables(
-        include_tables=include_tables, exclude_tables=exclude_tables, all_tables=set(metadata.tables.keys())
-    )
-    filtered_metadata = filter_metadata(metadata=metadata, include_tables=include_tables)
-
-    # Save the graph structure to string.
-    # Note: type_parameter_delimiter only applies to Mermaid transformer
+    # Note: max_enum_members, layout and type_parameter_delimiter only apply to the Mermaid transformer
     if format in ["mermaid", "mmd"]:
-        return str(
-            Mermaid(
-                filtered_metadata,
-                column_sort,
-                omit_comments=omit_comments,
-                layout=layout,
-                type_parameter_delimiter=type_parameter_delimiter,
-            )
+        return transformer(
+            schema,
+            column_sort,
+            omit_comments=omit_comments,
+            max_enum_members=max_enum_members,
+            layout=layout,
+            type_parameter_delimiter=type_parameter_delimiter,
+            jobs=jobs,
         )
     else:
-        return str(Dot(filtered_metadata, column_sort, omit_comments=omit_comments))
+        return transformer(schema, column_sort, omit_comments=omit_comments, jobs=jobs)
 
 
 def resolve_included_tables(
@@ -100,10 +472,12 @@ def resolve_included_tables(
         case 0, 0:
             return all_tables
         case 0, int():
-            excluded = {table for table in all_tables if any(re.match(pattern, table) for pattern in exclude_tables)}
+            excluded, unused = get_table_matcher(frozenset(exclude_tables)).select(all_tables)
+            _warn_unused_patterns(unused)
             return all_tables - excluded
         case int(), 0:
-            included = {table for table in all_tables if any(re.match(pattern, table) for pattern in include_tables)}
+            included, unused = get_table_matcher(frozenset(include_tables)).select(all_tables)
+            _warn_unused_patterns(unused)
 
             if not included:
                 non_existent_tables = include_tables - all_tables
@@ -119,19 +493,20 @@ def resolve_included_tables(
             )
 
 
+def _warn_unused_patterns(patterns: Set[str]) -> None:
+    if patterns:
+        logger.warning(f"Table patterns did not match any table: {', '.join(sorted(patterns))}")
+
+
 def filter_metadata(
     metadata: MetaData,
     include_tables: Set[str],
-) -> MetaData:
-    """Create a subset of the metadata based on the tables to include."""
-    filtered_metadata = MetaData()
-    for tablename, table in metadata.tables.items():
-        if tablename in include_tables:
-            if hasattr(table, "to_metadata"):
-                # to_metadata is the new way to do this, but it's only available in newer versions of SQLAlchemy.
-                table = table.to_metadata(filtered_metadata)
-            else:
-                # tometadata is deprecated, but we still need to support it for older versions of SQLAlchemy.
-                table = table.tometadata(filtered_metadata)
+) -> SchemaSource:
+    """Restrict the metadata to the tables to include.
 
-    return filtered_metadata
+    The returned view shares the tables of the original metadata instead of copying them. When every table is
+    included the metadata itself is returned.
+    """
+    if include_tables.issuperset(metadata.tables.keys()):
+        return metadata
+    return MetadataView(metadata=metadata, include_tables=include_tables)
@@ -0,0 +1,345 @@
+"""Inject rendered graphs into the marked blocks of documentation files.
+
+Files are scanned line by line. A block starts at the begin tag and ends at the next end tag, either of which can share
+its line with other text; everything in between is replaced by the rendered graph. A file can contain any number of
+blocks, and each begin tag can carry its own settings, written as ``key=value`` pairs before the end of the tag:
+
+    <!-- BEGIN_SQLALCHEMY_DOCS include-tables=users,posts layout=elk -->
+
+A begin tag can also hold a fingerprint of the schema and settings its block was rendered from (``sha256=...``). While
+the fingerprint matches, the block is known to be current and is kept as it is without rendering the graph again.
+"""
+
+import hashlib
+import io
+import re
+import shlex
+from dataclasses import replace
+from glob import glob
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .config import ColumnSorts, FocusDirections, Formats, Layouts, ParacelsusSettingsForGraph
+from .files import write_if_changed
+from . import __version__
+from .graph import get_transformer, select_tables, transformers
+from .profiling import count_schema, phase
+from .schema import Schema, TableRecord, dump_schema
+
+GLOB_CHARACTERS = frozenset("*?[")
+
+FINGERPRINT_PATTERN = re.compile(r"(?:^|\s)sha256=(\S*)(?=\s|$)")
+
+# Fingerprints are shortened, they only have to tell renders of the same block apart.
+FINGERPRINT_LENGTH = 16
+
+# The settings of a block as a hashable tuple of (setting, value) pairs, so identical blocks are rendered once.
+BlockOptions = Tuple[Tuple[str, Any], ...]
+
+
+def _boolean(value: str) -> bool:
+    if value.lower() in ("true", "yes", "1"):
+        return True
+    if value.lower() in ("false", "no", "0"):
+        return False
+    raise ValueError(f"Expected true or false, got '{value}'.")
+
+
+def _tables(value: str) -> frozenset[str]:
+    return frozenset(table.strip() for table in value.split(",") if table.strip())
+
+
+# The settings a begin tag can override, named like the command line options.
+BLOCK_SETTINGS: Dict[str, Tuple[str, Callable[[str], Any]]] = {
+    "format": ("format", Formats),
+    "include-tables": ("include_tables", _tables),
+    "exclude-tables": ("exclude_tables", _tables),
+    "focus": ("focus", _tables),
+    "depth": ("depth", int),
+    "direction": ("direction", FocusDirections),
+    "column-sort": ("column_sort", ColumnSorts),
+    "omit-comments": ("omit_comments", _boolean),
+    "max-enum-members": ("max_enum_members", int),
+    "layout": ("layout", Layouts),
+    "type-parameter-delimiter": ("type_parameter_delimiter", str),
+}
+
+
+def split_inject_arguments(arguments: Iterable[str]) -> Tuple[List[str], Optional[str]]:
+    """Separate the files to inject into from the base class path given on the command line.
+
+    The base class path is the only argument which contains a colon (``module:Class``) without being an existing file.
+    """
+    files: List[str] = []
+    base_class_path = None
+    for argument in arguments:
+        if ":" in argument and not Path(argument).exists() and base_class_path is None:
+            base_class_path = argument
+        else:
+            files.append(argument)
+    return files, base_class_path
+
+
+def expand_files(patterns: Iterable[str]) -> List[Path]:
+    """Resolve file paths and glob patterns (such as ``docs/**/*.md``) to a list of files without duplicates."""
+    files: List[Path] = []
+    seen = set()
+    for pattern in patterns:
+        if GLOB_CHARACTERS.isdisjoint(pattern):
+            matches = [Path(pattern)]
+            if not matches[0].is_file():
+                raise ValueError(f"File '{pattern}' does not exist.")
+        else:
+            matches = sorted(Path(match) for match in glob(pattern, recursive=True) if Path(match).is_file())
+            if not matches:
+                raise ValueError(f"No files match '{pattern}'.")
+
+        for match in matches:
+            resolved = match.resolve()
+            if resolved not in seen:
+                seen.add(resolved)
+                files.append(resolved)
+    return files
+
+
+def parse_block_options(text: str) -> BlockOptions:
+    """Parse the ``key=value`` settings written in a begin tag."""
+    options = {}
+    for token in shlex.split(text):
+        key, separator, value = token.partition("=")
+        if not separator:
+            raise ValueError(f"Expected a key=value setting, got '{token}'.")
+        if key not in BLOCK_SETTINGS:
+            raise ValueError(f"Unknown setting '{key}', expected one of: {', '.join(BLOCK_SETTINGS)}.")
+        field, parse = BLOCK_SETTINGS[key]
+        options[field] = parse(value)
+    return tuple(sorted(options.items()))
+
+
+def split_fingerprint(text: str) -> Tuple[str, Optional[str]]:
+    """Separate the ``sha256=`` fingerprint from the other settings of a begin tag."""
+    match = FINGERPRINT_PATTERN.search(text)
+    if match is None:
+        return text, None
+    return f"{text[: match.start()]}{text[match.end() :]}".strip(), match.group(1)
+
+
+class _BeginTag:
+    """Find the tag starting a block in a line, and extract the settings written inside the tag."""
+
+    def __init__(self, tag: str, end_tag: str) -> None:
+        tag = tag.strip()
+        # The settings of HTML comment tags go before the closing "-->".
+        self.suffix = "-->" if tag.endswith("-->") else ""
+        self.prefix = tag[: len(tag) - len(self.suffix)].rstrip()
+        self.end_tag = end_tag
+
+    def search(self, line: str) -> Optional[Tuple[int, int, str]]:
+        """Return where the tag starts and ends in the line, along with its settings."""
+        start = line.find(self.prefix)
+        while start != -1:
+            settings_start = start + len(self.prefix)
+            if self.suffix:
+                settings_end = line.find(self.suffix, settings_start)
+                if settings_end == -1:
+                    return None
+                tag_end = settings_end + len(self.suffix)
+            else:
+                # Without a closing suffix the settings run to the end of the line, or to an end tag sharing it.
+                settings_end = line.find(self.end_tag, settings_start)
+                if settings_end == -1:
+                    settings_end = len(line.rstrip("\r\n"))
+                tag_end = settings_start + len(line[settings_start:settings_end].rstrip())
+            settings = line[settings_start:settings_end]
+            # A longer tag which happens to start with this one doesn't count.
+            if not settings or settings[0].isspace():
+                return start, tag_end, settings.strip()
+            start = line.find(self.prefix, settings_start)
+        return None
+
+    def format(self, settings: str, fingerprint: str) -> str:
+        """Write the tag with a new fingerprint, keeping its settings."""
+        parts = [self.prefix, settings, f"sha256={fingerprint}", self.suffix]
+        return " ".join(part for part in parts if part)
+
+
+def inject_blocks(
+    lines: Iterable[str],
+    render: Callable[[BlockOptions], str],
+    begin_tag: str,
+    end_tag: str,
+    name: str = "<file>",
+    fingerprint: Optional[Callable[[BlockOptions], str]] = None,
+    add_fingerprints: bool = False,
+) -> Iterator[str]:
+    """Yield the lines of a file with the content of every block replaced by its rendered graph.
+
+    The begin and end lines themselves are kept as they are, so the settings of each block survive. When a
+    ``fingerprint`` function is given, blocks with a fingerprint in their begin tag (or every block, with
+    ``add_fingerprints``) get an up to date one. Blocks whose fingerprint already matches are kept without rendering.
+    """
+    begin = _BeginTag(begin_tag, end_tag)
+    block_start = None
+    keep_content = False
+    for number, line in enumerate(lines, start=1):
+        if block_start is None:
+            found = begin.search(line)
+            if found is None:
+                yield line
+                continue
+
+            tag_start, tag_end, settings = found
+            settings, current_fingerprint = split_fingerprint(settings)
+            try:
+                options = parse_block_options(settings)
+            except ValueError as error:
+                raise ValueError(f"{name}:{number}: {error}") from None
+            block_start = number
+
+            expected_fingerprint = None
+            if fingerprint is not None and (current_fingerprint is not None or add_fingerprints):
+                expected_fingerprint = fingerprint(options)
+            keep_content = expected_fingerprint is not None and expected_fingerprint == current_fingerprint
+
+            # Text around an inline tag is kept, only the content of the block is replaced.
+            rest = line[tag_end:]
+            closing = rest.find(end_tag)
+            if keep_content:
+                yield line if line.endswith("\n") or closing != -1 else f"{line}\n"
+            else:
+                if expected_fingerprint is not None:
+                    yield f"{line[:tag_start]}{begin.format(settings, expected_fingerprint)}\n"
+                elif closing == -1 and not rest.strip():
+                    yield line if line.endswith("\n") else f"{line}\n"
+                else:
+                    yield f"{line[:tag_end]}\n"
+                yield from render(options).splitlines(keepends=True)
+                if closing != -1:
+                    yield rest[closing:]
+            if closing != -1:
+                block_start = None
+        elif end_tag in line:
+            block_start = None
+            closing = line.index(end_tag)
+            # Old content in front of an inline end tag is part of the block.
+            yield line if keep_content or not line[:closing].strip() else line[closing:]
+        elif keep_content:
+            yield line
+
+    if block_start is not None:
+        raise ValueError(f"{name}:{block_start}: the begin tag has no matching end tag.")
+
+
+def inject_file(
+    path: Path,
+    render: Callable[[BlockOptions], str],
+    begin_tag: str,
+    end_tag: str,
+    fingerprint: Optional[Callable[[BlockOptions], str]] = None,
+    add_fingerprints: bool = False,
+) -> bool:
+    """Stream a file through ``inject_blocks``, replacing it only if a block changed. Returns True if it was written."""
+    with phase("inject"), path.open() as source:
+        lines = inject_blocks(source, render, begin_tag, end_tag, str(path), fingerprint, add_fingerprints)
+        return write_if_changed(path, lines)
+
+
+class BlockRenderer:
+    """Render the code block of each marker block from one schema, once per distinct combination of settings.
+
+    A block which sets included tables replaces the excluded tables of the command line, and the other way around.
+
+    Given the renderer of a ``previous`` version of the schema, blocks whose tables didn't change reuse its renders.
+    """
+
+    def __init__(
+        self, schema: Schema, settings: ParacelsusSettingsForGraph, previous: Optional["BlockRenderer"] = None
+    ) -> None:
+        self.schema = schema
+        self.settings = settings
+        self._rendered: Dict[BlockOptions, str] = {}
+        self._selected: Dict[BlockOptions, Schema] = {}
+        self._fingerprints: Dict[BlockOptions, str] = {}
+        # The tables each render was made from, to tell whether a later schema changes it.
+        self._sources: Dict[BlockOptions, Tuple[TableRecord, ...]] = {}
+        self._previous = previous
+        if previous is not None:
+            # Only the last renderer is needed, don't keep a chain of every earlier schema alive.
+            previous._previous = None
+
+    def __call__(self, options: BlockOptions) -> str:
+        if options not in self._rendered:
+            with phase("render"):
+                self._rendered[options] = self._render(options)
+        return self._rendered[options]
+
+    def fingerprint(self, options: BlockOptions) -> str:
+        """Hash the tables a block selects and the settings which determine what it renders to."""
+        if options in self._fingerprints:
+            return self._fingerprints[options]
+
+        # Only the selected tables are hashed, so changes to the rest of the schema don't make the block stale.
+        buffer = io.StringIO()
+        dump_schema(self._select(options), buffer)
+
+        settings = self._settings(options)
+        digest = hashlib.sha256()
+        for value in (
+            __version__,
+            buffer.getvalue(),
+            settings.format.value,
+            settings.column_sort.value,
+            settings.omit_comments,
+            settings.max_enum_members,
+            settings.layout.value if settings.layout else None,
+            settings.type_parameter_delimiter,
+        ):
+            digest.update(repr(value).encode())
+            digest.update(b"\0")
+        self._fingerprints[options] = digest.hexdigest()[:FINGERPRINT_LENGTH]
+        return self._fingerprints[options]
+
+    def _settings(self, options: BlockOptions) -> ParacelsusSettingsForGraph:
+        overrides = dict(options)
+        if "include_tables" in overrides:
+            overrides.setdefault("exclude_tables", frozenset())
+        if "exclude_tables" in overrides:
+            overrides.setdefault("include_tables", frozenset())
+        for key in ("include_tables", "exclude_tables", "focus"):
+            if key in overrides:
+                overrides[key] = set(overrides[key])
+        return replace(self.settings, **overrides)
+
+    def _select(self, options: BlockOptions) -> Schema:
+        if options not in self._selected:
+            settings = self._settings(options)
+            self._selected[options] = select_tables(
+                self.schema,
+                include_tables=settings.include_tables,
+                exclude_tables=settings.exclude_tables,
+                focus=settings.focus,
+                depth=settings.depth,
+                direction=settings.direction,
+            )
+        return self._selected[options]
+
+    def _render(self, options: BlockOptions) -> str:
+        settings = self._settings(options)
+        schema = self._select(options)
+        self._sources[options] = tuple(schema.tables.values())
+        if self._previous is not None and self._previous._sources.get(options) == self._sources[options]:
+            return self._previous._rendered[options]
+
+        count_schema(schema)
+        graph = get_transformer(
+            schema,
+            format=settings.format,
+            column_sort=settings.column_sort,
+            omit_comments=settings.omit_comments,
+            max_enum_members=settings.max_enum_members,
+            layout=settings.layout,
+            type_parameter_delimiter=settings.type_parameter_delimiter,
+            jobs=settings.jobs,
+        )
+        comment_format = transformers[settings.format].comment_format
+        return f"```{comment_format}\n{graph}\n```\n"
@@ -0,0 +1,146 @@
+import re
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Optional, Pattern, Set, Tuple
+
+# Patterns made only of characters outside of this set match exactly the same strings as their literal text.
+_REGEX_SPECIAL_CHARACTERS = frozenset(".^$*+?{}[]\\|()")
+_QUANTIFIERS = frozenset("*+?{")
+
+
+class _PatternGroup:
+    """Patterns sharing the same literal prefix, combined into as few regular expressions as possible."""
+
+    def __init__(self, patterns: List[Tuple[str, Pattern[str]]]) -> None:
+        combinable = [pattern for pattern, compiled in patterns if compiled.groups == 0 and _can_be_grouped(pattern)]
+        combinable_set = set(combinable)
+        self.separate = [(pattern, compiled) for pattern, compiled in patterns if pattern not in combinable_set]
+
+        # Each pattern gets its own capturing group so the index of the last group tells which one matched.
+        self.combined_patterns = tuple(combinable)
+        self.combined: Optional[Pattern[str]] = (
+            re.compile("|".join(f"({pattern})" for pattern in combinable)) if combinable else None
+        )
+
+    def match(self, table: str) -> Optional[str]:
+        if self.combined is not None:
+            match = self.combined.match(table)
+            if match and match.lastindex:
+                return self.combined_patterns[match.lastindex - 1]
+
+        for pattern, compiled in self.separate:
+            if compiled.match(table):
+                return pattern
+
+        return None
+
+
+class TableMatcher:
+    """Match table names against a set of include or exclude patterns.
+
+    Patterns follow ``re.match`` semantics: a pattern matches a table when it matches the start of its name.
+
+    All patterns are compiled once. Patterns without special characters are checked with a set lookup first. The
+    others are grouped by the literal text they start with, and each group is merged into a single alternation, so
+    a table is only tested against the few patterns which could possibly match it. Patterns with their own groups or
+    inline flags can't be merged and are checked one by one instead.
+    """
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        self.patterns: Tuple[str, ...] = tuple(sorted(set(patterns)))
+        self._literals: FrozenSet[str] = frozenset(
+            pattern for pattern in self.patterns if _REGEX_SPECIAL_CHARACTERS.isdisjoint(pattern)
+        )
+        self._compiled: Dict[str, Pattern[str]] = {pattern: re.compile(pattern) for pattern in self.patterns}
+
+        by_prefix: Dict[str, List[Tuple[str, Pattern[str]]]] = {}
+        for pattern, compiled in self._compiled.items():
+            by_prefix.setdefault(_literal_prefix(pattern), []).append((pattern, compiled))
+
+        self._groups: Dict[str, _PatternGroup] = {prefix: _PatternGroup(group) for prefix, group in by_prefix.items()}
+        self._prefix_lengths: Tuple[int, ...] = tuple(sorted({len(prefix) for prefix in self._groups}))
+
+    def match(self, table: str) -> Optional[str]:
+        """Return a pattern matching the table, or ``None`` if there are none."""
+        if table in self._literals:
+            return table
+
+        for length in self._prefix_lengths:
+            if length > len(table):
+                break
+            group = self._groups.get(table[:length])
+            if group is not None:
+                pattern = group.match(table)
+                if pattern is not None:
+                    return pattern
+
+        return None
+
+    def select(self, tables: Iterable[str]) -> Tuple[Set[str], Set[str]]:
+        """Split the tables into the ones matching any pattern, and report the patterns which matched nothing.
+
+        Returns a tuple of the matching tables and the unused patterns.
+        """
+        matched = set()
+        used = set()
+        for table in tables:
+            pattern = self.match(table)
+            if pattern is not None:
+                matched.add(table)
+                used.add(pattern)
+
+        # A pattern that was never reported may still match a table which another pattern claimed first.
+        # Any table it matches has to be in the matched set, so only those need to be checked.
+        unused = {
+            pattern
+            for pattern in self.patterns
+            if pattern not in used and not any(self._compiled[pattern].match(table) for table in matched)
+        }
+        return matched, unused
+
+    def __repr__(self) -> str:
+        return f"TableMatcher({list(self.patterns)!r})"
+
+
+def _literal_prefix(pattern: str) -> str:
+    """Return the literal text every match of the pattern has to start with.
+
+    This is conservative: anything that could make the prefix optional or ambiguous ends it early.
+    """
+    if "|" in pattern:
+        return ""
+
+    prefix: List[str] = []
+    position = 1 if pattern.startswith("^") else 0
+    while position < len(pattern):
+        character = pattern[position]
+        if character == "\\":
+            escaped = pattern[position + 1 : position + 2]
+            if not escaped or escaped not in _REGEX_SPECIAL_CHARACTERS:
+                break
+            character = escaped
+            position += 1
+        elif character in _REGEX_SPECIAL_CHARACTERS:
+            break
+        position += 1
+
+        # A quantifier applies to the character before it, which therefore isn't guaranteed to be there.
+        if position < len(pattern) and pattern[position] in _QUANTIFIERS:
+            break
+        prefix.append(character)
+
+    return "".join(prefix)
+
+
+def _can_be_grouped(pattern: str) -> bool:
+    """Check if a pattern still compiles when wrapped in a group, which fails for global inline flags."""
+    try:
+        re.compile(f"({pattern})")
+    except re.error:
+        return False
+    return True
+
+
+@lru_cache(maxsize=32)
+def get_table_matcher(patterns: FrozenSet[str]) -> TableMatcher:
+    """Return a matcher for the patterns, reusing the compiled matcher when the same patterns are seen again."""
+    return TableMatcher(patterns)
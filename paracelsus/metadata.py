@@ -0,0 +1,25 @@
+from types import MappingProxyType
+from typing import Mapping, Set, Union
+
+from sqlalchemy.schema import MetaData, Table
+
+
+class MetadataView:
+    """Read-only view over a subset of the tables of a ``MetaData`` instance.
+
+    The tables are shared with the original metadata rather than copied, so creating a view costs one dictionary
+    entry per included table. Transformers only need the ``tables`` mapping, which behaves like ``MetaData.tables``.
+    """
+
+    def __init__(self, metadata: MetaData, include_tables: Set[str]) -> None:
+        self.metadata = metadata
+        self.tables: Mapping[str, Table] = MappingProxyType(
+            {name: table for name, table in metadata.tables.items() if name in include_tables}
+        )
+
+    def __repr__(self) -> str:
+        return f"MetadataView({list(self.tables)!r})"
+
+
+# Anything the transformers can render from.
+SchemaSource = Union[MetaData, MetadataView]
@@ -0,0 +1,125 @@
+"""Measure where the time and memory of a command go, for ``--profile``.
+
+A ``Profiler`` is activated around a command. While it is active, every ``phase`` records its wall time, CPU time and
+peak of traced memory. Outside of a profiled command ``phase`` does nothing, so the phases can stay in the code paths
+they measure at no cost.
+"""
+
+import json
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional
+
+if TYPE_CHECKING:
+    from .schema import Schema
+
+_active: Optional["Profiler"] = None
+
+
+class Profiler:
+    """Collect the phases of one command into a report.
+
+    Phases run several times (such as rendering one format after the other) are added up, along with how many times
+    they ran. Phases can be nested, the measures of a phase include those of the phases nested in it.
+    """
+
+    def __init__(self, command: str) -> None:
+        self.command = command
+        self.phases: Dict[str, Dict[str, Any]] = {}
+        self.counts: Dict[str, int] = {}
+        self._started_tracing = False
+        self._start = (0.0, 0.0)
+        self._total = (0.0, 0.0)
+        self._peak = 0
+        # The peaks of the phases currently running, innermost last.
+        self._peaks: List[int] = []
+
+    @contextmanager
+    def activate(self) -> Iterator["Profiler"]:
+        global _active
+        self._started_tracing = not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start()
+        previous, _active = _active, self
+        self._start = (time.perf_counter(), time.process_time())
+        try:
+            yield self
+        finally:
+            self._total = (time.perf_counter() - self._start[0], time.process_time() - self._start[1])
+            self._peak = max(self._peak, tracemalloc.get_traced_memory()[1])
+            _active = previous
+            if self._started_tracing:
+                tracemalloc.stop()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        # Resetting the peak of traced memory would lose the peak of an enclosing phase, so it is saved first.
+        if self._peaks:
+            self._peaks[-1] = max(self._peaks[-1], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        self._peaks.append(0)
+        baseline = tracemalloc.get_traced_memory()[0]
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            peak = max(tracemalloc.get_traced_memory()[1], self._peaks.pop())
+            if self._peaks:
+                self._peaks[-1] = max(self._peaks[-1], peak)
+            self._peak = max(self._peak, peak)
+            record = self.phases.setdefault(
+                name, {"calls": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0, "peak_memory_bytes": 0}
+            )
+            record["calls"] += 1
+            record["wall_seconds"] += wall
+            record["cpu_seconds"] += cpu
+            # The memory allocated by the phase on top of what was already in use when it started.
+            record["peak_memory_bytes"] = max(record["peak_memory_bytes"], peak - baseline, 0)
+
+    def count_schema(self, schema: "Schema") -> None:
+        """Record the size of a schema which was rendered, the sizes of several schemas are added up."""
+        for name, count in (
+            ("tables", len(schema.tables)),
+            ("columns", sum(len(table.columns) for table in schema.tables.values())),
+            ("edges", sum(len(edges) for edges in schema.edges.values())),
+            ("skipped_edges", sum(schema.skipped.values())),
+        ):
+            self.counts[name] = self.counts.get(name, 0) + count
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "command": self.command,
+            "wall_seconds": self._total[0],
+            "cpu_seconds": self._total[1],
+            "peak_memory_bytes": self._peak,
+            "phases": self.phases,
+            "counts": self.counts,
+        }
+
+    def write(self, destination: Path) -> None:
+        """Write the report as JSON into a file, or to stderr when the destination is ``-``."""
+        report = json.dumps(self.report(), indent=2) + "\n"
+        if str(destination) == "-":
+            sys.stderr.write(report)
+        else:
+            destination.write_text(report)
+
+
+def count_schema(schema: "Schema") -> None:
+    """Record the size of the schema of the active profiler, if there is one."""
+    if _active is not None:
+        _active.count_schema(schema)
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Record a phase of the active profiler, if there is one."""
+    if _active is None:
+        yield
+        return
+    with _active.phase(name):
+        yield
@@ -0,0 +1,87 @@
+"""Read the tables of a live database instead of importing its models.
+
+Tables are reflected with ``MetaData.reflect``, which reads them through the bulk ``get_multi_*`` methods of the
+``Inspector``. Every schema is reflected on its own connection from the pool of the engine, so several schemas are
+reflected concurrently, and the results are merged into a single ``MetaData``.
+
+SQLite databases can attach other database files, which are then reflected as schemas of their own.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import MetaData, create_engine, event, make_url
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import ArgumentError, NoSuchModuleError
+
+
+def create_reflection_engine(url: str, attach: Optional[Dict[str, Path]] = None) -> Engine:
+    """Create the engine of a database URL, attaching the given SQLite database files to each of its connections."""
+    try:
+        database_url = make_url(url)
+    except ArgumentError as error:
+        raise ValueError(f"Invalid database URL '{url}': {error}") from None
+
+    if attach and database_url.get_backend_name() != "sqlite":
+        raise ValueError("Only SQLite databases can attach other databases.")
+
+    try:
+        engine = create_engine(database_url)
+    except NoSuchModuleError as error:
+        raise ValueError(f"Invalid database URL '{url}': {error}") from None
+    except ImportError as error:
+        raise ValueError(f"The database driver of '{database_url.drivername}' isn't installed: {error}") from None
+
+    if attach:
+
+        @event.listens_for(engine, "connect")
+        def attach_databases(dbapi_connection: Any, _: Any) -> None:
+            for name, path in attach.items():
+                # Names are validated by parse_attach, only the path can be a bound parameter.
+                dbapi_connection.execute(f'ATTACH DATABASE ? AS "{name}"', (str(path),))
+
+    return engine
+
+
+def _reflect_schema(engine: Engine, schema: Optional[str]) -> MetaData:
+    # Each thread fills its own MetaData, which isn't safe to modify concurrently.
+    metadata = MetaData()
+    with engine.connect() as connection:
+        metadata.reflect(connection, schema=schema)
+    return metadata
+
+
+def reflect_metadata(
+    url: str,
+    *,
+    schemas: Optional[List[str]] = None,
+    attach: Optional[Dict[str, Path]] = None,
+    jobs: int = 1,
+) -> MetaData:
+    """Reflect the tables of a database into a ``MetaData``.
+
+    The default schema is reflected unless ``schemas`` are given, along with every attached database. With more than
+    one of ``jobs`` the schemas are reflected on that many connections at once.
+    """
+    attach = attach or {}
+    targets: List[Optional[str]] = list(schemas) if schemas else [None]
+    targets = list(dict.fromkeys([*targets, *attach]))
+
+    engine = create_reflection_engine(url, attach)
+    try:
+        if jobs > 1 and len(targets) > 1:
+            with ThreadPoolExecutor(max_workers=min(jobs, len(targets))) as executor:
+                reflected = list(executor.map(lambda schema: _reflect_schema(engine, schema), targets))
+        else:
+            reflected = [_reflect_schema(engine, schema) for schema in targets]
+    finally:
+        engine.dispose()
+
+    # Tables referred to from another schema are reflected along with it, they are only copied once.
+    metadata = MetaData()
+    for schema_metadata in reflected:
+        for table in schema_metadata.tables.values():
+            if table.key not in metadata.tables:
+                table.to_metadata(metadata)
+    return metadata
@@ -0,0 +1,245 @@
+"""Compact intermediate representation of the tables to render.
+
+SQLAlchemy ``Table`` and ``Column`` objects are introspected once by ``extract_schema``. Everything the transformers
+need (type strings, key flags, sort keys and the cardinality of every foreign key) is precomputed into small
+tuple-backed records, which are cheap to keep around, to share between transformers and to pickle.
+"""
+
+import json
+import logging
+from operator import attrgetter
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, TextIO, Tuple
+
+from sqlalchemy.sql.schema import Column, Table
+
+from .focus import ForeignKeyIndex
+from .metadata import SchemaSource
+from .transformers.utils import KeyIndex, TypeIndex, key_based_column_sort, load_dialect
+
+logger = logging.getLogger(__name__)
+
+
+class ColumnRecord(NamedTuple):
+    name: str
+    key: str
+    type: str
+    # The enum members of enum columns, None for any other type.
+    enum_values: Optional[Tuple[str, ...]]
+    primary_key: bool
+    foreign_key: bool
+    unique: bool
+    nullable: bool
+    indexed: bool
+    comment: Optional[str]
+    sort_key: str
+
+
+class ForeignKeyRecord(NamedTuple):
+    column: str
+    referred_table: str
+    referred_column: str
+
+
+class TableRecord(NamedTuple):
+    key: str
+    name: str
+    schema: Optional[str]
+    columns: Tuple[ColumnRecord, ...]
+    foreign_keys: Tuple[ForeignKeyRecord, ...]
+
+    def sorted_columns(self, column_sort: str) -> List[ColumnRecord]:
+        match column_sort:
+            case "preserve-order":
+                return list(self.columns)
+            case _:
+                return sorted(self.columns, key=attrgetter("sort_key"))
+
+
+class EdgeRecord(NamedTuple):
+    """A foreign key between two tables which are both part of the schema.
+
+    The referred table holds the target of the foreign key, the referring table holds the foreign key column. The
+    cardinality of each end follows from whether its column is unique.
+    """
+
+    referred_table: str
+    referring_table: str
+    column: str
+    referred_unique: bool
+    referring_unique: bool
+    # The name the referred table is rendered with, without its schema.
+    referred_name: str
+
+
+# Most missing tables named by the summary of skipped foreign keys, the others are only counted.
+SKIPPED_TABLES_SHOWN = 10
+
+
+class Schema:
+    """The tables to render along with the resolved foreign keys between them."""
+
+    __slots__ = ("tables", "edges", "skipped", "_foreign_key_index")
+
+    def __init__(self, tables: Iterable[TableRecord], warn: bool = True) -> None:
+        self.tables: Dict[str, TableRecord] = {table.key: table for table in tables}
+        # The number of foreign keys to each table which isn't part of the schema.
+        self.skipped: Dict[str, int] = {}
+        # Edges are grouped by the table holding the foreign key, in column order.
+        column_index: Dict[str, Dict[str, ColumnRecord]] = {}
+        self.edges: Dict[str, Tuple[EdgeRecord, ...]] = {
+            key: self._resolve_edges(table, column_index) for key, table in self.tables.items()
+        }
+        if self.skipped and warn:
+            self._warn_skipped()
+        self._foreign_key_index: Optional[ForeignKeyIndex] = None
+
+    @property
+    def foreign_key_index(self) -> ForeignKeyIndex:
+        """The foreign keys between the tables in both directions, indexed on first use."""
+        if self._foreign_key_index is None:
+            self._foreign_key_index = ForeignKeyIndex.from_schema(self)
+        return self._foreign_key_index
+
+    def _resolve_edges(
+        self, table: TableRecord, column_index: Dict[str, Dict[str, ColumnRecord]]
+    ) -> Tuple[EdgeRecord, ...]:
+        if not table.foreign_keys:
+            return ()
+
+        columns = {column.name: column for column in table.columns}
+        edges = []
+        for foreign_key in table.foreign_keys:
+            referred_table = self.tables.get(foreign_key.referred_table)
+
+            # We don't add the connection to the fk table if the latter
+            # is not included in our graph.
+            if referred_table is None:
+                self.skipped[foreign_key.referred_table] = self.skipped.get(foreign_key.referred_table, 0) + 1
+                continue
+
+            referred_columns = column_index.get(referred_table.key)
+            if referred_columns is None:
+                referred_columns = column_index[referred_table.key] = {
+                    column.key: column for column in referred_table.columns
+                }
+            referred_column = referred_columns[foreign_key.referred_column]
+            edges.append(
+                EdgeRecord(
+                    referred_table=foreign_key.referred_table,
+                    referring_table=table.key,
+                    column=foreign_key.column,
+                    referred_unique=referred_column.unique,
+                    referring_unique=columns[foreign_key.column].unique,
+                    referred_name=referred_table.name,
+                )
+            )
+        return tuple(edges)
+
+    def _warn_skipped(self) -> None:
+        """Log every skipped foreign key in a single warning, instead of one per foreign key."""
+        missing = sorted(self.skipped.items(), key=lambda item: (-item[1], item[0]))
+        shown = ", ".join(f"'{table}' ({count})" for table, count in missing[:SKIPPED_TABLES_SHOWN])
+        if len(missing) > SKIPPED_TABLES_SHOWN:
+            shown += f" and {len(missing) - SKIPPED_TABLES_SHOWN} other tables"
+        logger.warning(
+            f"Skipping {sum(self.skipped.values())} foreign keys to tables which are not included in the graph: "
+            f"{shown}."
+        )
+
+    def subset(self, include_tables: Set[str]) -> "Schema":
+        """Create a schema with only some of the tables, dropping the foreign keys to the other ones."""
+        return Schema(table for key, table in self.tables.items() if key in include_tables)
+
+    def __getstate__(self) -> Tuple[TableRecord, ...]:
+        # Edges are derived from the tables, so only the tables need to be pickled.
+        return tuple(self.tables.values())
+
+    def __setstate__(self, state: Tuple[TableRecord, ...]) -> None:
+        # The schema was already reported when it was built, copies sent to worker processes stay quiet.
+        self.__init__(state, warn=False)  # type: ignore[misc]
+
+    def __repr__(self) -> str:
+        return f"Schema({list(self.tables)!r})"
+
+
+# Bumped whenever the records change, so snapshots written by other versions are never loaded.
+SNAPSHOT_VERSION = 1
+
+
+def dump_schema(schema: Schema, fp: TextIO) -> None:
+    """Write a schema snapshot as JSON. The records are tuples, so they are stored as plain arrays."""
+    json.dump({"version": SNAPSHOT_VERSION, "tables": list(schema.tables.values())}, fp, separators=(",", ":"))
+
+
+def load_schema(fp: TextIO) -> Schema:
+    """Read a schema snapshot written by ``dump_schema``."""
+    data = json.load(fp)
+    if data.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported schema snapshot version: {data.get('version')}")
+
+    # Columns with the same enum share one tuple of its members, like they do when extracted from the models.
+    enums: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+    def enum_values(values: Optional[List[str]]) -> Optional[Tuple[str, ...]]:
+        if values is None:
+            return None
+        members = tuple(values)
+        return enums.setdefault(members, members)
+
+    return Schema(
+        TableRecord(
+            key=key,
+            name=name,
+            schema=table_schema,
+            columns=tuple(ColumnRecord._make((*column[:3], enum_values(column[3]), *column[4:])) for column in columns),
+            foreign_keys=tuple(ForeignKeyRecord(*foreign_key) for foreign_key in foreign_keys),
+        )
+        for key, name, table_schema, columns, foreign_keys in data["tables"]
+    )
+
+
+def extract_column(column: Column, keys: Optional[KeyIndex] = None, types: Optional[TypeIndex] = None) -> ColumnRecord:
+    keys = keys if keys is not None else KeyIndex()
+    types = types if types is not None else TypeIndex()
+    type_info = types[column.type]
+    return ColumnRecord(
+        name=column.name,
+        key=column.key,
+        type=type_info.type,
+        enum_values=type_info.enum_values,
+        primary_key=bool(column.primary_key),
+        foreign_key=len(column.foreign_keys) > 0,
+        unique=keys.is_unique(column),
+        nullable=bool(column.nullable),
+        indexed=bool(column.index),
+        comment=column.comment,
+        sort_key=key_based_column_sort(column),
+    )
+
+
+def extract_table(table: Table, keys: Optional[KeyIndex] = None, types: Optional[TypeIndex] = None) -> TableRecord:
+    keys = keys if keys is not None else KeyIndex()
+    types = types if types is not None else TypeIndex()
+    foreign_keys = []
+    for column in table.columns:
+        for foreign_key in column.foreign_keys:
+            referred_table, _, referred_column = foreign_key.target_fullname.rpartition(".")
+            foreign_keys.append(ForeignKeyRecord(column.name, referred_table, referred_column))
+
+    return TableRecord(
+        key=table.key,
+        name=table.name,
+        schema=table.schema,
+        columns=tuple(extract_column(column, keys, types) for column in table.columns),
+        foreign_keys=tuple(foreign_keys),
+    )
+
+
+def extract_schema(source: SchemaSource, dialect: Optional[str] = None) -> Schema:
+    """Introspect the tables of a metadata object (or view) once into a ``Schema``.
+
+    Column types are compiled for the named ``dialect``, or SQLAlchemy's default one.
+    """
+    keys = KeyIndex()
+    types = TypeIndex(load_dialect(dialect) if dialect is not None else None)
+    return Schema(extract_table(table, keys, types) for table in source.tables.values())
@@ -0,0 +1,97 @@
+"""Locate the source files of project modules without importing them."""
+
+import ast
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set
+
+
+def module_name(module: str) -> str:
+    """Strip the wildcard and class parts of the module references used in settings (``module:*``, ``module:Base``)."""
+    return module.split(":", 1)[0]
+
+
+def find_module_file(name: str, roots: Sequence[Path]) -> Optional[Path]:
+    """Find the file a module would be loaded from if it lives under one of the roots."""
+    parts = name.split(".")
+    for root in roots:
+        package_init = root.joinpath(*parts, "__init__.py")
+        if package_init.is_file():
+            return package_init
+        module_file = root.joinpath(*parts[:-1], f"{parts[-1]}.py")
+        if module_file.is_file():
+            return module_file
+    return None
+
+
+def module_package(name: str, path: Path) -> str:
+    """The package relative imports of a module are resolved against."""
+    return name if path.name == "__init__.py" else name.rpartition(".")[0]
+
+
+def import_base(node: ast.ImportFrom, package: str) -> str:
+    """Return the absolute name of the module a ``from ... import`` statement imports from.
+
+    Returns an empty string when a relative import goes above the top level package.
+    """
+    if not node.level:
+        return node.module or ""
+
+    package_parts = package.split(".") if package else []
+    if node.level > len(package_parts):
+        return ""
+    base_parts = package_parts[: len(package_parts) - node.level + 1]
+    if node.module:
+        base_parts.append(node.module)
+    return ".".join(base_parts)
+
+
+def imported_modules(name: str, path: Path) -> Iterator[str]:
+    """Yield the names of every module imported by a module, resolving relative imports.
+
+    ``from package import name`` yields both ``package`` and ``package.name``, since the name may be a submodule.
+    """
+    try:
+        tree = ast.parse(path.read_bytes(), filename=str(path))
+    except (SyntaxError, ValueError):
+        return
+
+    package = module_package(name, path)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                yield alias.name
+        elif isinstance(node, ast.ImportFrom):
+            base = import_base(node, package)
+            if not base:
+                continue
+            yield base
+            for alias in node.names:
+                if alias.name != "*":
+                    yield f"{base}.{alias.name}"
+
+
+def project_module_files(modules: Iterable[str], roots: Sequence[Path]) -> Dict[str, Path]:
+    """Map the modules, their parent packages and everything they transitively import to their source files.
+
+    Only modules found under one of the roots are included, so third party packages are ignored.
+    """
+    found: Dict[str, Path] = {}
+    seen: Set[str] = set()
+    queue: List[str] = [module_name(module) for module in modules]
+    while queue:
+        name = queue.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+
+        # Importing a submodule runs the __init__.py files of all of its parent packages.
+        parts = name.split(".")
+        queue.extend(".".join(parts[:index]) for index in range(1, len(parts)))
+
+        path = find_module_file(name, roots)
+        if path is None:
+            continue
+        found[name] = path
+        queue.extend(imported_modules(name, path))
+
+    return found
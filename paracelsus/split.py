@@ -0,0 +1,191 @@
+"""Split a schema into several diagrams, one per database schema or per group of table names.
+
+Each group is rendered from its own tables, plus a stub of every table in another group it has a foreign key with.
+Stubs only hold the columns of those foreign keys, so the connections between groups stay visible without pulling the
+other groups into the diagram. Their names end with ``-stub`` to tell them apart from the tables of the group.
+"""
+
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from .config import Formats, Layouts
+from .files import write_if_changed
+from .graph import get_transformer
+from .profiling import phase
+from .schema import Schema, TableRecord
+
+SPLIT_BY_SCHEMA = "schema"
+SPLIT_BY_PATTERN = "pattern:"
+
+# The group of tables without a schema, or which don't match the pattern.
+DEFAULT_GROUP = "default"
+
+INDEX_FILE = "index.md"
+
+# Appended to the names of the tables of other groups. Mermaid and Graphviz both accept it in names, and it can't
+# clash with the name of a table of the group.
+STUB_SUFFIX = "-stub"
+
+FILE_EXTENSIONS = {Formats.mermaid: "mmd"}
+
+
+def parse_split_by(value: str) -> Callable[[TableRecord], str]:
+    """Turn a ``--split-by`` value into a function naming the group of a table.
+
+    ``schema`` groups tables by their database schema. ``pattern:<regex>`` groups them by the first capture group of
+    the regular expression (or the whole match if it has none), searched in the table name.
+    """
+    if value == SPLIT_BY_SCHEMA:
+        return lambda table: table.schema or DEFAULT_GROUP
+
+    if value.startswith(SPLIT_BY_PATTERN):
+        try:
+            pattern = re.compile(value[len(SPLIT_BY_PATTERN) :])
+        except re.error as error:
+            raise ValueError(f"Invalid split pattern '{value[len(SPLIT_BY_PATTERN) :]}': {error}") from None
+
+        def pattern_group(table: TableRecord) -> str:
+            match = pattern.search(table.name)
+            if match is None:
+                return DEFAULT_GROUP
+            return (match.group(1) if pattern.groups else match.group(0)) or DEFAULT_GROUP
+
+        return pattern_group
+
+    raise ValueError(f"Unknown split '{value}', expected '{SPLIT_BY_SCHEMA}' or '{SPLIT_BY_PATTERN}<regex>'.")
+
+
+def _stub(table: TableRecord, column_names: Set[str], foreign_keys: Set[str]) -> TableRecord:
+    return table._replace(
+        name=f"{table.name}{STUB_SUFFIX}",
+        columns=tuple(column for column in table.columns if column.name in column_names),
+        foreign_keys=tuple(foreign_key for foreign_key in table.foreign_keys if foreign_key.column in foreign_keys),
+    )
+
+
+def group_schemas(schema: Schema, group_of: Callable[[TableRecord], str]) -> Dict[str, Schema]:
+    """Split a schema into one schema per group, sorted by group name, with stubs for the tables of other groups."""
+    groups: Dict[str, List[str]] = {}
+    table_groups: Dict[str, str] = {}
+    for key, table in schema.tables.items():
+        table_groups[key] = group_of(table)
+        groups.setdefault(table_groups[key], []).append(key)
+
+    # The columns (and foreign keys) each group needs from the tables of the other groups.
+    stub_columns: Dict[str, Dict[str, Tuple[Set[str], Set[str]]]] = {group: {} for group in groups}
+    for key, table in schema.tables.items():
+        for foreign_key in table.foreign_keys:
+            referred_group = table_groups.get(foreign_key.referred_table)
+            if referred_group is None or referred_group == table_groups[key]:
+                continue
+            referred = schema.tables[foreign_key.referred_table]
+            referred_column = next(
+                column.name for column in referred.columns if column.key == foreign_key.referred_column
+            )
+            # The referring group shows the table it points to...
+            columns, _ = stub_columns[table_groups[key]].setdefault(foreign_key.referred_table, (set(), set()))
+            columns.add(referred_column)
+            # ...and the referred group shows the table pointing at it, with the foreign key itself.
+            columns, foreign_keys = stub_columns[referred_group].setdefault(key, (set(), set()))
+            columns.add(foreign_key.column)
+            foreign_keys.add(foreign_key.column)
+
+    return {
+        group: Schema(
+            [schema.tables[key] for key in groups[group]]
+            + [
+                _stub(schema.tables[key], columns, foreign_keys)
+                for key, (columns, foreign_keys) in stub_columns[group].items()
+            ]
+        )
+        for group in sorted(groups)
+    }
+
+
+def group_file_name(group: str, format: Formats) -> str:
+    name = re.sub(r"[^\w.-]+", "_", group).strip(".") or DEFAULT_GROUP
+    return f"{name}.{FILE_EXTENSIONS.get(format, format.value)}"
+
+
+def _render_group(
+    schema: Schema,
+    format: Formats,
+    column_sort: str,
+    omit_comments: bool,
+    max_enum_members: int,
+    layout: Optional[Layouts],
+    type_parameter_delimiter: str,
+) -> str:
+    graph = str(
+        get_transformer(
+            schema,
+            format=format.value,
+            column_sort=column_sort,
+            omit_comments=omit_comments,
+            max_enum_members=max_enum_members,
+            layout=layout if format in (Formats.mermaid, Formats.mmd) else None,
+            type_parameter_delimiter=type_parameter_delimiter,
+        )
+    )
+    return graph if graph.endswith("\n") else f"{graph}\n"
+
+
+def write_split_graphs(
+    schema: Schema,
+    *,
+    split_by: str,
+    directory: Path,
+    formats: List[Formats],
+    column_sort: str,
+    omit_comments: bool = False,
+    max_enum_members: int = 0,
+    layout: Optional[Layouts] = None,
+    type_parameter_delimiter: str = "-",
+    jobs: int = 1,
+) -> List[Path]:
+    """Write one diagram per group and format into a directory, along with an index of them.
+
+    With more than one of ``jobs`` the groups are rendered concurrently on a process pool of that size. Files whose
+    content didn't change are left untouched. Returns the paths of the diagrams.
+    """
+    group_of = parse_split_by(split_by)
+    schemas = group_schemas(schema, group_of)
+    files: Dict[Tuple[str, Formats], str] = {}
+    for group in schemas:
+        for format in formats:
+            files[group, format] = group_file_name(group, format)
+    if len(set(files.values())) != len(files):
+        raise ValueError("Several groups would be written to the same file, use a pattern with distinct group names.")
+
+    directory.mkdir(parents=True, exist_ok=True)
+    arguments = (column_sort, omit_comments, max_enum_members, layout, type_parameter_delimiter)
+    tasks = list(files)
+
+    with phase("render"):
+        if jobs > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                futures = [
+                    executor.submit(_render_group, schemas[group], format, *arguments) for group, format in tasks
+                ]
+                rendered = [future.result() for future in futures]
+        else:
+            rendered = [_render_group(schemas[group], format, *arguments) for group, format in tasks]
+
+    paths = []
+    with phase("write"):
+        for (group, format), graph in zip(tasks, rendered):
+            path = directory / files[group, format]
+            write_if_changed(path, [graph])
+            paths.append(path)
+
+    table_counts = Counter(group_of(table) for table in schema.tables.values())
+    index = ["# Diagrams\n", "\n"]
+    for group in schemas:
+        links = ", ".join(f"[{files[group, format]}]({files[group, format]})" for format in formats)
+        tables = table_counts[group]
+        index.append(f"- **{group}** ({tables} table{'s' if tables != 1 else ''}): {links}\n")
+    write_if_changed(directory / INDEX_FILE, index)
+    return paths
@@ -0,0 +1,737 @@
+"""Extract the tables of SQLAlchemy models by reading their source code instead of importing it.
+
+The modules named by the base class and the imports are parsed with ``ast``, along with every project module they
+import, in the order Python would import them. Declarative model classes and ``Table`` definitions are turned into
+real SQLAlchemy tables in a fresh ``MetaData``, so the rest of the pipeline handles them exactly like imported models.
+
+No project code is ever executed. Only literals, names defined in the parsed modules and SQLAlchemy objects are
+evaluated, so anything computed at import time (``declared_attr`` functions, custom ``type_annotation_map`` entries,
+types returned by helper functions) can't be resolved. Such models are skipped and such columns fall back to
+``NullType``, with a warning.
+"""
+
+import ast
+import enum
+import importlib
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import sqlalchemy
+from sqlalchemy import orm
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.sql.schema import Column, ForeignKey, MetaData, Table
+from sqlalchemy.types import NullType, TypeDecorator, TypeEngine
+from sqlalchemy.util import merge_lists_w_ordering
+
+from .sources import find_module_file, import_base, module_name, module_package
+
+logger = logging.getLogger(__name__)
+
+# The SQLAlchemy types used for ``Mapped[...]`` annotations by the default type annotation map.
+ANNOTATION_TYPES: Dict[str, type[TypeEngine]] = {
+    "builtins.bool": sqlalchemy.Boolean,
+    "builtins.bytes": sqlalchemy.LargeBinary,
+    "builtins.float": sqlalchemy.Float,
+    "builtins.int": sqlalchemy.Integer,
+    "builtins.str": sqlalchemy.String,
+    "datetime.date": sqlalchemy.Date,
+    "datetime.datetime": sqlalchemy.DateTime,
+    "datetime.time": sqlalchemy.Time,
+    "datetime.timedelta": sqlalchemy.Interval,
+    "decimal.Decimal": sqlalchemy.Numeric,
+    "uuid.UUID": sqlalchemy.Uuid,
+}
+
+ENUM_BASES = frozenset({"enum.Enum", "enum.IntEnum", "enum.StrEnum"})
+OPTIONAL_TYPES = frozenset({"typing.Optional", "typing_extensions.Optional"})
+UNION_TYPES = frozenset({"typing.Union", "typing_extensions.Union"})
+
+COLUMN_OPTIONS = ("primary_key", "nullable", "unique", "index", "comment")
+CONSTRAINTS = (sqlalchemy.UniqueConstraint, sqlalchemy.PrimaryKeyConstraint, sqlalchemy.ForeignKeyConstraint)
+
+# Nested references (re-exports, constants defined from other constants) are only followed this deep.
+MAX_DEPTH = 32
+
+
+class _Unknown:
+    """The value of an expression which can't be evaluated without running project code."""
+
+    def __repr__(self) -> str:
+        return "UNKNOWN"
+
+
+UNKNOWN = _Unknown()
+
+
+class _External(NamedTuple):
+    """A name defined outside of the project, such as ``uuid.UUID`` or a builtin."""
+
+    name: str
+
+
+class _ModuleRef(NamedTuple):
+    """A project module used as a value, as in ``import app.models``."""
+
+    name: str
+
+
+class _Module:
+    def __init__(self, name: str, path: Path) -> None:
+        self.name = name
+        self.tree = ast.parse(path.read_bytes(), filename=str(path))
+        self.package = module_package(name, path)
+        # Top level classes and assigned expressions, by name.
+        self.names: Dict[str, Any] = {}
+        # Imported names, mapped to the module they come from and the imported attribute (None for modules).
+        self.imports: Dict[str, Tuple[str, Optional[str]]] = {}
+        self.star_imports: List[str] = []
+
+
+class _Assigned(NamedTuple):
+    """A name bound to an expression, either at the top level of a module or in a class body."""
+
+    module: _Module
+    name: str
+    expression: ast.AST
+
+
+class _Class:
+    def __init__(self, module: _Module, node: ast.ClassDef) -> None:
+        self.module = module
+        self.node = node
+        self.name = node.name
+        self.attributes: Dict[str, ast.AST] = {}
+        self.annotations: Dict[str, ast.expr] = {}
+        names: List[str] = []
+        for statement in node.body:
+            if isinstance(statement, ast.Assign):
+                if len(statement.targets) != 1 or not isinstance(statement.targets[0], ast.Name):
+                    continue
+                name = statement.targets[0].id
+                self.attributes[name] = statement.value
+            elif isinstance(statement, ast.AnnAssign) and isinstance(statement.target, ast.Name):
+                name = statement.target.id
+                self.annotations[name] = statement.annotation
+                if statement.value is None:
+                    continue
+                self.attributes[name] = statement.value
+            elif isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                # Functions such as a ``declared_attr`` for ``__tablename__`` can't be evaluated, but still hide the
+                # attributes of the same name in the parent classes.
+                name = statement.name
+                self.attributes[name] = statement
+            else:
+                continue
+            if name not in names:
+                names.append(name)
+
+        # Attribute names in the order declarative scans them, which is also the column order: annotation only
+        # attributes aren't part of the class dictionary and get merged into it.
+        self.order: List[str] = merge_lists_w_ordering(names, list(self.annotations))
+
+    def __repr__(self) -> str:
+        return f"<class {self.module.name}.{self.name}>"
+
+
+class _ColumnRef(NamedTuple):
+    """A column attribute of a model class, as in ``ForeignKey(User.id)``."""
+
+    model: _Class
+    attribute: str
+
+
+class _Call(NamedTuple):
+    """A call to one of the SQLAlchemy schema constructs, evaluated once the context is known."""
+
+    function: Any
+    module: _Module
+    node: ast.Call
+
+
+class StaticExtractor:
+    """Build a ``MetaData`` from the source of the project modules found under the roots."""
+
+    def __init__(self, roots: Sequence[Path]) -> None:
+        self.roots = roots
+        self.metadata = MetaData()
+        self.modules: Dict[str, Optional[_Module]] = {}
+        # Classes and top level calls in the order the interpreter would run them.
+        self.definitions: List[Any] = []
+        self.tables: Dict[_Class, Table] = {}
+        self.base: Any = None
+        self._enums: Dict[_Class, Optional[type[enum.Enum]]] = {}
+        self._externals: Dict[str, Any] = {}
+
+    def extract(self, base_class_path: str, import_module: List[str]) -> MetaData:
+        module_path, class_name = base_class_path.split(":", 2)
+        base_module = self.load(module_path)
+        if base_module is None:
+            raise ValueError(f"Unable to find the source of module {module_path} in {', '.join(map(str, self.roots))}.")
+        self.base = self._lookup(base_module, class_name)
+        if self.base is None:
+            raise ValueError(f"Unable to find {class_name} in the source of module {module_path}.")
+
+        for module in import_module:
+            if self.load(module_name(module)) is None:
+                raise ValueError(
+                    f"Unable to find the source of module {module_name(module)} in {', '.join(map(str, self.roots))}."
+                )
+
+        for definition in self.definitions:
+            if isinstance(definition, _Class):
+                self._add_model(definition)
+            else:
+                self._add_table(*definition)
+
+        return self.metadata
+
+    # Loading modules
+
+    def load(self, name: str) -> Optional[_Module]:
+        """Parse a project module, and the project modules it imports, unless that already happened."""
+        if name in self.modules:
+            return self.modules[name]
+
+        # Importing a submodule runs the __init__.py files of its parent packages first.
+        parent, _, _ = name.rpartition(".")
+        if parent:
+            self.load(parent)
+
+        path = find_module_file(name, self.roots)
+        if path is None:
+            self.modules[name] = None
+            return None
+
+        module = self.modules[name] = _Module(name, path)
+        self._run(module, module.tree.body)
+        return module
+
+    def _run(self, module: _Module, statements: List[ast.stmt]) -> None:
+        for statement in statements:
+            if isinstance(statement, ast.Import):
+                for alias in statement.names:
+                    self.load(alias.name)
+                    if alias.asname:
+                        module.imports[alias.asname] = (alias.name, None)
+                    else:
+                        top_level = alias.name.split(".")[0]
+                        module.imports[top_level] = (top_level, None)
+            elif isinstance(statement, ast.ImportFrom):
+                base = import_base(statement, module.package)
+                if not base:
+                    continue
+                self.load(base)
+                for alias in statement.names:
+                    if alias.name == "*":
+                        module.star_imports.append(base)
+                        continue
+                    if find_module_file(f"{base}.{alias.name}", self.roots) is not None:
+                        self.load(f"{base}.{alias.name}")
+                    module.imports[alias.asname or alias.name] = (base, alias.name)
+            elif isinstance(statement, ast.ClassDef):
+                model = _Class(module, statement)
+                module.names[statement.name] = model
+                self.definitions.append(model)
+            elif isinstance(statement, (ast.Assign, ast.AnnAssign)):
+                targets = statement.targets if isinstance(statement, ast.Assign) else [statement.target]
+                if statement.value is None or len(targets) != 1 or not isinstance(targets[0], ast.Name):
+                    continue
+                module.names[targets[0].id] = statement.value
+                if isinstance(statement.value, ast.Call):
+                    self.definitions.append((module, statement.value))
+            elif isinstance(statement, ast.If):
+                # Imports guarded by TYPE_CHECKING never run.
+                if not _is_type_checking(statement.test):
+                    self._run(module, statement.body)
+                self._run(module, statement.orelse)
+            elif isinstance(statement, ast.Try):
+                self._run(module, statement.body + statement.orelse + statement.finalbody)
+            elif isinstance(statement, ast.With):
+                self._run(module, statement.body)
+
+    # Resolving names
+
+    def _lookup(self, module: _Module, name: str, depth: int = 0) -> Any:
+        """Resolve a top level name of a module, returning None if the module doesn't define it."""
+        if depth > MAX_DEPTH:
+            return None
+        if name in module.names:
+            value = module.names[name]
+            return value if isinstance(value, _Class) else _Assigned(module, name, value)
+        if name in module.imports:
+            source, attribute = module.imports[name]
+            if attribute is None:
+                return _ModuleRef(source) if self.modules.get(source) is not None else _External(source)
+            return self._member(source, attribute, depth + 1)
+        for source in module.star_imports:
+            target = self.modules.get(source)
+            if target is not None:
+                symbol = self._lookup(target, name, depth + 1)
+                if symbol is not None:
+                    return symbol
+        return None
+
+    def _member(self, source: str, attribute: str, depth: int = 0) -> Any:
+        target = self.modules.get(source)
+        if target is None:
+            return _External(f"{source}.{attribute}")
+        symbol = self._lookup(target, attribute, depth)
+        if symbol is not None:
+            return symbol
+        if self.modules.get(f"{source}.{attribute}") is not None:
+            return _ModuleRef(f"{source}.{attribute}")
+        return UNKNOWN
+
+    def symbol(self, module: _Module, node: ast.AST) -> Any:
+        """Resolve a name or attribute expression to a class, an assignment, a module or an external name."""
+        if isinstance(node, ast.Name):
+            symbol = self._lookup(module, node.id)
+            return symbol if symbol is not None else _External(f"builtins.{node.id}")
+        if isinstance(node, ast.Attribute):
+            return self._attribute(self.symbol(module, node.value), node.attr)
+        return UNKNOWN
+
+    def _attribute(self, symbol: Any, attribute: str) -> Any:
+        if isinstance(symbol, _ModuleRef):
+            return self._member(symbol.name, attribute)
+        if isinstance(symbol, _External):
+            return _External(f"{symbol.name}.{attribute}")
+        if isinstance(symbol, _Class):
+            return self._class_attribute(symbol, attribute)
+        return UNKNOWN
+
+    def _class_attribute(self, model: _Class, attribute: str) -> Any:
+        for owner in self._mro(model):
+            if not isinstance(owner, _Class):
+                continue
+            if attribute in owner.attributes or attribute in owner.annotations:
+                if self._is_column(owner, attribute):
+                    return _ColumnRef(model, attribute)
+                if attribute in owner.attributes:
+                    return _Assigned(owner.module, attribute, owner.attributes[attribute])
+                return UNKNOWN
+        return UNKNOWN
+
+    def _external(self, name: str) -> Any:
+        """Get the actual object for an external name, but only from SQLAlchemy."""
+        if name.split(".")[0] != "sqlalchemy":
+            return _External(name)
+        if name not in self._externals:
+            value: Any = _External(name)
+            parts = name.split(".")
+            for index in range(len(parts), 0, -1):
+                try:
+                    value = importlib.import_module(".".join(parts[:index]))
+                except ImportError:
+                    continue
+                try:
+                    for part in parts[index:]:
+                        value = getattr(value, part)
+                except AttributeError:
+                    value = _External(name)
+                break
+            self._externals[name] = value
+        return self._externals[name]
+
+    def _mro(self, model: _Class) -> List[Any]:
+        """A simplified method resolution order: the class followed by its bases, depth first."""
+        result: List[Any] = [model]
+        for node in model.node.bases:
+            base = self.symbol(model.module, node)
+            for item in self._mro(base) if isinstance(base, _Class) else [base]:
+                if item not in result:
+                    result.append(item)
+        return result
+
+    # Evaluating expressions
+
+    def evaluate(self, module: _Module, node: ast.AST, depth: int = 0) -> Any:
+        if depth > MAX_DEPTH:
+            return UNKNOWN
+        if isinstance(node, ast.Constant):
+            return node.value
+        if isinstance(node, (ast.Tuple, ast.List)):
+            items = tuple(self.evaluate(module, item, depth + 1) for item in node.elts)
+            return items if isinstance(node, ast.Tuple) else list(items)
+        if isinstance(node, ast.Dict):
+            return {
+                self.evaluate(module, key, depth + 1): self.evaluate(module, value, depth + 1)
+                for key, value in zip(node.keys, node.values)
+                if key is not None
+            }
+        if isinstance(node, ast.JoinedStr):
+            parts = []
+            for part in node.values:
+                value = part.value if isinstance(part, ast.FormattedValue) else part
+                evaluated = self.evaluate(module, value, depth + 1)
+                if evaluated is UNKNOWN or (isinstance(part, ast.FormattedValue) and part.format_spec is not None):
+                    return UNKNOWN
+                parts.append(str(evaluated))
+            return "".join(parts)
+        if isinstance(node, (ast.Name, ast.Attribute)):
+            return self._value(self.symbol(module, node), depth + 1)
+        if isinstance(node, ast.Call):
+            return self._call(module, node, depth + 1)
+        return UNKNOWN
+
+    def _value(self, symbol: Any, depth: int = 0) -> Any:
+        if isinstance(symbol, _Assigned):
+            return self.evaluate(symbol.module, symbol.expression, depth + 1)
+        if isinstance(symbol, _External):
+            return self._external(symbol.name)
+        return symbol
+
+    def _call(self, module: _Module, node: ast.Call, depth: int = 0) -> Any:
+        function = self._value(self.symbol(module, node.func), depth + 1)
+        if function in (orm.mapped_column, Column, ForeignKey, Table) or function in CONSTRAINTS:
+            return _Call(function, module, node)
+
+        if isinstance(function, type) and issubclass(function, TypeEngine):
+            return self._type(function, module, node, depth)
+
+        if isinstance(function, _Class):
+            # Project defined TypeDecorators pass their arguments on to the type they decorate.
+            if any(
+                isinstance(base, type) and issubclass(base, TypeDecorator) for base in self._external_bases(function)
+            ):
+                impl = self._value(self._class_attribute(function, "impl"), depth + 1)
+                if isinstance(impl, TypeEngine):
+                    return impl
+                if isinstance(impl, type) and issubclass(impl, TypeEngine):
+                    return self._type(impl, module, node, depth)
+
+        return UNKNOWN
+
+    def _external_bases(self, model: _Class) -> List[Any]:
+        return [self._value(base) for base in self._mro(model) if not isinstance(base, _Class)]
+
+    def _type(self, type_class: type[TypeEngine], module: _Module, node: ast.Call, depth: int) -> Any:
+        args = []
+        for arg in node.args:
+            value = self.evaluate(module, arg, depth)
+            python_enum = self._python_enum(value)
+            args.append(python_enum if python_enum is not None else value)
+        kwargs = {
+            keyword.arg: value
+            for keyword in node.keywords
+            if keyword.arg is not None and (value := self.evaluate(module, keyword.value, depth)) is not UNKNOWN
+        }
+        try:
+            if any(arg is UNKNOWN for arg in args):
+                return type_class()
+            return type_class(*args, **kwargs)
+        except (TypeError, ValueError, SQLAlchemyError):
+            return UNKNOWN
+
+    def _python_enum(self, value: Any) -> Optional[type[enum.Enum]]:
+        """Recreate a project Enum class from its member names, which are what SQLAlchemy stores by default."""
+        if not isinstance(value, _Class):
+            return None
+        if value not in self._enums:
+            bases = {base.name for base in self._external_bases(value) if isinstance(base, _External)}
+            members = [
+                name
+                for name in value.order
+                if not name.startswith("_") and isinstance(value.attributes.get(name), ast.expr)
+            ]
+            # The functional API is called through Any since type checkers expect a literal class name.
+            enum_factory: Any = enum.Enum
+            self._enums[value] = enum_factory(value.name, members) if bases & ENUM_BASES and members else None
+        return self._enums[value]
+
+    def _annotation(self, module: _Module, node: ast.AST) -> Optional[Tuple[Any, bool]]:
+        """Read a ``Mapped[...]`` annotation, returning its column type (if known) and whether it is optional.
+
+        Returns None for any other annotation.
+        """
+        if isinstance(node, ast.Constant) and isinstance(node.value, str):
+            try:
+                node = ast.parse(node.value, mode="eval").body
+            except SyntaxError:
+                return None
+        if not isinstance(node, ast.Subscript) or self._value(self.symbol(module, node.value)) is not orm.Mapped:
+            return None
+
+        inner, optional = _unwrap_optional(self, module, node.slice)
+        symbol = self.symbol(module, inner)
+        if isinstance(symbol, _External) and symbol.name in ANNOTATION_TYPES:
+            return ANNOTATION_TYPES[symbol.name](), optional
+        python_enum = self._python_enum(symbol)
+        if python_enum is not None:
+            return sqlalchemy.Enum(python_enum), optional
+        return None, optional
+
+    # Building tables
+
+    def _is_column(self, owner: _Class, attribute: str) -> bool:
+        value = owner.attributes.get(attribute)
+        if value is None:
+            annotation = owner.annotations.get(attribute)
+            return annotation is not None and self._annotation(owner.module, annotation) is not None
+        call = self.evaluate(owner.module, value) if isinstance(value, ast.Call) else None
+        return isinstance(call, _Call) and call.function in (orm.mapped_column, Column)
+
+    def _column(self, owner: _Class, attribute: str) -> Optional[Column]:
+        if not self._is_column(owner, attribute):
+            return None
+        value = owner.attributes.get(attribute)
+        call = self.evaluate(owner.module, value) if value is not None else None
+        annotation = owner.annotations.get(attribute)
+        mapped = self._annotation(owner.module, annotation) if annotation is not None else None
+        if isinstance(call, _Call) and call.function is Column:
+            # Annotations only inform the type of mapped_column(), not of Column().
+            mapped = None
+        return self._build_column(call, attribute, mapped, f"{owner.name}.{attribute}")
+
+    def _build_column(
+        self, call: Optional[_Call], attribute: Optional[str], mapped: Optional[Tuple[Any, bool]], label: str
+    ) -> Optional[Column]:
+        args: List[Any] = []
+        options: Dict[str, Any] = {}
+        if call is not None:
+            args = [self.evaluate(call.module, arg) for arg in call.node.args]
+            for keyword in call.node.keywords:
+                if keyword.arg in COLUMN_OPTIONS + ("name", "type_"):
+                    value = self.evaluate(call.module, keyword.value)
+                    if value is not UNKNOWN:
+                        options[keyword.arg] = value
+
+        name = options.pop("name", None)
+        if name is None:
+            name = next((arg for arg in args if isinstance(arg, str)), attribute)
+        if name is None:
+            return None
+
+        column_type = options.pop("type_", None)
+        if column_type is None:
+            column_type = next(
+                (
+                    arg
+                    for arg in args
+                    if isinstance(arg, TypeEngine) or (isinstance(arg, type) and issubclass(arg, TypeEngine))
+                ),
+                None,
+            )
+        if column_type is None and mapped is not None:
+            column_type = mapped[0]
+
+        foreign_keys = []
+        for arg in args:
+            if isinstance(arg, _Call) and arg.function is ForeignKey and arg.node.args:
+                target = self.evaluate(arg.module, arg.node.args[0])
+                if isinstance(target, (str, _ColumnRef)):
+                    foreign_keys.append(ForeignKey(self._column_target(target)))
+                else:
+                    logger.warning(f"Unable to resolve the foreign key of column '{label}', skipping it.")
+        if column_type is None and not foreign_keys:
+            logger.warning(f"Unable to determine the type of column '{label}', using NullType.")
+            column_type = NullType()
+
+        if mapped is not None and "nullable" not in options and not options.get("primary_key"):
+            options["nullable"] = mapped[1]
+
+        if column_type is None:
+            return Column(name, *foreign_keys, **options)
+        return Column(name, column_type, *foreign_keys, **options)
+
+    def _column_target(self, value: Any, qualified: bool = True) -> str:
+        """Turn a column reference into the ``table.column`` strings SQLAlchemy resolves (or just the column name)."""
+        if isinstance(value, _ColumnRef):
+            column = self._column(self._owner(value.model, value.attribute), value.attribute)
+            name = column.name if column is not None else value.attribute
+            if not qualified:
+                return name
+            table = self.tables.get(value.model)
+            table_name = table.fullname if table is not None else self._table_name(value.model)
+            return f"{table_name}.{name}"
+        if isinstance(value, str):
+            return value
+        raise ValueError(f"Unable to resolve the column {value!r}.")
+
+    def _owner(self, model: _Class, attribute: str) -> _Class:
+        for owner in self._mro(model):
+            if isinstance(owner, _Class) and (attribute in owner.attributes or attribute in owner.annotations):
+                return owner
+        return model
+
+    def _table_name(self, model: _Class) -> str:
+        tablename = self._value(self._class_attribute(model, "__tablename__"))
+        schema = self._table_options(model)[1].get("schema")
+        return f"{schema}.{tablename}" if schema else str(tablename)
+
+    def _table_options(self, model: _Class) -> Tuple[List[Any], Dict[str, Any]]:
+        """The constraints and keyword arguments of the ``__table_args__`` of a model, which may be inherited."""
+        table_args = self._value(self._class_attribute(model, "__table_args__"))
+        if isinstance(table_args, dict):
+            return [], table_args
+        if isinstance(table_args, tuple):
+            if table_args and isinstance(table_args[-1], dict):
+                return list(table_args[:-1]), table_args[-1]
+            return list(table_args), {}
+        return [], {}
+
+    def _constraint(self, call: _Call) -> Any:
+        args = [self.evaluate(call.module, arg) for arg in call.node.args]
+        name = next(
+            (self.evaluate(call.module, keyword.value) for keyword in call.node.keywords if keyword.arg == "name"),
+            None,
+        )
+        name = name if isinstance(name, str) else None
+        try:
+            if call.function is sqlalchemy.ForeignKeyConstraint:
+                columns, referred_columns = args[:2]
+                return sqlalchemy.ForeignKeyConstraint(
+                    [self._column_target(column, qualified=False) for column in columns],
+                    [self._column_target(column) for column in referred_columns],
+                    name=name,
+                )
+            return call.function(*(self._column_target(arg, qualified=False) for arg in args), name=name)
+        except (ValueError, TypeError):
+            logger.warning(f"Unable to read constraint {ast.unparse(call.node)}, skipping it.")
+            return None
+
+    def _add_model(self, model: _Class) -> None:
+        mro = self._mro(model)
+        if model is self.base or self.base not in mro:
+            return
+        if "__abstract__" in model.attributes and self.evaluate(model.module, model.attributes["__abstract__"]) is True:
+            return
+
+        if "__table__" in model.attributes:
+            table = self._add_table(model.module, model.attributes["__table__"])
+            if table is not None:
+                self.tables[model] = table
+            return
+
+        parents = [base for base in mro[1:] if isinstance(base, _Class) and base in self.tables]
+        own_tablename = (
+            self.evaluate(model.module, model.attributes["__tablename__"])
+            if "__tablename__" in model.attributes
+            else None
+        )
+        if own_tablename is None and parents:
+            # Single table inheritance: the columns of the subclass are added to the table of its parent.
+            table = self.tables[model] = self.tables[parents[0]]
+            for attribute in model.order:
+                column = self._column(model, attribute)
+                if column is not None and column.name not in table.c:
+                    table.append_column(column)
+            return
+
+        tablename = self._value(self._class_attribute(model, "__tablename__"))
+        if not isinstance(tablename, str):
+            logger.warning(f"Unable to determine the table name of model '{model.name}', skipping it.")
+            return
+
+        # Columns declared on the class come first, then the ones from its mixins and abstract bases. Classes which
+        # are already part of the table of a parent model don't add their columns again.
+        inherited = {base for parent in parents for base in self._mro(parent)}
+        columns: Dict[str, Column] = {}
+        for owner in mro:
+            if not isinstance(owner, _Class) or owner in inherited or owner is self.base:
+                continue
+            for attribute in owner.order:
+                if attribute in columns:
+                    continue
+                column = self._column(owner, attribute)
+                if column is not None:
+                    columns[attribute] = column
+
+        constraints, options = self._table_options(model)
+        constraint_objects = [
+            self._constraint(constraint)
+            for constraint in constraints
+            if isinstance(constraint, _Call) and constraint.function in CONSTRAINTS
+        ]
+        try:
+            self.tables[model] = Table(
+                tablename,
+                self.metadata,
+                *columns.values(),
+                *(constraint for constraint in constraint_objects if constraint is not None),
+                **{key: value for key, value in options.items() if key in ("schema", "comment")},
+            )
+        except SQLAlchemyError as error:
+            logger.warning(f"Unable to create the table of model '{model.name}', skipping it: {error}")
+
+    def _add_table(self, module: _Module, node: ast.AST) -> Optional[Table]:
+        """Add a ``Table(...)`` call to the metadata if it is bound to the metadata of the base class."""
+        call = self.evaluate(module, node)
+        if not isinstance(call, _Call) or call.function is not Table or len(call.node.args) < 2:
+            return None
+        if not self._is_base_metadata(module, call.node.args[1]):
+            return None
+
+        name = self.evaluate(module, call.node.args[0])
+        if not isinstance(name, str):
+            return None
+
+        items: List[Any] = []
+        for arg in call.node.args[2:]:
+            value = self.evaluate(module, arg)
+            if not isinstance(value, _Call):
+                continue
+            if value.function is Column:
+                items.append(self._build_column(value, None, None, f"{name}.?"))
+            elif value.function in CONSTRAINTS:
+                items.append(self._constraint(value))
+
+        options = {
+            keyword.arg: self.evaluate(module, keyword.value)
+            for keyword in call.node.keywords
+            if keyword.arg in ("schema", "comment")
+        }
+        try:
+            return Table(
+                name,
+                self.metadata,
+                *(item for item in items if item is not None),
+                **{key: value for key, value in options.items() if value is not UNKNOWN},
+            )
+        except SQLAlchemyError as error:
+            logger.warning(f"Unable to create the table '{name}', skipping it: {error}")
+            return None
+
+    def _is_base_metadata(self, module: _Module, node: ast.AST, depth: int = 0) -> bool:
+        if depth > MAX_DEPTH:
+            return False
+        if isinstance(node, ast.Attribute) and node.attr == "metadata" and self.symbol(module, node.value) == self.base:
+            return True
+        symbol = self.symbol(module, node)
+        if isinstance(self.base, _Assigned) and isinstance(self.base.expression, ast.Call):
+            # declarative_base(metadata=...)
+            for keyword in self.base.expression.keywords:
+                if keyword.arg == "metadata" and self.symbol(self.base.module, keyword.value) == symbol:
+                    return True
+        if isinstance(symbol, _Assigned):
+            return self._is_base_metadata(symbol.module, symbol.expression, depth + 1)
+        return False
+
+
+def _is_type_checking(node: ast.expr) -> bool:
+    return (isinstance(node, ast.Name) and node.id == "TYPE_CHECKING") or (
+        isinstance(node, ast.Attribute) and node.attr == "TYPE_CHECKING"
+    )
+
+
+def _unwrap_optional(extractor: StaticExtractor, module: _Module, node: ast.expr) -> Tuple[ast.expr, bool]:
+    """Strip ``Optional[...]``, ``Union[..., None]`` and ``... | None`` from an annotation."""
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.BitOr):
+        for side, other in ((node.left, node.right), (node.right, node.left)):
+            if isinstance(other, ast.Constant) and other.value is None:
+                return side, True
+    if isinstance(node, ast.Subscript):
+        symbol = extractor.symbol(module, node.value)
+        if isinstance(symbol, _External) and symbol.name in OPTIONAL_TYPES:
+            return node.slice, True
+        if isinstance(symbol, _External) and symbol.name in UNION_TYPES and isinstance(node.slice, ast.Tuple):
+            members = [item for item in node.slice.elts if not (isinstance(item, ast.Constant) and item.value is None)]
+            if len(members) == 1 and len(members) < len(node.slice.elts):
+                return members[0], True
+    return node, False
+
+
+def static_metadata(*, base_class_path: str, import_module: List[str], roots: Sequence[Path]) -> MetaData:
+    """Read the tables of the models from their source files, without importing any project code."""
+    return StaticExtractor(roots).extract(base_class_path, import_module)
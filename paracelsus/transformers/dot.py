@@ -1,84 +1,97 @@
-import logging
-from typing import ClassVar, Optional
+from functools import cached_property, lru_cache
+from typing import TYPE_CHECKING, ClassVar, Dict, Iterator, List, Literal, Optional, TextIO, Tuple, Union
 
-from sqlalchemy.sql.schema import MetaData, Table
-
-from paracelsus.compat.pydot_compat import Dot as PydotDot
-from paracelsus.compat.pydot_compat import Edge, Node
 from paracelsus.config import Layouts
+from paracelsus.metadata import SchemaSource
+from paracelsus.schema import Schema, TableRecord, extract_schema
+
+from . import dot_writer
+from .parallel import ChunkPool
+
+if TYPE_CHECKING:
+    from paracelsus.compat.pydot_compat import Dot as PydotDot
+
+DotBackend = Literal["native", "pydot"]
+
+# A node is described by its name and attributes, an edge by its endpoints and attributes.
+NodeElement = Tuple[str, Dict[str, str]]
+EdgeElement = Tuple[str, str, Dict[str, str]]
+
+
+@lru_cache(maxsize=None)
+def column_attributes(primary_key: bool, foreign_key: bool, unique: bool) -> str:
+    """The key attributes shown next to a column. There are only a handful of combinations, each is joined once."""
+    attributes = set([])
+    if primary_key:
+        attributes.add("Primary Key")
 
-from .utils import is_unique, sort_columns
+    if foreign_key:
+        attributes.add("Foreign Key")
 
-logger = logging.getLogger(__name__)
+    if unique and not primary_key:
+        attributes.add("Unique")
+
+    return ", ".join(sorted(attributes))
 
 
 class Dot:
     comment_format: ClassVar[str] = "dot"
+    graph_name: ClassVar[str] = "database"
+    graph_type: ClassVar[str] = "graph"
 
     def __init__(
         self,
-        metaclass: MetaData,
+        metaclass: Union[SchemaSource, Schema],
         column_sort: str,
         omit_comments: bool = False,
         layout: Optional[Layouts] = None,
+        backend: DotBackend = "native",
+        jobs: int = 1,
     ) -> None:
-        self.metadata: MetaData = metaclass
-        self.graph: PydotDot = PydotDot("database", graph_type="graph")
+        if backend not in ("native", "pydot"):
+            raise ValueError(f"Unknown Dot backend: {backend}")
+
+        self.schema: Schema = metaclass if isinstance(metaclass, Schema) else extract_schema(metaclass)
         self.column_sort: str = column_sort
         self.omit_comments: bool = omit_comments
         self.layout: Optional[Layouts] = layout
-
-        for table in self.metadata.tables.values():
-            node = Node(name=table.name)
-            node.set("label", self._table_label(table))
-            node.set("shape", "none")
-            node.set("margin", "0")
-            self.graph.add_node(node)
-            for column in table.columns:
-                for foreign_key in column.foreign_keys:
-                    key_parts = foreign_key.target_fullname.split(".")
-                    left_table = ".".join(key_parts[:-1])
-                    left_column = key_parts[-1]
-
-                    # We don't add the connection to the fk table if the latter
-                    # is not included in our graph.
-                    if left_table not in self.metadata.tables:
-                        logger.warning(
-                            f"Table '{table}.{column.name}' is a foreign key to '{left_table}' "
-                            "which is not included in the graph, skipping the connection."
-                        )
-                        continue
-
-                    edge = Edge(left_table.split(".")[-1], table.name)
-                    edge.set("label", column.name)
-                    edge.set("dir", "both")
-
-                    edge.set("arrowhead", "none")
-                    if not is_unique(column):
-                        edge.set("arrowhead", "crow")
-
-                    l_column = self.metadata.tables[left_table].columns[left_column]
-                    edge.set("arrowtail", "none")
-                    if not is_unique(l_column) and not l_column.primary_key:
-                        edge.set("arrowtail", "crow")
-
-                    self.graph.add_edge(edge)
-
-    def _table_label(self, table: Table) -> str:
+        self.backend: DotBackend = backend
+        self.jobs: int = jobs
+
+    def _elements(self) -> Iterator[Tuple[NodeElement, List[EdgeElement]]]:
+        """Yield every table node along with the edges of its foreign keys, in output order."""
+        for table in self.schema.tables.values():
+            yield self._table_elements(table)
+
+    def _table_elements(self, table: TableRecord) -> Tuple[NodeElement, List[EdgeElement]]:
+        node = (table.name, {"label": self._table_label(table), "shape": "none", "margin": "0"})
+        edges = []
+        for edge in self.schema.edges[table.key]:
+            attributes = {
+                "label": edge.column,
+                "dir": "both",
+                "arrowhead": "none" if edge.referring_unique else "crow",
+                "arrowtail": "none" if edge.referred_unique else "crow",
+            }
+            edges.append((edge.referred_name, table.name, attributes))
+        return node, edges
+
+    def _table_chunk(self, table: TableRecord) -> str:
+        """Render the node of a table followed by the edges of its foreign keys."""
+        (name, node_attributes), edges = self._table_elements(table)
+        chunk = dot_writer.node_statement(name, node_attributes)
+        for source, destination, edge_attributes in edges:
+            chunk += dot_writer.edge_statement(source, destination, edge_attributes, self.graph_type)
+        return chunk
+
+    def _table_label(self, table: TableRecord) -> str:
         column_output = ""
-        columns = sort_columns(table_columns=table.columns, column_sort=self.column_sort)
-        for column in columns:
-            attributes = set([])
-            if column.primary_key:
-                attributes.add("Primary Key")
-
-            if len(column.foreign_keys) > 0:
-                attributes.add("Foreign Key")
-
-            if is_unique(column) and not column.primary_key:
-                attributes.add("Unique")
-
-            column_output += f'        <tr><td align="left">{column.type}</td><td align="left">{column.name}</td><td>{", ".join(sorted(attributes))}</td></tr>\n'
+        for column in table.sorted_columns(self.column_sort):
+            attributes = column_attributes(column.primary_key, column.foreign_key, column.unique)
+            column_output += (
+                f'        <tr><td align="left">{column.type}</td><td align="left">{column.name}</td>'
+                f"<td>{attributes}</td></tr>\n"
+            )
 
         return f"""<
     <table border="0" cellborder="1" cellspacing="0" cellpadding="4">
@@ -87,5 +100,44 @@ class Dot:
     </table>
 >"""
 
+    @cached_property
+    def graph(self) -> "PydotDot":
+        """The graph as a pydot object, built on first access. Requires the optional pydot dependency."""
+        from paracelsus.compat.pydot_compat import Dot as PydotDot
+        from paracelsus.compat.pydot_compat import Edge, Node
+
+        graph = PydotDot(self.graph_name, graph_type=self.graph_type)
+        for (name, node_attributes), edges in self._elements():
+            node = Node(name=name)
+            for key, value in node_attributes.items():
+                node.set(key, value)
+            graph.add_node(node)
+            for source, destination, edge_attributes in edges:
+                edge = Edge(source, destination)
+                for key, value in edge_attributes.items():
+                    edge.set(key, value)
+                graph.add_edge(edge)
+        return graph
+
+    def iter_chunks(self) -> Iterator[str]:
+        """Yield the rendered graph.
+
+        The native backend yields one chunk per table: its node followed by its foreign key edges. With several
+        ``jobs`` the tables are rendered in batches on a process pool, yielding one chunk per batch.
+        The pydot backend serializes the whole graph at once, so it yields a single chunk.
+        """
+        if self.backend == "pydot":
+            yield self.graph.to_string()
+            return
+
+        yield dot_writer.graph_header(self.graph_name, self.graph_type)
+        with ChunkPool(self, self.jobs) as pool:
+            yield from pool.map("_table_chunk", list(self.schema.tables.values()))
+        yield dot_writer.graph_footer()
+
+    def write(self, fp: TextIO) -> None:
+        for chunk in self.iter_chunks():
+            fp.write(chunk)
+
     def __str__(self) -> str:
-        return self.graph.to_string()
+        return "".join(self.iter_chunks())
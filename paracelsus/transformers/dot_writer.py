@@ -0,0 +1,128 @@
+"""Minimal DOT language writer.
+
+The quoting rules mirror the ones used by pydot (identical in v3 and v4) so the native backend of the ``Dot``
+transformer produces byte-identical output without building a pydot object graph.
+"""
+
+import re
+from typing import Dict, Optional, Tuple
+
+DOT_KEYWORDS = ("graph", "subgraph", "digraph", "node", "edge", "strict")
+
+_RE_NUMERIC = re.compile(r"^([0-9]+\.?[0-9]*|[0-9]*\.[0-9]+)$")
+_RE_DBL_QUOTED = re.compile(r'^".*"$', re.S)
+_RE_HTML = re.compile(r"^<.*>$", re.S)
+_RE_ID_ALPHA_NUMS = re.compile(r"^[_a-zA-Z][a-zA-Z0-9_]*$")
+_RE_ID_ALPHA_NUMS_WITH_PORTS = re.compile(r'^[_a-zA-Z][a-zA-Z0-9_:"]*[a-zA-Z0-9_"]+$')
+_RE_ID_WITH_PORT = re.compile(r"^([^:]*):([^:]*)$")
+
+EMPTY_ATTRIBUTE = '""'
+
+_QUOTE_TRANSLATION = {
+    ord('"'): r"\"",
+    ord("\n"): r"\n",
+    ord("\r"): r"\r",
+}
+
+
+def make_quoted(value: str) -> str:
+    return f'"{value.translate(_QUOTE_TRANSLATION)}"'
+
+
+def _any_needs_quotes(value: str) -> Optional[bool]:
+    if value.isdigit():
+        return False
+
+    if value.isalnum():
+        return value[0].isdigit()
+
+    has_high_chars = any(ord(c) > 0x7F or ord(c) == 0 for c in value)
+    if has_high_chars and not _RE_DBL_QUOTED.match(value) and not _RE_HTML.match(value):
+        return True
+
+    for test_re in (_RE_NUMERIC, _RE_DBL_QUOTED, _RE_HTML):
+        if test_re.match(value):
+            return False
+
+    return None
+
+
+def _id_needs_quotes(value: str) -> bool:
+    if value.lower() in DOT_KEYWORDS:
+        return False
+
+    any_result = _any_needs_quotes(value)
+    if any_result is not None:
+        return any_result
+
+    if _RE_ID_ALPHA_NUMS.match(value) or _RE_ID_ALPHA_NUMS_WITH_PORTS.match(value):
+        return False
+
+    match = _RE_ID_WITH_PORT.match(value)
+    if match:
+        return _id_needs_quotes(match.group(1)) or _id_needs_quotes(match.group(2))
+
+    return True
+
+
+def quote_id(value: str, unquoted_keywords: Tuple[str, ...] = ()) -> str:
+    """Quote an identifier if the DOT language requires it."""
+    if not value:
+        return value
+    if value.lower() in unquoted_keywords:
+        return value
+    if value.lower() in DOT_KEYWORDS or _id_needs_quotes(value):
+        return make_quoted(value)
+    return value
+
+
+def quote_attr(value: str) -> str:
+    """Quote an attribute value if the DOT language requires it."""
+    if value.lower() in DOT_KEYWORDS:
+        return make_quoted(value)
+    if _any_needs_quotes(value) is False:
+        return value
+    return make_quoted(value)
+
+
+def _attributes(attributes: Dict[str, str]) -> str:
+    if not attributes:
+        return ""
+    formatted = [f"{key}={quote_attr(value) if value else EMPTY_ATTRIBUTE}" for key, value in attributes.items()]
+    return f" [{', '.join(formatted)}]"
+
+
+def _endpoint(name: str) -> str:
+    if name.startswith('"') and name.endswith('"'):
+        return name
+
+    port_index = name.rfind(":")
+    if port_index > 0 and name[0] == '"' and name[port_index - 1] == '"':
+        return name
+    if port_index > 0:
+        return f"{quote_id(name[:port_index])}:{quote_id(name[port_index + 1 :])}"
+
+    return quote_id(name)
+
+
+def graph_header(name: str, graph_type: str = "graph") -> str:
+    return f"{graph_type} {quote_id(name)} {{\n"
+
+
+def graph_footer() -> str:
+    return "}\n"
+
+
+def node_statement(name: str, attributes: Dict[str, str]) -> str:
+    # Anything after a colon is treated as a port and dropped from the node name, matching pydot.
+    if not name.startswith('"'):
+        port_index = name.find(":")
+        if 0 < port_index < len(name) - 1:
+            name = name[:port_index]
+
+    return f"{quote_id(name, unquoted_keywords=('graph', 'node', 'edge'))}{_attributes(attributes)};\n"
+
+
+def edge_statement(source: str, destination: str, attributes: Dict[str, str], graph_type: str = "graph") -> str:
+    connector = "->" if graph_type == "digraph" else "--"
+    return f"{_endpoint(source)} {connector} {_endpoint(destination)}{_attributes(attributes)};\n"
@@ -1,16 +1,18 @@
-import logging
 import re
 import textwrap
-from typing import Optional
+from typing import Dict, Iterator, Optional, TextIO, Tuple, Union
 
-import sqlalchemy
-from sqlalchemy.sql.schema import Column, MetaData, Table
+from sqlalchemy.sql.schema import Column
 
 from paracelsus.config import Layouts
+from paracelsus.metadata import SchemaSource
+from paracelsus.schema import ColumnRecord, Schema, TableRecord, extract_column, extract_schema
 
-from .utils import is_unique, sort_columns
+from .parallel import ChunkPool
 
-logger = logging.getLogger(__name__)
+
+# Two type parameters separated by a comma, such as the precision and scale of NUMERIC(10, 2).
+TYPE_PARAMETERS = re.compile(r"\(([^)]*),\s*([^)]*)\)")
 
 
 def sanitize_type_for_mermaid(type_str: str, delimiter: str = "-") -> str:
@@ -35,28 +37,30 @@ def sanitize_type_for_mermaid(type_str: str, delimiter: str = "-") -> str:
         raise ValueError(f"Type parameter delimiter cannot contain commas or spaces, got: {delimiter!r}")
 
     # Replace commas (with optional surrounding spaces) in parentheses with delimiter
-    return re.sub(r"\(([^)]*),\s*([^)]*)\)", rf"(\1{delimiter}\2)", str(type_str))
+    return TYPE_PARAMETERS.sub(rf"(\1{delimiter}\2)", str(type_str))
 
 
 class Mermaid:
     comment_format: str = "mermaid"
-    metadata: MetaData
+    schema: Schema
     column_sort: str
     omit_comments: bool
     max_enum_members: int
     layout: Optional[Layouts]
     type_parameter_delimiter: str
+    jobs: int
 
     def __init__(
         self,
-        metaclass: MetaData,
+        metaclass: Union[SchemaSource, Schema],
         column_sort: str,
         omit_comments: bool = False,
         max_enum_members: int = 0,
         layout: Optional[Layouts] = None,
         type_parameter_delimiter: str = "-",
+        jobs: int = 1,
     ) -> None:
-        self.metadata = metaclass
+        self.schema = metaclass if isinstance(metaclass, Schema) else extract_schema(metaclass)
         self.column_sort = column_sort
         self.omit_comments = omit_comments
         self.max_enum_members = max_enum_members
@@ -68,33 +72,39 @@ class Mermaid:
                 f"Type parameter delimiter cannot contain commas or spaces, got: {type_parameter_delimiter!r}"
             )
         self.type_parameter_delimiter = type_parameter_delimiter
+        self.jobs = jobs
+        # Schemas reuse a few types and enums across many columns, each of them is only formatted once per render.
+        self._types: Dict[str, str] = {}
+        self._enum_summaries: Dict[int, Tuple[Tuple[str, ...], str]] = {}
 
-    def _table(self, table: Table) -> str:
+    def _table(self, table: TableRecord) -> str:
         output = f"  {table.name}"
         output += " {\n"
-        columns = sort_columns(table_columns=table.columns, column_sort=self.column_sort)
-        for column in columns:
+        for column in table.sorted_columns(self.column_sort):
             output += self._column(column)
         output += "  }\n\n"
         return output
 
-    def _column(self, column: Column) -> str:
+    def _column(self, column: Union[ColumnRecord, Column]) -> str:
+        if isinstance(column, Column):
+            column = extract_column(column)
+
         options = []
-        col_type = column.type
-        is_enum = isinstance(col_type, sqlalchemy.Enum)
+        is_enum = column.enum_values is not None
 
-        # Sanitize type string to replace commas with delimiter (GitHub issue #51)
-        sanitized_type = sanitize_type_for_mermaid(str(col_type), self.type_parameter_delimiter)
-        column_str = f"ENUM {column.name}" if is_enum else f"{sanitized_type} {column.name}"
+        if is_enum:
+            column_str = f"ENUM {column.name}"
+        else:
+            column_str = f"{self._type(column.type)} {column.name}"
 
         if column.primary_key:
-            if len(column.foreign_keys) > 0:
+            if column.foreign_key:
                 column_str += " PK,FK"
             else:
                 column_str += " PK"
-        elif len(column.foreign_keys) > 0:
+        elif column.foreign_key:
             column_str += " FK"
-        elif is_unique(column):
+        elif column.unique:
             column_str += " UK"
 
         if column.comment and not self.omit_comments:
@@ -103,20 +113,14 @@ class Mermaid:
         if column.nullable:
             options.append("nullable")
 
-        if column.index:
+        if column.indexed:
             options.append("indexed")
 
         # For ENUM, add values as a separate part
         option_str = ",".join(options)
 
-        if is_enum and self.max_enum_members > 0:
-            enum_list = list(col_type.enums)  # type: ignore # MyPy will fail here, but this code works.
-            if len(enum_list) <= self.max_enum_members:
-                enum_values = ", ".join(enum_list)
-            else:
-                displayed_values = enum_list[: self.max_enum_members - 1]
-                enum_values = ", ".join(displayed_values) + ", ..., " + enum_list[-1]
-
+        if column.enum_values is not None and self.max_enum_members > 0:
+            enum_values = self._enum_summary(column.enum_values)
             if option_str:
                 option_str += f"; values: {enum_values}"
             else:
@@ -127,59 +131,61 @@ class Mermaid:
 
         return f"    {column_str}\n"
 
-    def _relationships(self, column: Column) -> str:
-        output = ""
+    def _type(self, type_str: str) -> str:
+        sanitized = self._types.get(type_str)
+        if sanitized is None:
+            # Sanitize type string to replace commas with delimiter (GitHub issue #51)
+            sanitized = self._types[type_str] = sanitize_type_for_mermaid(type_str, self.type_parameter_delimiter)
+        return sanitized
+
+    def _enum_summary(self, enum_list: Tuple[str, ...]) -> str:
+        # Columns of the same enum share its tuple of members, which is kept in the entry so its id isn't reused.
+        cached = self._enum_summaries.get(id(enum_list))
+        if cached is not None and cached[0] is enum_list:
+            return cached[1]
+
+        if len(enum_list) <= self.max_enum_members:
+            summary = ", ".join(enum_list)
+        else:
+            displayed_values = enum_list[: self.max_enum_members - 1]
+            summary = ", ".join(displayed_values) + ", ..., " + enum_list[-1]
+        self._enum_summaries[id(enum_list)] = (enum_list, summary)
+        return summary
 
-        column_name = column.name
-        right_table = column.table.name
+    def _relationships(self, table: TableRecord) -> str:
+        output = ""
+        right_table = table.name
 
-        if is_unique(column):
-            right_operand = "o|"
-        else:
-            right_operand = "o{"
-
-        for foreign_key in column.foreign_keys:
-            key_parts = foreign_key.target_fullname.split(".")
-            left_table = ".".join(key_parts[:-1])
-            left_column = key_parts[-1]
-            left_operand = ""
-
-            # We don't add the connection to the fk table if the latter
-            # is not included in our graph.
-            if left_table not in self.metadata.tables:
-                logger.warning(
-                    f"Table '{right_table}.{column_name}' is a foreign key to '{left_table}' "
-                    "which is not included in the graph, skipping the connection."
-                )
-                continue
-
-            lcolumn = self.metadata.tables[left_table].columns[left_column]
-            if is_unique(lcolumn):
-                left_operand = "||"
-            else:
-                left_operand = "}o"
+        for edge in self.schema.edges[table.key]:
+            right_operand = "o|" if edge.referring_unique else "o{"
+            left_operand = "||" if edge.referred_unique else "}o"
+            left_table = edge.referred_name
 
-            output += f"  {left_table.split('.')[-1]} {left_operand}--{right_operand} {right_table} : {column_name}\n"
+            output += f"  {left_table} {left_operand}--{right_operand} {right_table} : {edge.column}\n"
         return output
 
-    def __str__(self) -> str:
-        output = ""
+    def iter_chunks(self) -> Iterator[str]:
+        """Yield the diagram piece by piece, one table or relationship block at a time.
+
+        With several ``jobs`` the tables are rendered in batches on a process pool, yielding one chunk per batch.
+        """
         if self.layout:
-            yaml_front_matter = textwrap.dedent(f"""
+            yield textwrap.dedent(f"""
             ---
                 config:
                     layout: {self.layout.value}
             ---
             """)
-            output = yaml_front_matter + output
-        output += "erDiagram\n"
-        for table in sorted(self.metadata.tables.values(), key=lambda t: t.name):
-            output += self._table(table)
+        yield "erDiagram\n"
+        tables = sorted(self.schema.tables.values(), key=lambda t: t.name)
+        with ChunkPool(self, self.jobs) as pool:
+            yield from pool.map("_table", tables)
+            yield from pool.map("_relationships", tables)
 
-        for table in sorted(self.metadata.tables.values(), key=lambda t: t.name):
-            for column in table.columns.values():
-                if len(column.foreign_keys) > 0:
-                    output += self._relationships(column)
+    def write(self, fp: TextIO) -> None:
+        """Stream the diagram into a file object without building the full string in memory."""
+        for chunk in self.iter_chunks():
+            fp.write(chunk)
 
-        return output
-        return output
+    def __str__(self) -> str:
+        return "".join(self.iter_chunks())
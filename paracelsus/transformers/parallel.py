@@ -0,0 +1,67 @@
+"""Render the chunks of a transformer on a process pool.
+
+The transformer, and with it the schema snapshot, is sent to each worker once. Tasks are batches of consecutive
+items, whose rendered chunks are joined in the worker and yielded back in submission order, so the output is
+identical to rendering every item in a single process.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from types import TracebackType
+from typing import Any, Iterator, List, Optional, Sequence, Type
+
+# Each worker renders with about this many batches per job, so uneven tables still spread over the pool.
+BATCHES_PER_JOB = 4
+
+_worker_transformer: Any = None
+
+
+def _initialize_worker(transformer: Any) -> None:
+    global _worker_transformer
+    _worker_transformer = transformer
+
+
+def _render_batch(method: str, items: Sequence[Any]) -> str:
+    render = getattr(_worker_transformer, method)
+    return "".join(render(item) for item in items)
+
+
+class ChunkPool:
+    """Map a rendering method of a transformer over a sequence of items, using ``jobs`` processes.
+
+    With a single job everything is rendered in the current process, one chunk per item.
+    """
+
+    def __init__(self, transformer: Any, jobs: int = 1) -> None:
+        if jobs < 1:
+            raise ValueError(f"The number of jobs must be at least 1, got {jobs}.")
+        self.transformer = transformer
+        self.jobs = jobs
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> "ChunkPool":
+        if self.jobs > 1:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.jobs, initializer=_initialize_worker, initargs=(self.transformer,)
+            )
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def map(self, method: str, items: Sequence[Any]) -> Iterator[str]:
+        if self._executor is None or len(items) < 2:
+            render = getattr(self.transformer, method)
+            for item in items:
+                yield render(item)
+            return
+
+        batch_size = max(-(-len(items) // (self.jobs * BATCHES_PER_JOB)), 1)
+        batches: List[Sequence[Any]] = [items[start : start + batch_size] for start in range(0, len(items), batch_size)]
+        yield from self._executor.map(_render_batch, [method] * len(batches), batches)
@@ -1,5 +1,11 @@
-from sqlalchemy.sql.schema import Column, UniqueConstraint
+from typing import Any, Dict, FrozenSet, Hashable, NamedTuple, Optional, Tuple
+
+import sqlalchemy
+from sqlalchemy.engine import URL, Dialect
+from sqlalchemy.exc import CompileError, NoSuchModuleError
+from sqlalchemy.sql.schema import Column, Table, UniqueConstraint
 from sqlalchemy.sql import ColumnCollection
+from sqlalchemy.types import TypeEngine
 
 
 def key_based_column_sort(column: Column) -> str:
@@ -40,3 +46,128 @@ def is_unique(column: Column) -> bool:
             return True
 
     return False
+
+
+class TableKeys(NamedTuple):
+    """Column keys of a table grouped by the role they play in its keys."""
+
+    primary_key: FrozenSet[str]
+    foreign_key: FrozenSet[str]
+    unique: FrozenSet[str]
+
+
+def table_keys(table: Table) -> TableKeys:
+    """Collect the primary key, foreign key and unique columns of a table in one pass over its constraints.
+
+    The ``unique`` set follows the same rules as ``is_unique``.
+    """
+    primary_key = set()
+    foreign_key = set()
+    unique = set()
+    for column in table.columns:
+        if column.primary_key:
+            primary_key.add(column.key)
+            unique.add(column.key)
+        elif column.unique:
+            unique.add(column.key)
+        if column.foreign_keys:
+            foreign_key.add(column.key)
+
+    for constraint in table.constraints:
+        if isinstance(constraint, UniqueConstraint):
+            constraint_keys = constraint.columns.keys()
+            if len(constraint_keys) == 1:
+                unique.add(constraint_keys[0])
+
+    return TableKeys(frozenset(primary_key), frozenset(foreign_key), frozenset(unique))
+
+
+class KeyIndex:
+    """Lazily built index of the key columns of every table seen during a render.
+
+    Each table is indexed at most once, so repeated lookups (for example for heavily referenced tables)
+    don't rescan its constraints.
+    """
+
+    def __init__(self) -> None:
+        self._tables: Dict[Table, TableKeys] = {}
+
+    def __getitem__(self, table: Table) -> TableKeys:
+        keys = self._tables.get(table)
+        if keys is None:
+            keys = self._tables[table] = table_keys(table)
+        return keys
+
+    def is_unique(self, column: Column) -> bool:
+        return column.key in self[column.table].unique
+
+
+class TypeInfo(NamedTuple):
+    """What the transformers show of a column type."""
+
+    type: str
+    # The enum members of enum types, None for any other type.
+    enum_values: Optional[Tuple[str, ...]]
+
+
+def load_dialect(name: str) -> Dialect:
+    """Create the dialect of a database name such as ``postgresql`` or ``mysql+pymysql``.
+
+    Only the dialect itself is loaded, its database driver doesn't have to be installed.
+    """
+    try:
+        return URL.create(name).get_dialect()()
+    except NoSuchModuleError:
+        raise ValueError(f"Unknown dialect '{name}'.") from None
+
+
+def type_parameters(column_type: TypeEngine) -> Optional[Hashable]:
+    """The class and state of a type, which determine what it compiles to. None if they can't be hashed."""
+    key: Any = (type(column_type), tuple(sorted(vars(column_type).items())))
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+class TypeIndex:
+    """Lazily built index of the compiled string of every type instance seen during a render.
+
+    Large schemas reuse a few type instances (and large enums) across many columns, and create many more instances
+    of a few distinct types. Each distinct type is only compiled once, and the columns sharing an enum share a single
+    tuple of its members.
+
+    Types are compiled for the given ``dialect``. Without one (or for types the dialect can't compile) they are
+    compiled like ``str()`` does, with the dialect of the type if it has one and SQLAlchemy's default one otherwise.
+    """
+
+    def __init__(self, dialect: Optional[Dialect] = None) -> None:
+        self.dialect = dialect
+        # Types compare and hash by identity, and being keys keeps them alive while they are indexed.
+        self._types: Dict[TypeEngine, TypeInfo] = {}
+        self._compiled: Dict[Hashable, str] = {}
+
+    def __getitem__(self, column_type: TypeEngine) -> TypeInfo:
+        info = self._types.get(column_type)
+        if info is None:
+            enum_values = tuple(column_type.enums) if isinstance(column_type, sqlalchemy.Enum) else None
+            info = self._types[column_type] = TypeInfo(self._compile(column_type), enum_values)
+        return info
+
+    def _compile(self, column_type: TypeEngine) -> str:
+        key = type_parameters(column_type)
+        if key is None:
+            return self._compile_type(column_type)
+        compiled = self._compiled.get(key)
+        if compiled is None:
+            compiled = self._compiled[key] = self._compile_type(column_type)
+        return compiled
+
+    def _compile_type(self, column_type: TypeEngine) -> str:
+        if self.dialect is not None:
+            try:
+                return column_type.compile(dialect=self.dialect)
+            except CompileError:
+                pass
+        return str(column_type)
@@ -0,0 +1,187 @@
+"""Keep diagrams up to date while the models are being edited.
+
+The source files of the imported modules are polled for changes. When one changes, only the project modules that
+have to run again are removed from ``sys.modules`` before the models are imported again: the changed modules, the
+modules importing them and the module of the base class (whose metadata would otherwise still hold the old tables).
+Third party packages such as SQLAlchemy stay imported, so an update only pays for the project's own code.
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .config import ExtractModes, ParacelsusSettingsForGraph
+from .files import write_if_changed
+from .graph import get_schema, get_transformer, select_tables
+from .inject import BlockRenderer, inject_file
+from .schema import Schema
+from .sources import imported_modules, module_name, project_module_files
+
+# What a file is compared by between polls: its modification time and size, or None once it is gone.
+FileState = Optional[Tuple[int, int]]
+
+
+def _file_state(path: Path) -> FileState:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ModuleWatcher:
+    """Track the source files of the modules a set of models is imported from."""
+
+    def __init__(self, modules: Iterable[str], roots: Sequence[Path]) -> None:
+        self.modules = [module_name(module) for module in modules]
+        self.roots = roots
+        self.files: Dict[str, Path] = {}
+        self._states: Dict[Path, FileState] = {}
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Find the module files again, since an edit may have added or removed imports.
+
+        Files which were already tracked keep their last seen state, so edits made in the meantime aren't missed.
+        """
+        self.files = project_module_files(self.modules, self.roots)
+        self._states = {
+            path: self._states[path] if path in self._states else _file_state(path) for path in self.files.values()
+        }
+
+    def changed(self) -> Set[str]:
+        """Return the modules whose file changed since the last call."""
+        changed = set()
+        for name, path in self.files.items():
+            state = _file_state(path)
+            if state != self._states[path]:
+                self._states[path] = state
+                changed.add(name)
+        return changed
+
+    def dependents(self, modules: Iterable[str]) -> Set[str]:
+        """Return the modules along with every project module which imports them, directly or not."""
+        importers: Dict[str, Set[str]] = {}
+        for name, path in self.files.items():
+            for imported in imported_modules(name, path):
+                importers.setdefault(imported, set()).add(name)
+            # Submodules depend on their packages, whose __init__.py runs before them.
+            importers.setdefault(name.rpartition(".")[0], set()).add(name)
+
+        found: Set[str] = set()
+        queue = list(modules)
+        while queue:
+            name = queue.pop()
+            if name in found:
+                continue
+            found.add(name)
+            queue.extend(importers.get(name, ()))
+        return found
+
+
+def purge_modules(modules: Iterable[str]) -> None:
+    for name in modules:
+        sys.modules.pop(name, None)
+
+
+class Watcher:
+    """Render the inject files and graph output of one set of settings, and update them when the models change."""
+
+    def __init__(
+        self,
+        settings: ParacelsusSettingsForGraph,
+        *,
+        files: List[Path],
+        output: Optional[Path],
+        begin_tag: str,
+        end_tag: str,
+    ) -> None:
+        self.settings = settings
+        self.files = files
+        self.output = output
+        self.begin_tag = begin_tag
+        self.end_tag = end_tag
+        self.schema: Optional[Schema] = None
+        self.renderer: Optional[BlockRenderer] = None
+        self.modules = ModuleWatcher(
+            [settings.base_class_path, *settings.import_module], [Path(os.getcwd()), *settings.python_dir]
+        )
+
+    def update(self) -> List[Path]:
+        """Import the models (again) and rewrite the outputs. Returns the files that changed."""
+        schema = get_schema(
+            base_class_path=self.settings.base_class_path,
+            import_module=self.settings.import_module,
+            include_tables=set(),
+            exclude_tables=set(),
+            python_dir=self.settings.python_dir,
+            cache_dir=self.settings.cache_dir,
+            extract=self.settings.extract,
+            dialect=self.settings.dialect,
+        )
+        if self.schema is not None and list(schema.tables.values()) == list(self.schema.tables.values()):
+            return []
+        self.schema = schema
+
+        written = []
+        self.renderer = BlockRenderer(schema, self.settings, previous=self.renderer)
+        for file in self.files:
+            if inject_file(file, self.renderer, self.begin_tag, self.end_tag, fingerprint=self.renderer.fingerprint):
+                written.append(file)
+
+        if self.output is not None:
+            selected = select_tables(
+                schema,
+                include_tables=self.settings.include_tables,
+                exclude_tables=self.settings.exclude_tables,
+                focus=self.settings.focus,
+                depth=self.settings.depth,
+                direction=self.settings.direction,
+            )
+            graph = str(
+                get_transformer(
+                    selected,
+                    format=self.settings.format.value,
+                    column_sort=self.settings.column_sort,
+                    omit_comments=self.settings.omit_comments,
+                    max_enum_members=self.settings.max_enum_members,
+                    layout=self.settings.layout,
+                    type_parameter_delimiter=self.settings.type_parameter_delimiter,
+                    jobs=self.settings.jobs,
+                )
+            )
+            if write_if_changed(self.output, [graph if graph.endswith("\n") else f"{graph}\n"]):
+                written.append(self.output)
+        return written
+
+    def poll(self) -> Optional[List[Path]]:
+        """Update the outputs if a model file changed. Returns None when nothing changed."""
+        changed = self.modules.changed()
+        if not changed:
+            return None
+
+        if self.settings.extract == ExtractModes.imports:
+            base_module = module_name(self.settings.base_class_path)
+            purge_modules(self.modules.dependents(changed | {base_module}))
+        written = self.update()
+        self.modules.refresh()
+        return written
+
+    def run(self, interval: float, echo: Callable[[str], None] = print) -> None:
+        """Poll for changes until interrupted."""
+        echo(f"Watching {len(self.modules.files)} module file(s) for changes.")
+        while True:
+            time.sleep(interval)
+            started = time.perf_counter()
+            try:
+                written = self.poll()
+            except Exception as error:
+                # Models are often broken halfway through an edit, keep watching until they are fixed.
+                echo(f"Update failed: {error}")
+                self.modules.refresh()
+                continue
+            if written is not None:
+                elapsed = time.perf_counter() - started
+                echo(f"Updated {len(written)} file(s) in {elapsed:.2f}s.")
@@ -15,6 +15,14 @@ from sqlalchemy.orm import declarative_base, mapped_column
 UTC = timezone.utc
 
 
+@pytest.fixture(autouse=True)
+def schema_cache_dir(tmp_path_factory, monkeypatch) -> Path:
+    """Keep the schema cache of every test isolated from the user cache and from the other tests."""
+    cache_dir = tmp_path_factory.mktemp("cache")
+    monkeypatch.setenv("PARACELSUS_CACHE_DIR", str(cache_dir))
+    return cache_dir
+
+
 @pytest.fixture
 def metaclass():
     Base = declarative_base()
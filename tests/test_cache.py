@@ -0,0 +1,206 @@
+import io
+import os
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from paracelsus import graph as graph_module
+from paracelsus.cache import SchemaCache, default_cache_dir, schema_fingerprint
+from paracelsus.cli import app
+from paracelsus.graph import get_schema
+from paracelsus.schema import dump_schema, extract_schema, load_schema
+
+from .utils import mermaid_assert
+
+runner = CliRunner()
+
+
+def fingerprint(package_path: Path, import_module=["example.models"]):
+    return schema_fingerprint(base_class_path="example.base:Base", import_module=import_module, roots=[package_path])
+
+
+def test_fingerprint_is_stable(package_path):
+    assert fingerprint(package_path) is not None
+    assert fingerprint(package_path) == fingerprint(package_path)
+
+
+@pytest.mark.parametrize("changed_file", ["example/models.py", "example/base.py", "example/__init__.py"])
+def test_fingerprint_changes_with_model_sources(package_path, changed_file):
+    """The imported module, the modules it imports and its parent packages are all part of the fingerprint."""
+    before = fingerprint(package_path)
+    with (package_path / changed_file).open("a") as fp:
+        fp.write("\n# changed\n")
+    assert fingerprint(package_path) != before
+
+
+def test_fingerprint_ignores_unrelated_files(package_path):
+    before = fingerprint(package_path)
+    (package_path / "example" / "cardinalities.py").write_text("# changed\n")
+    (package_path / "README.md").write_text("changed\n")
+    assert fingerprint(package_path) == before
+
+
+def test_fingerprint_changes_with_settings(package_path):
+    assert fingerprint(package_path) != fingerprint(package_path, import_module=["example.models:*"])
+
+
+def test_fingerprint_requires_local_modules(package_path):
+    assert fingerprint(package_path, import_module=["example.missing"]) is None
+
+
+def test_dump_and_load_schema(metaclass):
+    schema = extract_schema(metaclass)
+    buffer = io.StringIO()
+    dump_schema(schema, buffer)
+    buffer.seek(0)
+
+    loaded = load_schema(buffer)
+    assert loaded.tables == schema.tables
+    assert loaded.edges == schema.edges
+
+
+def test_load_schema_rejects_other_versions():
+    with pytest.raises(ValueError, match="Unsupported schema snapshot version"):
+        load_schema(io.StringIO('{"version": 0, "tables": []}'))
+
+
+def test_cache_hit_skips_import(package_path, tmp_path, monkeypatch):
+    arguments = dict(
+        base_class_path="example.base:Base",
+        import_module=["example.models"],
+        include_tables=set(),
+        exclude_tables=set(),
+        python_dir=[package_path],
+        cache_dir=tmp_path,
+    )
+    schema = get_schema(**arguments)
+    assert len(list(tmp_path.glob("*.schema.json"))) == 1
+
+    def fail(**kwargs):
+        raise AssertionError("The models should not be imported on a cache hit.")
+
+    monkeypatch.setattr(graph_module, "import_metadata", fail)
+    cached = get_schema(**arguments)
+    assert cached.tables == schema.tables
+
+    # The full schema is cached, so other table selections are served from the same entry.
+    subset = get_schema(**{**arguments, "include_tables": {"users"}})
+    assert list(subset.tables) == ["users"]
+
+
+def test_cache_miss_after_edit(package_path, tmp_path, monkeypatch):
+    arguments = dict(
+        base_class_path="example.base:Base",
+        import_module=["example.models"],
+        include_tables=set(),
+        exclude_tables=set(),
+        python_dir=[package_path],
+        cache_dir=tmp_path,
+    )
+    get_schema(**arguments)
+    with (package_path / "example" / "models.py").open("a") as fp:
+        fp.write("\n# changed\n")
+
+    imports = []
+    original = graph_module.import_metadata
+
+    def counting(**kwargs):
+        imports.append(kwargs)
+        return original(**kwargs)
+
+    monkeypatch.setattr(graph_module, "import_metadata", counting)
+    get_schema(**arguments)
+    assert len(imports) == 1
+    assert len(list(tmp_path.glob("*.schema.json"))) == 2
+
+
+def test_cache_eviction(metaclass, tmp_path):
+    schema = extract_schema(metaclass)
+    buffer = io.StringIO()
+    dump_schema(schema, buffer)
+    entry_size = len(buffer.getvalue())
+
+    cache = SchemaCache(tmp_path, max_size=entry_size * 2)
+    cache.put("first", schema)
+    cache.put("second", schema)
+    os.utime(tmp_path / "first.schema.json", (1, 1))
+    os.utime(tmp_path / "second.schema.json", (2, 2))
+
+    # Reading an entry makes it the most recently used one.
+    assert cache.get("first") is not None
+    cache.put("third", schema)
+
+    assert sorted(path.name for path in tmp_path.glob("*.schema.json")) == ["first.schema.json", "third.schema.json"]
+    assert cache.get("second") is None
+
+
+def test_cache_ignores_corrupt_entries(tmp_path):
+    (tmp_path / "broken.schema.json").write_text("{")
+    assert SchemaCache(tmp_path).get("broken") is None
+
+
+def test_default_cache_dir(monkeypatch, tmp_path):
+    monkeypatch.setenv("PARACELSUS_CACHE_DIR", str(tmp_path / "explicit"))
+    assert default_cache_dir() == tmp_path / "explicit"
+
+    monkeypatch.delenv("PARACELSUS_CACHE_DIR")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+    assert default_cache_dir() == tmp_path / "xdg" / "paracelsus"
+
+
+def test_graph_cache_dir(package_path, tmp_path):
+    arguments = ["graph", "example.base:Base", "--import-module", "example.models", "--python-dir", str(package_path)]
+
+    result = runner.invoke(app, arguments + ["--cache-dir", str(tmp_path)])
+    assert result.exit_code == 0
+    mermaid_assert(result.stdout)
+    assert len(list(tmp_path.glob("*.schema.json"))) == 1
+
+    result = runner.invoke(app, arguments + ["--cache-dir", str(tmp_path)])
+    assert result.exit_code == 0
+    mermaid_assert(result.stdout)
+
+
+def test_graph_cache_is_opt_in(package_path, tmp_path, monkeypatch):
+    monkeypatch.delenv("PARACELSUS_CACHE_DIR")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    arguments = ["graph", "example.base:Base", "--import-module", "example.models"]
+
+    result = runner.invoke(app, arguments)
+    assert result.exit_code == 0
+    assert not (tmp_path / "paracelsus").exists()
+
+    result = runner.invoke(app, arguments + ["--cache"])
+    assert result.exit_code == 0
+    assert len(list((tmp_path / "paracelsus").glob("*.schema.json"))) == 1
+
+    pyproject = package_path / "pyproject.toml"
+    pyproject.write_text(pyproject.read_text() + "cache = true\n")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "configured"))
+    result = runner.invoke(app, arguments)
+    assert result.exit_code == 0
+    assert len(list((tmp_path / "configured" / "paracelsus").glob("*.schema.json"))) == 1
+
+    # --no-cache wins over everything else.
+    result = runner.invoke(app, arguments + ["--cache-dir", str(tmp_path / "explicit"), "--no-cache"])
+    assert result.exit_code == 0
+    assert not (tmp_path / "explicit").exists()
+
+
+def test_graph_no_cache(package_path, schema_cache_dir):
+    result = runner.invoke(
+        app,
+        [
+            "graph",
+            "example.base:Base",
+            "--import-module",
+            "example.models",
+            "--python-dir",
+            str(package_path),
+            "--no-cache",
+        ],
+    )
+    assert result.exit_code == 0
+    mermaid_assert(result.stdout)
+    assert list(schema_cache_dir.iterdir()) == []
@@ -1,3 +1,6 @@
+import json
+import os
+import sys
 from pathlib import Path
 from typing import Literal
 
@@ -6,7 +9,7 @@ from typer.testing import CliRunner
 
 from paracelsus.cli import app
 
-from .utils import mermaid_assert
+from .utils import dot_assert, mermaid_assert, usage_error
 
 runner = CliRunner()
 
@@ -116,6 +119,46 @@ def test_inject(package_path: Path):
         mermaid_assert(readme)
 
 
+def test_inject_unchanged(package_path: Path):
+    arguments = [
+        "inject",
+        str(package_path / "README.md"),
+        "example.base:Base",
+        "--import-module",
+        "example.models",
+        "--python-dir",
+        str(package_path),
+    ]
+    assert runner.invoke(app, arguments).exit_code == 0
+    os.utime(package_path / "README.md", (1, 1))
+
+    result = runner.invoke(app, arguments)
+    assert result.exit_code == 0, result.output
+    assert (package_path / "README.md").stat().st_mtime == 1
+
+
+def test_inject_fingerprint(package_path: Path):
+    arguments = [
+        "inject",
+        str(package_path / "README.md"),
+        "example.base:Base",
+        "--import-module",
+        "example.models",
+        "--python-dir",
+        str(package_path),
+    ]
+    result = runner.invoke(app, arguments + ["--fingerprint"])
+    assert result.exit_code == 0, result.output
+    assert "<!-- BEGIN_SQLALCHEMY_DOCS sha256=" in (package_path / "README.md").read_text()
+
+    result = runner.invoke(app, arguments + ["--check"])
+    assert result.exit_code == 0, result.output
+
+    result = runner.invoke(app, arguments + ["--check", "--exclude-tables", "comments"])
+    assert result.exit_code == 1
+    assert "-<!-- BEGIN_SQLALCHEMY_DOCS sha256=" in result.stdout
+
+
 @pytest.mark.parametrize("column_sort_arg", ["key-based", "preserve-order"])
 def test_inject_column_sort(package_path: Path, column_sort_arg: Literal["key-based"] | Literal["preserve-order"]):
     result = runner.invoke(
@@ -327,3 +370,325 @@ def test_graph_with_custom_type_delimiter(package_path: Path):
     assert result.exit_code == 0, result.output
     # The output should be valid mermaid
     mermaid_assert(result.stdout)
+
+
+def test_graph_output_file(package_path: Path):
+    output_file = package_path / "schema.mmd"
+    result = runner.invoke(
+        app,
+        [
+            "graph",
+            "example.base:Base",
+            "--import-module",
+            "example.models",
+            "--python-dir",
+            str(package_path),
+            "--output",
+            str(output_file),
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert result.stdout == ""
+    mermaid_assert(output_file.read_text())
+
+
+def test_graph_output_file_unchanged(package_path: Path):
+    output_file = package_path / "schema.mmd"
+    arguments = [
+        "graph",
+        "example.base:Base",
+        "--import-module",
+        "example.models",
+        "--python-dir",
+        str(package_path),
+        "--output",
+        str(output_file),
+    ]
+    assert runner.invoke(app, arguments).exit_code == 0
+    os.utime(output_file, (1, 1))
+
+    result = runner.invoke(app, arguments)
+    assert result.exit_code == 0, result.output
+    assert output_file.stat().st_mtime == 1
+
+
+def test_graph_jobs(package_path: Path):
+    arguments = ["graph", "example.base:Base", "--import-module", "example.models", "--python-dir", str(package_path)]
+    serial = runner.invoke(app, arguments)
+    parallel = runner.invoke(app, arguments + ["--jobs", "2"])
+    assert parallel.exit_code == 0, parallel.output
+    assert parallel.stdout == serial.stdout
+
+    result = runner.invoke(app, arguments + ["--jobs", "0"])
+    assert result.exit_code == 2
+
+
+def test_graph_profile(package_path: Path):
+    arguments = ["graph", "example.base:Base", "--import-module", "example.models", "--python-dir", str(package_path)]
+    report_path = package_path / "profile.json"
+    result = runner.invoke(app, arguments + ["--no-cache", "--profile", str(report_path)])
+    assert result.exit_code == 0, result.output
+    mermaid_assert(result.stdout)
+
+    report = json.loads(report_path.read_text())
+    assert report["command"] == "graph"
+    assert list(report["phases"]) == ["import", "resolve", "filter", "extract", "render", "write"]
+    assert report["counts"] == {"tables": 3, "columns": 14, "edges": 3, "skipped_edges": 0}
+    for measures in report["phases"].values():
+        assert measures["calls"] == 1
+        assert measures["wall_seconds"] >= 0
+        assert measures["peak_memory_bytes"] <= report["peak_memory_bytes"]
+
+
+def test_inject_profile(package_path: Path):
+    result = runner.invoke(
+        app,
+        [
+            "inject",
+            str(package_path / "README.md"),
+            "example.base:Base",
+            "--import-module",
+            "example.models",
+            "--python-dir",
+            str(package_path),
+            "--profile",
+            "-",
+        ],
+    )
+    assert result.exit_code == 0, result.output
+
+    report = json.loads(result.stderr)
+    assert report["command"] == "inject"
+    assert {"import", "inject", "render"} <= set(report["phases"])
+    assert report["counts"]["tables"] == 3
+
+
+def test_inject_profile_counts_rendered_tables(package_path: Path):
+    result = runner.invoke(
+        app,
+        [
+            "inject",
+            str(package_path / "README.md"),
+            "example.base:Base",
+            "--import-module",
+            "example.models",
+            "--python-dir",
+            str(package_path),
+            "--exclude-tables",
+            "comments",
+            "--profile",
+            "-",
+        ],
+    )
+    assert result.exit_code == 0, result.output
+
+    report = json.loads(result.stderr)
+    assert report["counts"]["tables"] == 2
+
+
+def test_graph_dialect(package_path: Path):
+    arguments = ["graph", "example.base:Base", "--import-module", "example.models", "--python-dir", str(package_path)]
+    result = runner.invoke(app, arguments)
+    assert "CHAR(32) id PK" in result.stdout
+    assert "BOOLEAN live" in result.stdout
+
+    result = runner.invoke(app, arguments + ["--dialect", "mysql"])
+    assert result.exit_code == 0, result.output
+    assert "BOOL live" in result.stdout
+
+    result = runner.invoke(app, arguments + ["--dialect", "postgresql"])
+    assert result.exit_code == 0, result.output
+    assert "UUID id PK" in result.stdout
+
+    result = runner.invoke(app, arguments + ["--dialect", "nope"])
+    assert result.exit_code == 1
+    assert "Unknown dialect 'nope'" in str(result.exception)
+
+
+@pytest.mark.parametrize("cache_arg", [[], ["--no-cache"]])
+def test_graph_focus(package_path: Path, cache_arg: list[str]):
+    arguments = ["graph", "example.base:Base", "--import-module", "example.models", "--python-dir", str(package_path)]
+
+    result = runner.invoke(app, arguments + cache_arg + ["--focus", "posts", "--depth", "1", "--direction", "out"])
+    assert result.exit_code == 0, result.output
+    assert "users {" in result.stdout and "posts {" in result.stdout
+    assert "comments {" not in result.stdout
+
+    result = runner.invoke(app, arguments + cache_arg + ["--focus", "users", "--depth", "0"])
+    assert result.exit_code == 0, result.output
+    assert "users {" in result.stdout
+    assert "posts {" not in result.stdout
+
+    # Include and exclude patterns apply to the neighborhood.
+    result = runner.invoke(app, arguments + cache_arg + ["--focus", "users", "--exclude-tables", "comments"])
+    assert result.exit_code == 0, result.output
+    assert "users {" in result.stdout and "posts {" in result.stdout
+    assert "comments {" not in result.stdout
+
+    result = runner.invoke(app, arguments + cache_arg + ["--focus", "invoices"])
+    assert result.exit_code == 1
+    assert "don't exist: invoices" in str(result.exception)
+
+
+def test_graph_from_url(package_path: Path, metaclass, tmp_path: Path):
+    from sqlalchemy import create_engine
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    metaclass.create_all(engine)
+    engine.dispose()
+    snapshot = tmp_path / "schema.json"
+
+    result = runner.invoke(
+        app, ["graph", "--from-url", f"sqlite:///{tmp_path / 'app.db'}", "--snapshot", str(snapshot)]
+    )
+    assert result.exit_code == 0, result.output
+    assert "users {" in result.stdout
+    assert "users ||--o{ posts : author" in result.stdout
+    assert snapshot.exists()
+
+    # The snapshot stands in for the database.
+    from_snapshot = runner.invoke(app, ["graph", "--snapshot", str(snapshot)])
+    assert from_snapshot.exit_code == 0, from_snapshot.output
+    assert from_snapshot.stdout == result.stdout
+
+    result = runner.invoke(app, ["graph", "--snapshot", str(tmp_path / "missing.json")])
+    assert result.exit_code == 1
+    assert isinstance(result.exception, ValueError)
+
+
+def test_graph_dot_stdout(package_path: Path):
+    result = runner.invoke(
+        app,
+        [
+            "graph",
+            "example.base:Base",
+            "--import-module",
+            "example.models",
+            "--python-dir",
+            str(package_path),
+            "--format",
+            "dot",
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    dot_assert(result.stdout)
+
+
+def test_graph_static_extract(package_path: Path):
+    result = runner.invoke(
+        app,
+        [
+            "graph",
+            "example.base:Base",
+            "--import-module",
+            "example.models",
+            "--python-dir",
+            str(package_path),
+            "--extract",
+            "static",
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    mermaid_assert(result.stdout)
+    assert "example.models" not in sys.modules
+
+
+def test_graph_multiple_formats(package_path: Path):
+    result = runner.invoke(
+        app,
+        [
+            "graph",
+            "example.base:Base",
+            "--import-module",
+            "example.models",
+            "--python-dir",
+            str(package_path),
+            "--format",
+            f"mermaid={package_path / 'schema.mmd'}",
+            "--format",
+            f"dot={package_path / 'schema.dot'}",
+            "--format",
+            "dot",
+            "--layout",
+            "elk",
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    dot_assert(result.stdout)
+    dot_assert((package_path / "schema.dot").read_text())
+    mermaid = (package_path / "schema.mmd").read_text()
+    mermaid_assert(mermaid)
+    assert "layout: elk" in mermaid
+
+
+@pytest.mark.parametrize(
+    "formats",
+    [["mermaid", "dot"], ["mermaid=schema.txt", "dot=schema.txt"]],
+)
+def test_graph_invalid_formats(package_path: Path, formats: list[str]):
+    arguments = ["graph", "example.base:Base", "--import-module", "example.models"]
+    for value in formats:
+        arguments += ["--format", value]
+    result = runner.invoke(app, arguments)
+
+    assert result.exit_code != 0
+    assert isinstance(result.exception, ValueError)
+
+
+@pytest.mark.parametrize(
+    "arguments, message",
+    [
+        (["--format", "svg"], "Unknown format 'svg'"),
+        (["--format", "dot="], "Missing output path for format 'dot'"),
+        (["--from-url", "sqlite://", "--attach", "archive"], "Expected NAME=PATH"),
+    ],
+)
+def test_graph_invalid_option_values(package_path: Path, arguments: list[str], message: str):
+    result = runner.invoke(app, ["graph", "example.base:Base", "--import-module", "example.models"] + arguments)
+
+    assert result.exit_code == 2
+    assert "Invalid value for '--" in result.output
+    assert message in usage_error(result.output)
+
+
+@pytest.mark.parametrize(
+    "pattern, message", [("nope.md", "File 'nope.md' does not exist"), ("*.txt", "No files match")]
+)
+def test_inject_missing_files(package_path: Path, pattern: str, message: str):
+    result = runner.invoke(app, ["inject", pattern, "example.base:Base", "--import-module", "example.models"])
+
+    assert result.exit_code == 2
+    assert "Invalid value for" in result.output
+    assert message in usage_error(result.output)
+
+
+def test_inject_multiple_files(package_path: Path):
+    docs = package_path / "docs"
+    docs.mkdir()
+    readme = (package_path / "README.md").read_text()
+    for name in ("first.md", "second.md"):
+        (docs / name).write_text(readme)
+    (docs / "unrelated.md").write_text("# No markers here\n")
+
+    arguments = ["inject", str(package_path / "README.md"), str(docs / "*.md"), "example.base:Base"]
+    arguments += ["--import-module", "example.models", "--python-dir", str(package_path)]
+
+    result = runner.invoke(app, arguments + ["--check"])
+    assert result.exit_code == 1
+    assert str(docs / "first.md") in result.stdout
+    assert str(docs / "second.md") in result.stdout
+    assert "unrelated.md" not in result.stdout
+
+    result = runner.invoke(app, arguments)
+    assert result.exit_code == 0
+    for path in (package_path / "README.md", docs / "first.md", docs / "second.md"):
+        mermaid_assert(path.read_text())
+    assert (docs / "unrelated.md").read_text() == "# No markers here\n"
+
+    result = runner.invoke(app, arguments + ["--check"])
+    assert result.exit_code == 0, result.stdout
+    assert "No changes detected." in result.stdout
@@ -0,0 +1,158 @@
+import io
+import os
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from paracelsus import daemon
+from paracelsus.daemon import DaemonServer, default_socket_path, forward
+
+from .utils import mermaid_assert
+
+
+@pytest.fixture
+def server(package_path: Path, tmp_path: Path):
+    server = DaemonServer(tmp_path / "paracelsus.sock", root=package_path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def graph_arguments(package_path: Path):
+    return ["graph", "example.base:Base", "--import-module", "example.models", "--python-dir", str(package_path)]
+
+
+def test_forward_graph(server, package_path: Path):
+    response = forward(graph_arguments(package_path), server.path)
+    assert response is not None
+    assert response["exit_code"] == 0, response["stderr"]
+    mermaid_assert(response["stdout"])
+
+    # The models stay imported between requests.
+    models = sys.modules["example.models"]
+    assert forward(graph_arguments(package_path), server.path) == response
+    assert sys.modules["example.models"] is models
+
+
+def test_forward_reimports_changed_models(server, package_path: Path):
+    forward(graph_arguments(package_path), server.path)
+    models = package_path / "example" / "models.py"
+    models.write_text(models.read_text().replace("display_name", "nickname"))
+
+    response = forward(graph_arguments(package_path), server.path)
+    assert response is not None
+    assert "VARCHAR(100) nickname" in response["stdout"]
+    assert "display_name" not in response["stdout"]
+
+
+def test_forward_check_exit_code(server, package_path: Path):
+    arguments = ["inject", "README.md", "example.base:Base", "--import-module", "example.models", "--check"]
+    response = forward(arguments, server.path)
+    assert response is not None
+    assert response["exit_code"] == 1
+    assert "Changes detected." in response["stdout"]
+
+
+def test_forward_errors(server, package_path: Path):
+    response = forward(["graph", "example.base:Missing", "--import-module", "example.models"], server.path)
+    assert response is not None
+    assert response["exit_code"] == 1
+    assert "AttributeError" in response["stderr"]
+
+    response = forward(["version"], server.path)
+    assert response is not None
+    assert response["exit_code"] == 2
+
+
+def test_forward_without_daemon(tmp_path: Path):
+    assert forward(["graph"], tmp_path / "missing.sock") is None
+
+
+def test_second_daemon_is_refused(server, package_path: Path):
+    with pytest.raises(ValueError, match="already listening"):
+        DaemonServer(server.path, root=package_path)
+
+
+def test_forward_streams_output(server, package_path: Path):
+    stdout = io.StringIO()
+    response = forward(graph_arguments(package_path), server.path, stdout=stdout)
+    assert response is not None
+    assert stdout.getvalue() == response["stdout"]
+    mermaid_assert(stdout.getvalue())
+
+
+def test_forward_uses_client_environment(server, package_path: Path, monkeypatch):
+    # Without the cache, every run imports the models if they aren't imported yet.
+    arguments = [*graph_arguments(package_path), "--no-cache"]
+    forward(arguments, server.path)
+    models = sys.modules["example.models"]
+    assert "PARACELSUS_TEST_SETTING" not in os.environ
+
+    # The models may read the environment, so they are imported again when it changes.
+    monkeypatch.setenv("PARACELSUS_TEST_SETTING", "1")
+    assert forward(arguments, server.path)["exit_code"] == 0  # type: ignore[index]
+    assert sys.modules["example.models"] is not models
+    models = sys.modules["example.models"]
+    assert forward(arguments, server.path)["exit_code"] == 0  # type: ignore[index]
+    assert sys.modules["example.models"] is models
+
+    # The daemon gets its own environment back once the command is done.
+    monkeypatch.delenv("PARACELSUS_TEST_SETTING")
+    assert "PARACELSUS_TEST_SETTING" not in os.environ
+
+
+def test_shared_directory_is_refused(server, package_path: Path, tmp_path: Path):
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    shared.chmod(0o777)
+    with pytest.raises(ValueError, match="Refusing to use"):
+        DaemonServer(shared / "paracelsus.sock", root=package_path)
+
+    # Clients refuse a socket which others could have replaced.
+    server.path.parent.chmod(0o755)
+    try:
+        with pytest.raises(ValueError, match="Refusing to use"):
+            forward(graph_arguments(package_path), server.path)
+    finally:
+        server.path.parent.chmod(0o700)
+
+    server.path.chmod(0o666)
+    with pytest.raises(ValueError, match="Refusing to use"):
+        forward(graph_arguments(package_path), server.path)
+
+
+def test_main_forwards_only_when_enabled(server, package_path: Path, monkeypatch, capsys):
+    monkeypatch.setenv(daemon.SOCKET_ENVIRONMENT_VARIABLE, str(server.path))
+    monkeypatch.delenv(daemon.DAEMON_ENVIRONMENT_VARIABLE, raising=False)
+    monkeypatch.setattr(daemon, "forward", lambda *args, **kwargs: pytest.fail("The command was forwarded."))
+    monkeypatch.setattr(sys, "argv", ["paracelsus", *graph_arguments(package_path)])
+    with pytest.raises(SystemExit) as exit:
+        daemon.main()
+    assert exit.value.code == 0
+    mermaid_assert(capsys.readouterr().out)
+
+
+def test_main_forwards(server, package_path: Path, monkeypatch, capsys):
+    monkeypatch.setenv(daemon.SOCKET_ENVIRONMENT_VARIABLE, str(server.path))
+    monkeypatch.setenv(daemon.DAEMON_ENVIRONMENT_VARIABLE, "1")
+    monkeypatch.setattr(sys, "argv", ["paracelsus", *graph_arguments(package_path)])
+    with pytest.raises(SystemExit) as exit:
+        daemon.main()
+    assert exit.value.code == 0
+    mermaid_assert(capsys.readouterr().out)
+
+
+def test_default_socket_path(monkeypatch, tmp_path: Path):
+    monkeypatch.delenv(daemon.SOCKET_ENVIRONMENT_VARIABLE, raising=False)
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    first = default_socket_path(tmp_path / "first")
+    assert first.parent == tmp_path / "paracelsus"
+    assert first != default_socket_path(tmp_path / "second")
+
+    monkeypatch.setenv(daemon.SOCKET_ENVIRONMENT_VARIABLE, str(tmp_path / "explicit.sock"))
+    assert default_socket_path() == tmp_path / "explicit.sock"
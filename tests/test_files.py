@@ -0,0 +1,60 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from paracelsus.files import write_if_changed
+
+
+def test_write_if_changed_creates_file(tmp_path: Path):
+    path = tmp_path / "graph.mmd"
+    assert write_if_changed(path, ["erDiagram\n", "  users {\n", "  }\n"])
+    assert path.read_text() == "erDiagram\n  users {\n  }\n"
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_write_if_changed_skips_identical_content(tmp_path: Path):
+    path = tmp_path / "graph.mmd"
+    path.write_text("erDiagram\n")
+    os.utime(path, (1, 1))
+
+    assert not write_if_changed(path, ["erDiagram", "\n"])
+    assert path.stat().st_mtime == 1
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_write_if_changed_replaces_changed_content(tmp_path: Path):
+    path = tmp_path / "graph.mmd"
+    path.write_text("erDiagram\n")
+    path.chmod(0o640)
+
+    assert write_if_changed(path, ["digraph {}\n"])
+    assert path.read_text() == "digraph {}\n"
+    assert path.stat().st_mode & 0o777 == 0o640
+
+
+def test_write_if_changed_follows_symlinks(tmp_path: Path):
+    (tmp_path / "docs").mkdir()
+    target = tmp_path / "docs" / "graph.mmd"
+    target.write_text("erDiagram\n")
+    link = tmp_path / "graph.mmd"
+    link.symlink_to(target)
+
+    assert write_if_changed(link, ["digraph {}\n"])
+    assert link.is_symlink()
+    assert target.read_text() == "digraph {}\n"
+    assert list((tmp_path / "docs").iterdir()) == [target]
+
+
+def test_write_if_changed_keeps_file_on_error(tmp_path: Path):
+    path = tmp_path / "graph.mmd"
+    path.write_text("erDiagram\n")
+
+    def chunks():
+        yield "partial"
+        raise ValueError("render failed")
+
+    with pytest.raises(ValueError, match="render failed"):
+        write_if_changed(path, chunks())
+    assert path.read_text() == "erDiagram\n"
+    assert list(tmp_path.iterdir()) == [path]
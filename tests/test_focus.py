@@ -0,0 +1,66 @@
+import pytest
+
+from paracelsus.config import FocusDirections
+from paracelsus.focus import ForeignKeyIndex
+from paracelsus.schema import extract_schema
+
+# orders -> customers -> regions, and order_items -> orders, products.
+REFERENCES = [
+    ("regions", []),
+    ("customers", ["regions"]),
+    ("orders", ["customers", "customers"]),
+    ("order_items", ["orders", "products"]),
+    ("products", []),
+    ("audit_log", []),
+]
+
+
+def test_foreign_key_index():
+    index = ForeignKeyIndex(REFERENCES)
+
+    # Several foreign keys to the same table are a single hop.
+    assert index.outgoing["orders"] == ("customers",)
+    assert index.incoming["customers"] == ("orders",)
+    assert sorted(index.incoming["orders"]) == ["order_items"]
+    assert "audit_log" not in index.incoming
+
+
+@pytest.mark.parametrize(
+    "direction, depth, expected",
+    [
+        (FocusDirections.both, 0, {"orders"}),
+        (FocusDirections.both, 1, {"orders", "customers", "order_items"}),
+        (FocusDirections.both, 2, {"orders", "customers", "order_items", "regions", "products"}),
+        (FocusDirections.outgoing, 5, {"orders", "customers", "regions"}),
+        (FocusDirections.incoming, 5, {"orders", "order_items"}),
+    ],
+)
+def test_neighborhood(direction: FocusDirections, depth: int, expected: set[str]):
+    index = ForeignKeyIndex(REFERENCES)
+    assert index.neighborhood(["orders"], depth, direction) == expected
+
+
+def test_neighborhood_several_tables():
+    index = ForeignKeyIndex(REFERENCES)
+    assert index.neighborhood(["regions", "audit_log"], 1, FocusDirections.both) == {
+        "regions",
+        "customers",
+        "audit_log",
+    }
+
+
+def test_neighborhood_unknown_table():
+    index = ForeignKeyIndex(REFERENCES)
+    with pytest.raises(ValueError, match="don't exist: invoices"):
+        index.neighborhood(["orders", "invoices"], 1, FocusDirections.both)
+
+
+def test_index_from_metadata_and_schema(metaclass):
+    from_metadata = ForeignKeyIndex.from_metadata(metaclass)
+    from_schema = extract_schema(metaclass).foreign_key_index
+
+    for index in (from_metadata, from_schema):
+        assert index.outgoing["users"] == ()
+        assert index.outgoing["posts"] == ("users",)
+        assert sorted(index.outgoing["comments"]) == ["posts", "users"]
+        assert sorted(index.incoming["users"]) == ["comments", "posts"]
@@ -1,7 +1,13 @@
+import logging
+
 import pytest
+from sqlalchemy import Column, Enum, Integer, MetaData, Table
 
 from paracelsus.config import Layouts
-from paracelsus.graph import get_graph_string
+from paracelsus.graph import filter_metadata, get_graph_string, get_graphs, get_transformer, resolve_included_tables
+from paracelsus.metadata import MetadataView
+from paracelsus.schema import extract_schema
+from paracelsus.transformers.mermaid import Mermaid
 
 from .utils import mermaid_assert
 
@@ -94,3 +100,86 @@ def test_get_graph_string_with_layout(layout_arg, package_path):
         layout=Layouts(layout_arg),
     )
     mermaid_assert(graph_string)
+
+
+def test_filter_metadata_all_tables_is_not_copied(metaclass):
+    assert filter_metadata(metadata=metaclass, include_tables=set(metaclass.tables)) is metaclass
+
+
+def test_filter_metadata_view(metaclass):
+    view = filter_metadata(metadata=metaclass, include_tables={"users", "posts"})
+
+    assert isinstance(view, MetadataView)
+    assert list(view.tables) == ["users", "posts"]
+    # Tables are shared with the original metadata, not copied.
+    assert view.tables["users"] is metaclass.tables["users"]
+    with pytest.raises(TypeError):
+        view.tables["comments"] = metaclass.tables["comments"]  # type: ignore[index]
+    assert set(metaclass.tables) == {"users", "posts", "comments"}
+
+
+def test_filter_metadata_view_renders(metaclass):
+    view = filter_metadata(metadata=metaclass, include_tables={"users", "posts"})
+    graph_string = str(Mermaid(view, "key-based"))
+
+    assert "comments {" not in graph_string
+    assert "users ||--o{ posts : author" in graph_string
+
+
+def test_resolve_included_tables_warns_about_unused_patterns(caplog):
+    all_tables = {"users", "posts", "comments"}
+    with caplog.at_level(logging.WARNING):
+        included = resolve_included_tables(
+            include_tables={"users", "nothing.*"}, exclude_tables=set(), all_tables=all_tables
+        )
+
+    assert included == {"users"}
+    assert "nothing.*" in caplog.text
+
+
+def test_resolve_included_tables_exclude_prefix():
+    all_tables = {"users", "users_archive", "posts"}
+    included = resolve_included_tables(include_tables=set(), exclude_tables={"users"}, all_tables=all_tables)
+    assert included == {"posts"}
+
+
+def test_get_graphs_imports_once(package_path, monkeypatch):
+    from paracelsus import graph as graph_module
+
+    calls = []
+    original = graph_module.import_metadata
+
+    def counting(**kwargs):
+        calls.append(kwargs)
+        return original(**kwargs)
+
+    monkeypatch.setattr(graph_module, "import_metadata", counting)
+    graphs = get_graphs(
+        base_class_path="example.base:Base",
+        import_module=["example.models"],
+        include_tables=set(),
+        exclude_tables=set(),
+        python_dir=[package_path],
+        formats=["mermaid", "dot"],
+        column_sort="key-based",
+    )
+
+    assert len(calls) == 1
+    assert isinstance(graphs["mermaid"], Mermaid)
+    mermaid_assert(str(graphs["mermaid"]))
+    assert graphs["dot"].schema is graphs["mermaid"].schema
+
+
+def test_get_transformer_shows_enum_members():
+    metadata = MetaData()
+    Table(
+        "posts",
+        metadata,
+        Column("id", Integer, primary_key=True),
+        Column("status", Enum("draft", "review", "published", "archived", name="status"), nullable=False),
+    )
+    schema = extract_schema(metadata)
+
+    assert "values:" not in str(get_transformer(schema, format="mermaid", column_sort="key-based"))
+    graph = str(get_transformer(schema, format="mermaid", column_sort="key-based", max_enum_members=3))
+    assert 'ENUM status "values: draft, review, ..., archived"' in graph
@@ -0,0 +1,50 @@
+import subprocess
+import sys
+from pathlib import Path
+from typing import List, Set
+
+import pytest
+
+HEAVY_MODULES = ("sqlalchemy", "pydot", "pyparsing", "packaging")
+
+
+def imported_modules(code: str, cwd: Path) -> Set[str]:
+    """Run code in a fresh interpreter with ``-X importtime`` and return the names of the modules it imported."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], cwd=cwd, capture_output=True, text=True, check=True
+    )
+    modules = set()
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line and "cumulative" not in line:
+            modules.add(line.rsplit("|", 1)[1].strip())
+    return modules
+
+
+def run_cli(arguments: List[str]) -> str:
+    return (
+        f"import sys; sys.argv = ['paracelsus', *{arguments!r}]\n"
+        "from paracelsus.daemon import main\n"
+        "try:\n    main()\nexcept SystemExit:\n    pass"
+    )
+
+
+def top_level(modules: Set[str]) -> Set[str]:
+    return {module.split(".")[0] for module in modules}
+
+
+@pytest.mark.parametrize("arguments", [["version"], ["--help"], ["graph", "--help"], ["inject", "--help"]])
+def test_startup_does_not_import_sqlalchemy(arguments: List[str], tmp_path: Path):
+    modules = imported_modules(run_cli(arguments), tmp_path)
+    assert "paracelsus.cli" in modules
+    assert top_level(modules).isdisjoint(HEAVY_MODULES)
+
+
+@pytest.mark.parametrize(
+    "format, unused", [("mermaid", "paracelsus.transformers.dot"), ("dot", "paracelsus.transformers.mermaid")]
+)
+def test_graph_only_imports_its_transformer(package_path: Path, format: str, unused: str):
+    arguments = ["graph", "example.base:Base", "--import-module", "example.models", "--format", format, "--no-cache"]
+    modules = imported_modules(run_cli(arguments), package_path)
+    assert "sqlalchemy" in modules
+    assert unused not in modules
+    assert top_level(modules).isdisjoint(("pydot", "pyparsing"))
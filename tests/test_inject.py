@@ -0,0 +1,289 @@
+from pathlib import Path
+from textwrap import dedent
+
+import pytest
+
+from paracelsus.config import ColumnSorts, ExtractModes, FocusDirections, Formats, ParacelsusSettingsForGraph
+from paracelsus.inject import (
+    BlockRenderer,
+    expand_files,
+    inject_blocks,
+    inject_file,
+    parse_block_options,
+    split_inject_arguments,
+)
+from paracelsus.schema import Schema, extract_schema
+
+
+def test_split_inject_arguments(package_path: Path):
+    assert split_inject_arguments(["README.md", "docs/*.md", "example.base:Base"]) == (
+        ["README.md", "docs/*.md"],
+        "example.base:Base",
+    )
+    assert split_inject_arguments(["README.md"]) == (["README.md"], None)
+
+
+def test_split_inject_arguments_existing_file_with_colon(package_path: Path):
+    (package_path / "a:b.md").write_text("")
+    assert split_inject_arguments(["a:b.md", "example.base:Base"]) == (["a:b.md"], "example.base:Base")
+
+
+def test_expand_files(package_path: Path):
+    (package_path / "docs" / "nested").mkdir(parents=True)
+    (package_path / "docs" / "a.md").write_text("")
+    (package_path / "docs" / "nested" / "b.md").write_text("")
+
+    assert expand_files(["docs/**/*.md", "docs/a.md"]) == [
+        (package_path / "docs" / "a.md").resolve(),
+        (package_path / "docs" / "nested" / "b.md").resolve(),
+    ]
+
+
+@pytest.mark.parametrize("pattern", ["missing.md", "missing/*.md"])
+def test_expand_files_missing(package_path: Path, pattern: str):
+    with pytest.raises(ValueError):
+        expand_files([pattern])
+
+
+BEGIN = "<!-- BEGIN_SQLALCHEMY_DOCS -->"
+END = "<!-- END_SQLALCHEMY_DOCS -->"
+
+
+def render_options(options):
+    return (
+        f"rendered {dict((key, sorted(value) if isinstance(value, frozenset) else value) for key, value in options)}\n"
+    )
+
+
+def inject(content: str) -> str:
+    return "".join(inject_blocks(content.splitlines(keepends=True), render_options, BEGIN, END))
+
+
+def test_inject_blocks_multiple():
+    content = dedent("""\
+        # Title
+        <!-- BEGIN_SQLALCHEMY_DOCS include-tables=users,posts -->
+        old
+        <!-- END_SQLALCHEMY_DOCS -->
+        between
+          <!-- BEGIN_SQLALCHEMY_DOCS format=dot omit-comments=true -->
+        <!-- END_SQLALCHEMY_DOCS -->
+        after
+    """)
+    assert inject(content) == dedent("""\
+        # Title
+        <!-- BEGIN_SQLALCHEMY_DOCS include-tables=users,posts -->
+        rendered {'include_tables': ['posts', 'users']}
+        <!-- END_SQLALCHEMY_DOCS -->
+        between
+          <!-- BEGIN_SQLALCHEMY_DOCS format=dot omit-comments=true -->
+        rendered {'format': <Formats.dot: 'dot'>, 'omit_comments': True}
+        <!-- END_SQLALCHEMY_DOCS -->
+        after
+    """)
+
+
+def test_inject_blocks_ignores_longer_tags():
+    content = "<!-- BEGIN_SQLALCHEMY_DOCS_OTHER -->\nkept\n<!-- END_SQLALCHEMY_DOCS -->\n"
+    assert inject(content) == content
+
+
+def test_inject_blocks_inline_tags():
+    content = dedent("""\
+        Intro <!-- BEGIN_SQLALCHEMY_DOCS layout=elk --> old
+        old <!-- END_SQLALCHEMY_DOCS --> outro
+        Inline: <!-- BEGIN_SQLALCHEMY_DOCS --> old <!-- END_SQLALCHEMY_DOCS --> done
+    """)
+    assert inject(content) == dedent("""\
+        Intro <!-- BEGIN_SQLALCHEMY_DOCS layout=elk -->
+        rendered {'layout': <Layouts.elk: 'elk'>}
+        <!-- END_SQLALCHEMY_DOCS --> outro
+        Inline: <!-- BEGIN_SQLALCHEMY_DOCS -->
+        rendered {}
+        <!-- END_SQLALCHEMY_DOCS --> done
+    """)
+
+    # The result is made of regular blocks, which inject again to the same content.
+    assert inject(inject(content)) == inject(content)
+
+
+def test_inject_blocks_inline_custom_tags():
+    content = "Graph: [begin] layout=elk [end]\n"
+    result = "".join(inject_blocks(content.splitlines(keepends=True), render_options, "[begin]", "[end]"))
+    assert result == "Graph: [begin] layout=elk\nrendered {'layout': <Layouts.elk: 'elk'>}\n[end]\n"
+
+
+def test_inject_blocks_inline_fingerprints():
+    def fingerprint(options):
+        return "f0"
+
+    content = f"Intro {BEGIN} old {END}\n"
+    lines = content.splitlines(keepends=True)
+    injected = "".join(inject_blocks(lines, render_options, BEGIN, END, fingerprint=fingerprint, add_fingerprints=True))
+    assert injected == f"Intro <!-- BEGIN_SQLALCHEMY_DOCS sha256=f0 -->\nrendered {{}}\n{END}\n"
+
+
+def test_inject_blocks_custom_tags():
+    content = "[begin] layout=elk\nold\n[end]"
+    result = "".join(inject_blocks(content.splitlines(keepends=True), render_options, "[begin]", "[end]"))
+    assert result == "[begin] layout=elk\nrendered {'layout': <Layouts.elk: 'elk'>}\n[end]"
+
+
+@pytest.mark.parametrize(
+    "content, message",
+    [
+        (f"{BEGIN}\nnever closed\n", "<file>:1: the begin tag has no matching end tag"),
+        ("text\n<!-- BEGIN_SQLALCHEMY_DOCS colour=blue -->\n" + END, "<file>:2: Unknown setting 'colour'"),
+        ("<!-- BEGIN_SQLALCHEMY_DOCS layout -->\n" + END, "Expected a key=value setting"),
+        ("<!-- BEGIN_SQLALCHEMY_DOCS layout=sideways -->\n" + END, "sideways"),
+    ],
+)
+def test_inject_blocks_errors(content: str, message: str):
+    with pytest.raises(ValueError, match=message):
+        inject(content)
+
+
+def test_inject_blocks_fingerprints():
+    def fingerprint(options):
+        return f"f{len(options)}"
+
+    def fail(options):
+        raise AssertionError("Blocks with a matching fingerprint should not be rendered.")
+
+    content = f"{BEGIN}\nold\n{END}\n  <!-- BEGIN_SQLALCHEMY_DOCS layout=elk -->\n{END}\n"
+    lines = content.splitlines(keepends=True)
+    injected = "".join(inject_blocks(lines, render_options, BEGIN, END, fingerprint=fingerprint, add_fingerprints=True))
+    assert injected == dedent("""\
+        <!-- BEGIN_SQLALCHEMY_DOCS sha256=f0 -->
+        rendered {}
+        <!-- END_SQLALCHEMY_DOCS -->
+          <!-- BEGIN_SQLALCHEMY_DOCS layout=elk sha256=f1 -->
+        rendered {'layout': <Layouts.elk: 'elk'>}
+        <!-- END_SQLALCHEMY_DOCS -->
+    """)
+
+    # Current blocks are kept as they are, even without asking for new fingerprints.
+    lines = injected.splitlines(keepends=True)
+    assert "".join(inject_blocks(lines, fail, BEGIN, END, fingerprint=fingerprint)) == injected
+
+    # Stale blocks are rendered again and get the new fingerprint.
+    stale = injected.replace("sha256=f1", "sha256=old")
+    lines = stale.splitlines(keepends=True)
+    assert "".join(inject_blocks(lines, render_options, BEGIN, END, fingerprint=fingerprint)) == injected
+
+
+def test_parse_block_options():
+    assert parse_block_options('column-sort=preserve-order max-enum-members=2 type-parameter-delimiter="_"') == (
+        ("column_sort", ColumnSorts.preserve),
+        ("max_enum_members", 2),
+        ("type_parameter_delimiter", "_"),
+    )
+
+
+def test_block_renderer(metaclass):
+    settings = ParacelsusSettingsForGraph(
+        base_class_path="example.base:Base",
+        import_module=[],
+        include_tables=set(),
+        exclude_tables={"comments"},
+        focus=set(),
+        depth=1,
+        direction=FocusDirections.both,
+        python_dir=[],
+        format=Formats.mermaid,
+        column_sort=ColumnSorts.key_based,
+        omit_comments=False,
+        max_enum_members=0,
+        layout=None,
+        type_parameter_delimiter="-",
+        cache_dir=None,
+        extract=ExtractModes.imports,
+        dialect=None,
+        from_url=None,
+        reflect_schemas=[],
+        attach={},
+        snapshot=None,
+        jobs=1,
+    )
+    render = BlockRenderer(extract_schema(metaclass), settings)
+
+    default = render(())
+    assert default.startswith("```mermaid\n")
+    assert "posts {" in default and "comments {" not in default
+
+    # Included tables replace the excluded tables of the command line.
+    only_comments = render(parse_block_options("include-tables=comments format=dot"))
+    assert only_comments.startswith("```dot\n")
+    assert "<b>comments</b>" in only_comments and "<b>posts</b>" not in only_comments
+    assert render(parse_block_options("format=dot include-tables=comments")) is only_comments
+
+    assert render.fingerprint(()) == render.fingerprint(())
+    assert render.fingerprint(()) != render.fingerprint(parse_block_options("format=dot"))
+    # Blocks which render the same graph share a fingerprint.
+    assert render.fingerprint(()) == render.fingerprint(parse_block_options("exclude-tables=comments"))
+    assert BlockRenderer(extract_schema(metaclass).subset({"users"}), settings).fingerprint(()) != render.fingerprint(
+        ()
+    )
+
+    # Excluded tables still apply to the neighborhood of the focused tables.
+    focused = parse_block_options("focus=users depth=2 direction=in")
+    assert render(focused) == default
+    only_users = parse_block_options("focus=users direction=out")
+    assert "users {" in render(only_users) and "posts {" not in render(only_users)
+    assert render.fingerprint(focused) != render.fingerprint(only_users)
+
+
+def test_block_renderer_reuses_unchanged_blocks(metaclass):
+    settings = ParacelsusSettingsForGraph(
+        base_class_path="example.base:Base",
+        import_module=[],
+        include_tables=set(),
+        exclude_tables=set(),
+        focus=set(),
+        depth=1,
+        direction=FocusDirections.both,
+        python_dir=[],
+        format=Formats.mermaid,
+        column_sort=ColumnSorts.key_based,
+        omit_comments=False,
+        max_enum_members=0,
+        layout=None,
+        type_parameter_delimiter="-",
+        cache_dir=None,
+        extract=ExtractModes.imports,
+        dialect=None,
+        from_url=None,
+        reflect_schemas=[],
+        attach={},
+        snapshot=None,
+        jobs=1,
+    )
+    schema = extract_schema(metaclass)
+    previous = BlockRenderer(schema, settings)
+    users = parse_block_options("include-tables=users")
+    previous_users, previous_all = previous(users), previous(())
+
+    comments = schema.tables["comments"]
+    columns = (*comments.columns[:-1], comments.columns[-1]._replace(comment="Changed"))
+    changed = Schema(
+        comments._replace(columns=columns) if table is comments else table for table in schema.tables.values()
+    )
+    render = BlockRenderer(changed, settings, previous=previous)
+    assert render(users) is previous_users
+    assert render(()) != previous_all
+
+    # Fingerprints only cover the tables a block selects.
+    assert render.fingerprint(users) == previous.fingerprint(users)
+    assert render.fingerprint(()) != previous.fingerprint(())
+
+
+def test_inject_file_keeps_mode(tmp_path: Path):
+    path = tmp_path / "doc.md"
+    path.write_text(f"{BEGIN}\n{END}\n")
+    path.chmod(0o640)
+
+    inject_file(path, render_options, BEGIN, END)
+
+    assert path.read_text() == f"{BEGIN}\nrendered {{}}\n{END}\n"
+    assert path.stat().st_mode & 0o777 == 0o640
+    assert list(tmp_path.iterdir()) == [path]
@@ -0,0 +1,72 @@
+import re
+
+import pytest
+
+from paracelsus.matcher import TableMatcher, _literal_prefix, get_table_matcher
+
+TABLES = ["users", "users_archive", "posts", "comments", "some_schema.foo", "some_schema.bar", "audit_log"]
+
+
+@pytest.mark.parametrize(
+    "patterns",
+    [
+        ["users"],
+        ["^com.*", "posts"],
+        ["some_schema.foo"],
+        ["(users|posts)_?"],
+        ["(?i)AUDIT", "posts"],
+        [r"(\w+)_\1", "^c"],
+        ["missing", ".*_log$"],
+    ],
+)
+def test_matcher_matches_like_re_match(patterns):
+    matcher = TableMatcher(patterns)
+    expected = {table for table in TABLES if any(re.match(pattern, table) for pattern in patterns)}
+
+    matched, _ = matcher.select(TABLES)
+    assert matched == expected
+    for table in TABLES:
+        assert (matcher.match(table) is not None) == (table in expected)
+
+
+def test_matcher_literal_is_a_prefix_match():
+    matcher = TableMatcher(["users"])
+    assert matcher.match("users") == "users"
+    assert matcher.match("users_archive") == "users"
+    assert matcher.match("old_users") is None
+
+
+def test_matcher_reports_unused_patterns():
+    matcher = TableMatcher(["users", "users_arch", "missing", "^nope.*"])
+    matched, unused = matcher.select(TABLES)
+
+    assert matched == {"users", "users_archive"}
+    # "users_arch" is shadowed by "users" but still matches a table, so it is not reported.
+    assert unused == {"missing", "^nope.*"}
+
+
+def test_matcher_invalid_pattern():
+    with pytest.raises(re.error):
+        TableMatcher(["users("])
+
+
+def test_get_table_matcher_is_cached():
+    assert get_table_matcher(frozenset({"users", "posts"})) is get_table_matcher(frozenset({"posts", "users"}))
+
+
+@pytest.mark.parametrize(
+    "pattern, prefix",
+    [
+        ("users", "users"),
+        ("^com.*", "com"),
+        (r"some_schema\.foo", "some_schema.foo"),
+        ("users?", "user"),
+        ("ab{2}", "a"),
+        (r"a\.*", "a"),
+        (r"\w+", ""),
+        ("a|b", ""),
+        ("(?i)users", ""),
+    ],
+)
+def test_literal_prefix(pattern, prefix):
+    assert _literal_prefix(pattern) == prefix
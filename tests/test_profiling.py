@@ -0,0 +1,32 @@
+from paracelsus.profiling import Profiler, phase
+
+
+def test_phase_without_profiler():
+    with phase("import"):
+        pass
+
+
+def test_profiler_phases():
+    profiler = Profiler("graph")
+    with profiler.activate():
+        with phase("render"):
+            with phase("write"):
+                written = [bytearray(1_000_000)]
+            del written
+        with phase("render"):
+            pass
+
+    report = profiler.report()
+    assert report["command"] == "graph"
+    assert report["phases"]["render"]["calls"] == 2
+    assert report["phases"]["write"]["calls"] == 1
+    # The memory of a nested phase counts towards the phases around it.
+    assert report["phases"]["write"]["peak_memory_bytes"] >= 1_000_000
+    assert report["phases"]["render"]["peak_memory_bytes"] >= 1_000_000
+    assert report["peak_memory_bytes"] >= 1_000_000
+    assert report["wall_seconds"] >= report["phases"]["render"]["wall_seconds"]
+
+    # Phases outside of the activated profiler aren't recorded.
+    with phase("write"):
+        pass
+    assert profiler.report()["phases"]["write"]["calls"] == 1
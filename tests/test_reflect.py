@@ -0,0 +1,68 @@
+from pathlib import Path
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine
+
+from paracelsus.config import parse_attach
+from paracelsus.reflect import create_reflection_engine, reflect_metadata
+
+
+@pytest.fixture
+def database(tmp_path: Path, metaclass) -> tuple[str, Path]:
+    """A SQLite database with the tables of the example models, and a second database to attach to it."""
+    path = tmp_path / "app.db"
+    engine = create_engine(f"sqlite:///{path}")
+    metaclass.create_all(engine)
+    engine.dispose()
+
+    archive = tmp_path / "archive.db"
+    engine = create_engine(f"sqlite:///{archive}")
+    archive_metadata = MetaData()
+    Table("audit", archive_metadata, Column("id", Integer, primary_key=True), Column("action", String(50)))
+    archive_metadata.create_all(engine)
+    engine.dispose()
+
+    return f"sqlite:///{path}", archive
+
+
+def test_reflect_metadata(database: tuple[str, Path]):
+    url, _ = database
+    metadata = reflect_metadata(url)
+
+    assert sorted(metadata.tables) == ["comments", "posts", "users"]
+    foreign_keys = {fk.target_fullname for fk in metadata.tables["posts"].foreign_keys}
+    assert foreign_keys == {"users.id"}
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_reflect_metadata_attach(database: tuple[str, Path], jobs: int):
+    url, archive = database
+    metadata = reflect_metadata(url, attach={"archive": archive}, jobs=jobs)
+
+    assert sorted(metadata.tables) == ["archive.audit", "comments", "posts", "users"]
+    assert list(metadata.tables["archive.audit"].columns.keys()) == ["id", "action"]
+
+
+def test_reflect_metadata_invalid_url():
+    with pytest.raises(ValueError, match="Invalid database URL"):
+        reflect_metadata("not a url")
+
+
+def test_attach_requires_sqlite(tmp_path: Path):
+    with pytest.raises(ValueError, match="Only SQLite"):
+        create_reflection_engine("mysql://localhost/app", {"archive": tmp_path / "archive.db"})
+
+
+def test_parse_attach():
+    assert parse_attach("archive=data/archive.db") == ("archive", Path("data/archive.db"))
+
+    with pytest.raises(ValueError):
+        parse_attach("archive")
+
+    with pytest.raises(ValueError):
+        parse_attach('bad"name=archive.db')
+
+
+def test_missing_driver():
+    with pytest.raises(ValueError, match="isn't installed"):
+        create_reflection_engine("mysql://localhost/app")
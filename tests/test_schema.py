@@ -0,0 +1,149 @@
+import io
+import logging
+import multiprocessing
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+
+from sqlalchemy import Column, Enum, ForeignKey, Integer, MetaData, Table
+
+from paracelsus.graph import filter_metadata
+from paracelsus.schema import ForeignKeyRecord, Schema, TableRecord, dump_schema, extract_schema, load_schema
+from paracelsus.transformers.dot import Dot
+from paracelsus.transformers.mermaid import Mermaid
+
+
+def test_extract_schema(metaclass):
+    schema = extract_schema(metaclass)
+
+    assert list(schema.tables) == ["users", "posts", "comments"]
+
+    posts = schema.tables["posts"]
+    assert [column.name for column in posts.columns] == ["id", "created", "author", "live", "content"]
+    assert [column.name for column in posts.sorted_columns("key-based")] == [
+        "id",
+        "author",
+        "content",
+        "created",
+        "live",
+    ]
+
+    live = posts.columns[3]
+    assert live.type == "BOOLEAN"
+    assert live.comment == "True if post is published"
+    assert live.nullable
+    assert not live.primary_key
+    assert live.enum_values is None
+
+
+def test_schema_edges(metaclass):
+    schema = extract_schema(metaclass)
+
+    assert schema.edges["users"] == ()
+    assert [(edge.referred_table, edge.column) for edge in schema.edges["comments"]] == [
+        ("posts", "post"),
+        ("users", "author"),
+    ]
+    edge = schema.edges["posts"][0]
+    assert edge.referred_unique
+    assert not edge.referring_unique
+
+
+def test_schema_subset_drops_edges(metaclass, caplog):
+    schema = extract_schema(metaclass).subset({"posts", "comments"})
+
+    assert list(schema.tables) == ["posts", "comments"]
+    assert schema.edges["posts"] == ()
+    assert [edge.referred_table for edge in schema.edges["comments"]] == ["posts"]
+    assert schema.skipped == {"users": 2}
+    # Skipped foreign keys are reported together, with their count per missing table.
+    assert caplog.text.count("not included in the graph") == 1
+    assert "Skipping 2 foreign keys to tables which are not included in the graph: 'users' (2)." in caplog.text
+
+
+def test_schema_skipped_summary(caplog):
+    tables = [TableRecord(f"table_{i}", f"table_{i}", None, (), ()) for i in range(12)]
+    foreign_keys = tuple(
+        ForeignKeyRecord("id", table.key, "id") for table in tables for _ in range(tables.index(table) + 1)
+    )
+    schema = Schema([TableRecord("orphans", "orphans", None, (), foreign_keys)])
+
+    assert sum(schema.skipped.values()) == 78
+    assert "Skipping 78 foreign keys" in caplog.text
+    # The tables missing the most foreign keys come first, the rest are only counted.
+    assert "'table_11' (12), 'table_10' (11)" in caplog.text
+    assert "'table_2' (3) and 2 other tables." in caplog.text
+
+
+# The warnings logged in a worker process, recorded by ``_record_warnings``.
+_worker_warnings: List[str] = []
+
+
+class _RecordingHandler(logging.Handler):
+    def emit(self, record: logging.LogRecord) -> None:
+        _worker_warnings.append(record.getMessage())
+
+
+def _record_warnings() -> None:
+    logging.getLogger("paracelsus.schema").addHandler(_RecordingHandler(logging.WARNING))
+
+
+def _count_warnings(schema: Schema) -> int:
+    return len(_worker_warnings)
+
+
+def test_schema_skipped_summary_once_with_spawned_workers(metaclass, caplog, package_path):
+    # Spawned processes start in the current directory, package_path makes sure it exists.
+    schema = extract_schema(metaclass).subset({"posts", "comments"})
+
+    # Spawned workers receive the schema pickled, which must not report its skipped foreign keys again.
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=2, mp_context=context, initializer=_record_warnings) as executor:
+        assert list(executor.map(_count_warnings, [schema] * 4)) == [0, 0, 0, 0]
+    assert len([record for record in caplog.records if "not included in the graph" in record.getMessage()]) == 1
+
+
+def test_schema_edges_referred_name():
+    metadata = MetaData()
+    Table("users", metadata, Column("id", Integer, primary_key=True), schema="auth")
+    Table("posts", metadata, Column("id", Integer, primary_key=True), Column("author", ForeignKey("auth.users.id")))
+    schema = extract_schema(metadata)
+
+    edge = schema.edges["posts"][0]
+    assert (edge.referred_table, edge.referred_name, edge.referring_table) == ("auth.users", "users", "posts")
+    assert "  users ||--o{ posts : author" in str(Mermaid(schema, "key-based"))
+
+
+def test_schema_pickle(metaclass):
+    schema = extract_schema(metaclass)
+    restored = pickle.loads(pickle.dumps(schema))
+
+    assert isinstance(restored, Schema)
+    assert restored.tables == schema.tables
+    assert restored.edges == schema.edges
+
+
+def test_transformers_render_from_schema(metaclass):
+    view = filter_metadata(metadata=metaclass, include_tables={"users", "posts"})
+    schema = extract_schema(view)
+
+    assert str(Mermaid(schema, "key-based")) == str(Mermaid(view, "key-based"))
+    assert str(Dot(schema, "key-based")) == str(Dot(view, "key-based"))
+
+
+def test_shared_enum_members():
+    metadata = MetaData()
+    status = Enum("draft", "published", name="status")
+    for name in ("posts", "pages"):
+        Table(name, metadata, Column("id", Integer, primary_key=True), Column("status", status))
+
+    schema = extract_schema(metadata)
+    buffer = io.StringIO()
+    dump_schema(schema, buffer)
+    buffer.seek(0)
+    loaded = load_schema(buffer)
+
+    for restored in (schema, loaded):
+        posts, pages = restored.tables["posts"].columns[1], restored.tables["pages"].columns[1]
+        assert posts.enum_values == ("draft", "published")
+        assert posts.enum_values is pages.enum_values
@@ -0,0 +1,145 @@
+from pathlib import Path
+
+import pytest
+from sqlalchemy import Column, ForeignKey, Integer, MetaData, Table
+from typer.testing import CliRunner
+
+from paracelsus.cli import app
+from paracelsus.config import Formats
+from paracelsus.schema import extract_schema
+from paracelsus.split import group_schemas, parse_split_by, write_split_graphs
+
+runner = CliRunner()
+
+
+def test_group_by_pattern_with_stubs(metaclass):
+    groups = group_schemas(extract_schema(metaclass), parse_split_by("pattern:^(users|comments)"))
+    assert list(groups) == ["comments", "default", "users"]
+
+    # Posts point at users, so the users group shows a stub of posts with only its foreign key...
+    users = groups["users"]
+    assert list(users.tables) == ["users", "posts", "comments"]
+    assert [table.name for table in users.tables.values()] == ["users", "posts-stub", "comments-stub"]
+    assert [column.name for column in users.tables["posts"].columns] == ["author"]
+    assert [edge.referring_table for edge in users.edges["posts"]] == ["posts"]
+
+    # ...and the posts group shows a stub of users with only the referred column.
+    default = groups["default"]
+    assert [column.name for column in default.tables["users"].columns] == ["id"]
+    assert default.edges["users"] == ()
+    assert [edge.referred_table for edge in default.edges["posts"]] == ["users"]
+
+
+def test_group_by_schema():
+    metadata = MetaData()
+    Table("accounts", metadata, Column("id", Integer, primary_key=True), schema="billing")
+    Table(
+        "users",
+        metadata,
+        Column("id", Integer, primary_key=True),
+        Column("account_id", ForeignKey("billing.accounts.id")),
+    )
+    groups = group_schemas(extract_schema(metadata), parse_split_by("schema"))
+    assert {group: list(schema.tables) for group, schema in groups.items()} == {
+        "billing": ["billing.accounts", "users"],
+        "default": ["users", "billing.accounts"],
+    }
+
+
+def test_group_by_pattern_without_groups(metaclass):
+    groups = group_schemas(extract_schema(metaclass), parse_split_by("pattern:^.{5}$"))
+    assert sorted(groups) == ["default", "posts", "users"]
+
+
+@pytest.mark.parametrize("value", ["tables", "pattern:("])
+def test_parse_split_by_errors(value):
+    with pytest.raises(ValueError):
+        parse_split_by(value)
+
+
+def test_write_split_graphs_parallel_matches_serial(metaclass, tmp_path: Path):
+    schema = extract_schema(metaclass)
+    arguments = dict(
+        split_by="pattern:^(users|comments)", formats=[Formats.mermaid, Formats.dot], column_sort="key-based"
+    )
+
+    serial = write_split_graphs(schema, directory=tmp_path / "serial", **arguments)
+    parallel = write_split_graphs(schema, directory=tmp_path / "parallel", jobs=2, **arguments)
+
+    assert (
+        [path.name for path in serial]
+        == [path.name for path in parallel]
+        == [
+            "comments.mmd",
+            "comments.dot",
+            "default.mmd",
+            "default.dot",
+            "users.mmd",
+            "users.dot",
+        ]
+    )
+    for serial_path, parallel_path in zip(serial, parallel):
+        assert serial_path.read_text() == parallel_path.read_text()
+    assert (tmp_path / "serial" / "index.md").read_text() == (tmp_path / "parallel" / "index.md").read_text()
+
+
+def test_graph_split_by(package_path: Path):
+    output_dir = package_path / "diagrams"
+    result = runner.invoke(
+        app,
+        [
+            "graph",
+            "example.base:Base",
+            "--import-module",
+            "example.models",
+            "--python-dir",
+            str(package_path),
+            "--split-by",
+            "pattern:^(users)",
+            "--output-dir",
+            str(output_dir),
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    assert result.stdout == ""
+    assert sorted(path.name for path in output_dir.iterdir()) == ["default.mmd", "index.md", "users.mmd"]
+    assert "- **users** (1 table): [users.mmd](users.mmd)" in (output_dir / "index.md").read_text()
+
+    # Every relationship of the full graph is kept in the group holding its foreign key, the tables of other groups
+    # are marked as stubs.
+    default = (output_dir / "default.mmd").read_text()
+    assert "users-stub {" in default
+    assert "users-stub ||--o{ posts : author" in default
+    assert "users-stub ||--o{ comments : author" in default
+    assert "posts ||--o{ comments : post" in default
+    assert "users {" not in default
+    assert "posts-stub {" in (output_dir / "users.mmd").read_text()
+
+
+def test_write_split_graphs_marks_stubs_in_dot(metaclass, tmp_path: Path):
+    schema = extract_schema(metaclass)
+    write_split_graphs(
+        schema, split_by="pattern:^(users)", directory=tmp_path, formats=[Formats.dot], column_sort="key-based"
+    )
+
+    default = (tmp_path / "default.dot").read_text()
+    assert "<b>users-stub</b>" in default
+    assert '"users-stub" -- posts' in default
+
+
+@pytest.mark.parametrize(
+    "arguments",
+    [
+        ["--split-by", "schema"],
+        ["--split-by", "schema", "--output-dir", "out", "--format", "mermaid=out.mmd"],
+        ["--output-dir", "out"],
+    ],
+)
+def test_graph_split_by_invalid_outputs(package_path: Path, arguments):
+    result = runner.invoke(
+        app,
+        ["graph", "example.base:Base", "--import-module", "example.models", "--python-dir", str(package_path)]
+        + arguments,
+    )
+    assert result.exit_code != 0
+    assert isinstance(result.exception, ValueError)
@@ -0,0 +1,216 @@
+import importlib
+import logging
+import os
+import sys
+from pathlib import Path
+from textwrap import dedent
+
+import pytest
+
+from paracelsus.graph import get_schema
+from paracelsus.schema import extract_schema
+from paracelsus.static import static_metadata
+
+BASE = """\
+from typing import TYPE_CHECKING
+
+from sqlalchemy.orm import DeclarativeBase
+
+if TYPE_CHECKING:
+    from .unused import Unused
+
+
+class Base(DeclarativeBase):
+    __table_args__ = {"comment": "shared"}
+"""
+
+MODELS = """\
+import enum
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Optional
+
+import sqlalchemy as sa
+from sqlalchemy import Column, ForeignKey, String, Table, UniqueConstraint
+from sqlalchemy.orm import Mapped, declared_attr, mapped_column, relationship
+from sqlalchemy.types import TypeDecorator
+
+from . import constants
+from .base import Base
+
+NAME_LENGTH = 64
+
+
+class Status(enum.Enum):
+    draft = "draft"
+    published = "published"
+
+
+class Slug(TypeDecorator):
+    impl = String
+    cache_ok = True
+
+
+class TimestampMixin:
+    created: Mapped[datetime] = mapped_column(default=datetime.now)
+    updated: Mapped[Optional[datetime]]
+
+
+class Abstract(Base):
+    __abstract__ = True
+
+    note = mapped_column(sa.Text, comment="A note")
+
+
+class User(TimestampMixin, Abstract):
+    __tablename__ = "users"
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String(NAME_LENGTH), index=True)
+    nickname: Mapped[str | None] = mapped_column(String(constants.NICKNAME_LENGTH))
+    email = Column("email_address", String(200), unique=True, nullable=False)
+    balance: Mapped[Decimal]
+    posts: Mapped[List["Post"]] = relationship(back_populates="author")
+
+
+class Post(TimestampMixin, Base):
+    __tablename__ = "posts"
+    __table_args__ = (UniqueConstraint("slug"), {"schema": constants.SCHEMA})
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    author_id = mapped_column(ForeignKey(User.id), nullable=False)
+    slug = mapped_column(Slug(100))
+    status: Mapped[Status]
+    kind = mapped_column(sa.Enum("a", "b", name="kind"))
+    author: Mapped[User] = relationship(back_populates="posts")
+
+
+class Employee(Base):
+    __tablename__ = "employees"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    type: Mapped[str]
+
+
+class Manager(Employee):
+    level: Mapped[Optional[int]]
+
+
+class Engineer(Employee):
+    __tablename__ = "engineers"
+
+    id: Mapped[int] = mapped_column(ForeignKey("employees.id"), primary_key=True)
+    language: Mapped[str]
+
+
+class Dynamic(Base):
+    @declared_attr.directive
+    def __tablename__(cls) -> str:
+        return cls.__name__.lower()
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+
+
+tags = Table(
+    "tags",
+    Base.metadata,
+    Column("post_id", ForeignKey(f"{constants.SCHEMA}.posts.id"), primary_key=True),
+    Column("name", String(20), primary_key=True),
+)
+"""
+
+CONSTANTS = """\
+SCHEMA = "blog"
+NICKNAME_LENGTH = 30
+"""
+
+
+@pytest.fixture
+def static_package(tmp_path: Path, monkeypatch):
+    package = tmp_path / "static_example"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "base.py").write_text(BASE)
+    (package / "models.py").write_text(MODELS)
+    (package / "constants.py").write_text(CONSTANTS)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    os.chdir(tmp_path)
+    yield tmp_path
+    for name in list(sys.modules):
+        if name == "static_example" or name.startswith("static_example."):
+            del sys.modules[name]
+
+
+def imported_schema():
+    importlib.import_module("static_example.models")
+    base = importlib.import_module("static_example.base")
+    return extract_schema(base.Base.metadata)
+
+
+def test_static_matches_import(static_package, caplog):
+    with caplog.at_level(logging.WARNING):
+        static = extract_schema(
+            static_metadata(
+                base_class_path="static_example.base:Base",
+                import_module=["static_example.models"],
+                roots=[static_package],
+            )
+        )
+    imported = imported_schema()
+
+    assert "Unable to determine the table name of model 'Dynamic'" in caplog.text
+    imported = imported.subset(set(imported.tables) - {"dynamic"})
+    assert list(static.tables) == list(imported.tables)
+    for key in imported.tables:
+        assert static.tables[key] == imported.tables[key], key
+    assert static.edges == imported.edges
+
+
+def test_static_does_not_import(static_package):
+    (static_package / "static_example" / "__init__.py").write_text("raise RuntimeError('imported')\n")
+    schema = get_schema(
+        base_class_path="static_example.base:Base",
+        import_module=["static_example.models"],
+        include_tables={"users"},
+        exclude_tables=set(),
+        python_dir=[],
+        extract="static",
+    )
+    assert list(schema.tables) == ["users"]
+    assert "static_example" not in sys.modules
+
+
+def test_static_missing_module(static_package):
+    with pytest.raises(ValueError, match="Unable to find the source of module static_example.missing"):
+        static_metadata(
+            base_class_path="static_example.base:Base",
+            import_module=["static_example.missing"],
+            roots=[static_package],
+        )
+
+
+def test_static_unknown_type(static_package, caplog):
+    (static_package / "static_example" / "models.py").write_text(
+        dedent("""\
+            from sqlalchemy.orm import Mapped, mapped_column
+
+            from .base import Base
+            from .types import custom_type
+
+
+            class Thing(Base):
+                __tablename__ = "things"
+
+                id: Mapped[int] = mapped_column(primary_key=True)
+                value = mapped_column(custom_type())
+        """)
+    )
+    with caplog.at_level(logging.WARNING):
+        metadata = static_metadata(
+            base_class_path="static_example.base:Base",
+            import_module=["static_example.models"],
+            roots=[static_package],
+        )
+    assert str(metadata.tables["things"].c.value.type) == "NULL"
+    assert "Unable to determine the type of column 'Thing.value'" in caplog.text
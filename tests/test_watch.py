@@ -0,0 +1,100 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+from paracelsus.config import ColumnSorts, ExtractModes, FocusDirections, Formats, ParacelsusSettingsForGraph
+from paracelsus.watch import ModuleWatcher, Watcher
+
+from .utils import mermaid_assert
+
+BEGIN = "<!-- BEGIN_SQLALCHEMY_DOCS -->"
+END = "<!-- END_SQLALCHEMY_DOCS -->"
+
+NEW_TABLE = """
+
+class Tag(Base):
+    __tablename__ = "tags"
+
+    id = mapped_column(Uuid, primary_key=True)
+    post = mapped_column(ForeignKey(Post.id))
+"""
+
+
+def watch_settings(package_path: Path, extract: ExtractModes = ExtractModes.imports) -> ParacelsusSettingsForGraph:
+    return ParacelsusSettingsForGraph(
+        base_class_path="example.base:Base",
+        import_module=["example.models"],
+        include_tables=set(),
+        exclude_tables=set(),
+        focus=set(),
+        depth=1,
+        direction=FocusDirections.both,
+        python_dir=[package_path],
+        format=Formats.mermaid,
+        column_sort=ColumnSorts.key_based,
+        omit_comments=False,
+        max_enum_members=0,
+        layout=None,
+        type_parameter_delimiter="-",
+        cache_dir=None,
+        extract=extract,
+        dialect=None,
+        from_url=None,
+        reflect_schemas=[],
+        attach={},
+        snapshot=None,
+        jobs=1,
+    )
+
+
+def test_module_watcher(package_path: Path):
+    watcher = ModuleWatcher(["example.base:Base", "example.models"], [package_path])
+    assert sorted(watcher.files) == ["example", "example.base", "example.models"]
+    assert watcher.changed() == set()
+
+    with (package_path / "example" / "base.py").open("a") as fp:
+        fp.write("\n# changed\n")
+    assert watcher.changed() == {"example.base"}
+    assert watcher.changed() == set()
+
+    # The models import the base, and every submodule depends on its package.
+    assert watcher.dependents({"example.base"}) == {"example.base", "example.models"}
+    assert watcher.dependents({"example"}) == {"example", "example.base", "example.models"}
+
+
+@pytest.mark.parametrize("extract", [ExtractModes.imports, ExtractModes.static])
+def test_watcher_updates_changed_models(package_path: Path, extract: ExtractModes):
+    readme = package_path / "README.md"
+    output = package_path / "schema.mmd"
+    watcher = Watcher(
+        watch_settings(package_path, extract), files=[readme], output=output, begin_tag=BEGIN, end_tag=END
+    )
+
+    assert watcher.update() == [readme, output]
+    mermaid_assert(readme.read_text())
+    mermaid_assert(output.read_text())
+    assert watcher.poll() is None
+
+    with (package_path / "example" / "models.py").open("a") as fp:
+        fp.write(NEW_TABLE)
+    assert watcher.poll() == [readme, output]
+    assert "posts ||--o{ tags : post" in readme.read_text()
+    assert "posts ||--o{ tags : post" in output.read_text()
+    assert watcher.poll() is None
+
+
+def test_watcher_keeps_third_party_modules(package_path: Path):
+    readme = package_path / "README.md"
+    watcher = Watcher(watch_settings(package_path), files=[readme], output=None, begin_tag=BEGIN, end_tag=END)
+    watcher.update()
+    sqlalchemy_module = sys.modules["sqlalchemy.orm"]
+    base_module = sys.modules["example.base"]
+
+    # Changes which don't touch the tables don't rewrite anything.
+    with (package_path / "example" / "models.py").open("a") as fp:
+        fp.write("\n# changed\n")
+    assert watcher.poll() == []
+    assert sys.modules["sqlalchemy.orm"] is sqlalchemy_module
+    # The base class is always imported again, so its metadata doesn't hold the old tables.
+    assert sys.modules["example.base"] is not base_module
@@ -1,3 +1,6 @@
+import pytest
+from sqlalchemy import Column, ForeignKey, Integer, MetaData, Table
+
 from paracelsus.transformers.dot import Dot
 
 from ..utils import dot_assert
@@ -22,3 +25,51 @@ def test_dot_column_sort_preserve_order(metaclass):
     assert graph_string.index("users") < graph_string.index("id")
     assert graph_string.index("id") < graph_string.index("display_name")
     assert graph_string.index("display_name") < graph_string.index("created")
+
+
+@pytest.mark.parametrize("column_sort", ["key-based", "preserve-order"])
+def test_dot_native_matches_pydot(metaclass, column_sort):
+    native = Dot(metaclass=metaclass, column_sort=column_sort, backend="native")
+    pydot = Dot(metaclass=metaclass, column_sort=column_sort, backend="pydot")
+    assert str(native) == str(pydot)
+
+
+def test_dot_native_matches_pydot_cardinalities(package_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(package_path))
+    from example.cardinalities import Base
+
+    native = Dot(metaclass=Base.metadata, column_sort="key-based", backend="native")
+    pydot = Dot(metaclass=Base.metadata, column_sort="key-based", backend="pydot")
+    assert str(native) == str(pydot)
+    assert 'label="bar_id"' in str(native)
+
+
+def test_dot_native_matches_pydot_quoting():
+    metadata = MetaData()
+    Table("node", metadata, Column("id", Integer, primary_key=True))
+    Table("2fast", metadata, Column("id", Integer, primary_key=True))
+    Table(
+        "ünïcode",
+        metadata,
+        Column("id", Integer, primary_key=True),
+        Column("graph", Integer, ForeignKey("node.id")),
+        Column("1st", Integer, ForeignKey("2fast.id"), unique=True),
+        Column('say "hi"', Integer, ForeignKey("node.id")),
+    )
+
+    native = Dot(metaclass=metadata, column_sort="preserve-order", backend="native")
+    pydot = Dot(metaclass=metadata, column_sort="preserve-order", backend="pydot")
+    assert str(native) == str(pydot)
+
+
+def test_dot_native_streams_per_table(metaclass):
+    dot = Dot(metaclass=metaclass, column_sort="key-based")
+    chunks = list(dot.iter_chunks())
+    assert chunks[0] == "graph database {\n"
+    assert chunks[-1] == "}\n"
+    assert len(chunks) == len(metaclass.tables) + 2
+
+
+def test_dot_unknown_backend(metaclass):
+    with pytest.raises(ValueError):
+        Dot(metaclass=metaclass, column_sort="key-based", backend="unknown")  # type: ignore[arg-type]
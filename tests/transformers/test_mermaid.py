@@ -1,3 +1,5 @@
+import io
+
 import sqlalchemy
 from sqlalchemy import Column, Enum, MetaData, Table
 
@@ -13,6 +15,22 @@ def test_mermaid(metaclass):
     mermaid_assert(graph_string)
 
 
+def test_mermaid_write_matches_str(metaclass):
+    mermaid = Mermaid(metaclass=metaclass, column_sort="key-based", layout=Layouts.elk)
+    buffer = io.StringIO()
+    mermaid.write(buffer)
+    assert buffer.getvalue() == str(mermaid)
+
+
+def test_mermaid_iter_chunks_per_table(metaclass):
+    mermaid = Mermaid(metaclass=metaclass, column_sort="key-based")
+    chunks = list(mermaid.iter_chunks())
+    assert chunks[0] == "erDiagram\n"
+    assert chunks[1].startswith("  comments {")
+    assert chunks[2].startswith("  posts {")
+    assert chunks[3].startswith("  users {")
+
+
 def test_mermaid_column_sort_preserve_order(metaclass, mermaid_full_string_preseve_column_sort):
     mermaid = Mermaid(metaclass=metaclass, column_sort="preserve-order")
     assert str(mermaid) == mermaid_full_string_preseve_column_sort
@@ -79,6 +97,29 @@ def test_mermaid_enum_values_limited():
     assert "deleted" not in column_str
 
 
+def test_mermaid_shared_types_formatted_once():
+    metadata = MetaData()
+    status_enum = Enum("draft", "published", "archived", "deleted", "review", name="status_enum")
+    price = sqlalchemy.Numeric(10, 2)
+    for name in ("post", "page"):
+        Table(
+            name,
+            metadata,
+            Column("id", sqlalchemy.Integer, primary_key=True),
+            Column("status", status_enum),
+            Column("price", price),
+        )
+    mermaid = Mermaid(metaclass=metadata, column_sort="key-based", max_enum_members=3)
+    output = str(mermaid)
+
+    assert output.count("values: draft, published, ..., review") == 2
+    assert output.count("NUMERIC(10-2) price") == 2
+    # Both tables share the enum members, which are summarized a single time.
+    assert mermaid.schema.tables["post"].columns[1].enum_values is mermaid.schema.tables["page"].columns[1].enum_values
+    assert len(mermaid._enum_summaries) == 1
+    assert mermaid._types == {"INTEGER": "INTEGER", "NUMERIC(10, 2)": "NUMERIC(10-2)"}
+
+
 def test_mermaid_with_no_layout(metaclass, mermaid_full_string_with_no_layout):
     mermaid = Mermaid(metaclass=metaclass, column_sort="preserve-order", layout=None)
     assert str(mermaid) == mermaid_full_string_with_no_layout
@@ -0,0 +1,48 @@
+import pytest
+from sqlalchemy import Column, Enum, ForeignKey, Integer, MetaData, String, Table
+
+from paracelsus.config import Layouts
+from paracelsus.schema import extract_schema
+from paracelsus.transformers.dot import Dot
+from paracelsus.transformers.mermaid import Mermaid
+from paracelsus.transformers.parallel import ChunkPool
+
+
+@pytest.fixture(scope="module")
+def large_schema():
+    metadata = MetaData()
+    for index in range(60):
+        columns = [
+            Column("id", Integer, primary_key=True),
+            Column("name", String(100), comment=f"Name of {index}", unique=index % 3 == 0),
+            Column("state", Enum("new", "old", "gone", name=f"state_{index}")),
+        ]
+        if index:
+            columns.append(Column("parent_id", ForeignKey(f"table_{index // 2:03}.id"), index=True))
+        Table(f"table_{index:03}", metadata, *columns)
+    return extract_schema(metadata)
+
+
+@pytest.mark.parametrize("jobs", [2, 3])
+def test_mermaid_parallel_matches_serial(large_schema, jobs):
+    serial = Mermaid(large_schema, "key-based", max_enum_members=2, layout=Layouts.elk)
+    parallel = Mermaid(large_schema, "key-based", max_enum_members=2, layout=Layouts.elk, jobs=jobs)
+    assert str(parallel) == str(serial)
+
+
+@pytest.mark.parametrize("jobs", [2, 3])
+def test_dot_parallel_matches_serial(large_schema, jobs):
+    serial = Dot(large_schema, "preserve-order")
+    parallel = Dot(large_schema, "preserve-order", jobs=jobs)
+    assert str(parallel) == str(serial)
+
+
+def test_parallel_chunks_are_batched(large_schema):
+    chunks = list(Mermaid(large_schema, "key-based", jobs=2).iter_chunks())
+    # The header, then 8 batches of tables and 8 batches of relationships.
+    assert len(chunks) == 17
+
+
+def test_chunk_pool_requires_a_job():
+    with pytest.raises(ValueError, match="at least 1"):
+        ChunkPool(object(), jobs=0)
@@ -1,9 +1,10 @@
 from uuid import UUID
 
 import pytest
-from sqlalchemy import UniqueConstraint
+from sqlalchemy import Column, Enum, Integer, MetaData, Numeric, Table, UniqueConstraint, Uuid
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import DeclarativeBase, mapped_column, Mapped
-from paracelsus.transformers.utils import is_unique
+from paracelsus.transformers.utils import KeyIndex, TypeIndex, is_unique, load_dialect, table_keys
 
 
 class Base(DeclarativeBase):
@@ -41,3 +42,58 @@ def test_is_unique(column_name: str, expected_unique: bool):
     column = Foo.__table__.columns[column_name]
 
     assert is_unique(column) == expected_unique
+
+
+@pytest.mark.parametrize("column_name", ["id", "bar", "baz", "beep", "boop"])
+def test_key_index_matches_is_unique(column_name: str):
+    column = Foo.__table__.columns[column_name]
+
+    assert KeyIndex().is_unique(column) == is_unique(column)
+
+
+def test_table_keys():
+    keys = table_keys(Foo.__table__)
+
+    assert keys.primary_key == {"id"}
+    assert keys.foreign_key == set()
+    assert keys.unique == {"id", "bar", "baz"}
+
+
+def test_table_keys_wide_table():
+    metadata = MetaData()
+    columns = [Column(f"col_{i}", Integer) for i in range(300)]
+    constraints = [UniqueConstraint(f"col_{i}") for i in range(0, 300, 2)]
+    constraints += [UniqueConstraint(f"col_{i}", f"col_{i + 1}") for i in range(1, 299, 2)]
+    table = Table("wide", metadata, Column("id", Integer, primary_key=True), *columns, *constraints)
+
+    index = KeyIndex()
+    for column in table.columns:
+        assert index.is_unique(column) == is_unique(column)
+    assert index[table] is index[table]
+
+
+def test_type_index():
+    index = TypeIndex()
+    price = Numeric(10, 2)
+    status = Enum("draft", "published", name="status")
+
+    assert index[price] == ("NUMERIC(10, 2)", None)
+    assert index[price] is index[price]
+    assert index[status].enum_values == ("draft", "published")
+    assert index[status].enum_values is index[status].enum_values
+    # Equal types which are different instances are indexed on their own...
+    assert index[Numeric(10, 2)] is not index[price]
+    # ...but only compiled once for all of them.
+    assert len(index._compiled) == 1
+
+
+def test_type_index_dialect():
+    assert TypeIndex()[Uuid()].type == "CHAR(32)"
+    assert TypeIndex(load_dialect("postgresql"))[Uuid()].type == "UUID"
+    # Types the dialect can't compile keep their own name.
+    assert TypeIndex(load_dialect("mysql"))[JSONB()].type == "JSONB"
+
+
+def test_load_dialect_unknown():
+    with pytest.raises(ValueError, match="Unknown dialect 'nope'"):
+        load_dialect("nope")
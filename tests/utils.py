@@ -66,3 +66,8 @@ def trailing_newline_assert(output: str) -> None:
     """
     assert output.endswith("\n")
     assert not output.endswith("\n\n")
+
+
+def usage_error(output: str) -> str:
+    """The message of a usage error, without the box it is drawn in and the line breaks it is wrapped at."""
+    return " ".join(output.replace("│", " ").split())